@@ -4,6 +4,7 @@ __version__ = "0.0.1"
 __author__ = "Tyson Chan"
 __email__ = "tyson.chan@proton.me"
 
-from .core import analyze_code, ShitLintResult
+from .core import analyze_code, iter_analyze, ShitLintResult
+from .discovery import ProjectIndex
 
-__all__ = ["analyze_code", "ShitLintResult", "__version__"]
\ No newline at end of file
+__all__ = ["analyze_code", "iter_analyze", "ShitLintResult", "ProjectIndex", "__version__"]
\ No newline at end of file
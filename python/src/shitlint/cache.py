@@ -0,0 +1,122 @@
+"""Persistent per-file result cache under .shitlint/cache."""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+from .engine import BUDGET_RULE, RULESET_VERSION, FileReport, RuleEngine, content_digest, read_source
+from .rules.base import Violation
+
+CACHE_DIR = Path(".shitlint") / "cache"
+
+
+class ResultCache:
+    """Per-file violations and cross-file state, keyed by content hash.
+    
+    One cache file per rule configuration: the key covers the ruleset
+    version, the enabled rules and the brutality thresholds, so changing any
+    of them starts from a clean cache instead of serving stale results.
+    """
+    
+    def __init__(self, path: Path, entries: Optional[Dict[str, Dict]] = None):
+        self.path = path
+        self._entries = entries or {}
+        self._stats: Dict[str, os.stat_result] = {}
+        self._live: Dict[str, Dict] = {}
+    
+    @classmethod
+    def open(cls, root: Path, engine: RuleEngine) -> "ResultCache":
+        """Load the cache file matching this engine's configuration."""
+        key_material = json.dumps({
+            "ruleset": RULESET_VERSION,
+            "rules": sorted(engine.rule_names),
+            "plugins": engine.plugin_versions,
+            "cross_file": engine.cross_file,
+            "clone_min_lines": engine.clone_min_lines,
+            "near_duplicates": engine.near_duplicates is not None,
+            "max_ast_depth": engine.max_ast_depth,
+            "parser": engine.parser_backend,
+            "thresholds": engine.thresholds,
+        }, sort_keys=True)
+        key = hashlib.blake2b(key_material.encode(), digest_size=8).hexdigest()
+        path = root / CACHE_DIR / f"{key}.json"
+        
+        entries = {}
+        if path.exists():
+            try:
+                entries = json.loads(path.read_text())["files"]
+            except (json.JSONDecodeError, KeyError, OSError):
+                pass  # Corrupt cache - start over
+        
+        return cls(path, entries)
+    
+    def lookup(self, file_path: Path) -> Optional[FileReport]:
+        """Return the cached report if file_path is unchanged.
+        
+        mtime + size is checked first; only when that differs is the file
+        read and hashed, so touched-but-identical files still hit.
+        """
+        key = str(file_path)
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        self._stats[key] = stat
+        
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            content = read_source(file_path)
+            if content is None or content_digest(content) != entry["digest"]:
+                return None
+            entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+        
+        self._live[key] = entry
+        return FileReport(
+            violations=[Violation(**v) for v in entry["violations"]],
+            state=entry["state"],
+            digest=entry["digest"]
+        )
+    
+    def store(self, file_path: Path, report: FileReport):
+        """Remember a fresh report, stamped with the stat taken at lookup."""
+        key = str(file_path)
+        stat = self._stats.get(key)
+        if stat is None:
+            return
+        # A timed-out file might finish next time - don't pin the skip
+        if any(v.rule == BUDGET_RULE for v in report.violations):
+            return
+        
+        self._live[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "digest": report.digest,
+            "violations": [asdict(v) for v in report.violations],
+            "state": report.state,
+        }
+    
+    def save(self, partial: bool = False):
+        """Write entries seen this run; files no longer analyzed drop out.
+        
+        A partial run (stopped early, or sampled) only saw some files, so
+        the entries it didn't get to are kept as they were.
+        """
+        if partial:
+            self._live = {**self._entries, **self._live}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            gitignore = self.path.parent / ".gitignore"
+            if not gitignore.exists():
+                gitignore.write_text("*\n")
+            
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"files": self._live}, default=str))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Read-only checkout - caching is best effort
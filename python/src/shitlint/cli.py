@@ -4,10 +4,14 @@ import click
 from pathlib import Path
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
 from rich.text import Text
 from dotenv import load_dotenv
 
-from .core import analyze_code, get_analysis_context
+from .core import SEVERITY_RANK, ExitGate, analyze_until, iter_analyze, get_analysis_context
+from .discovery import ProjectIndex
+from .parsing import TOLERANT_BACKEND, IncrementalParser
+from .profiling import RuleProfiler
 from .roaster import generate_roast
 from .config import load_config, create_default_config
 from .review import review_design
@@ -29,7 +33,21 @@ def cli():
 @click.option('--context', help='Additional context about the codebase')
 @click.option('--init', is_flag=True, help='Create default .shitlint/config.json')
 @click.option('--brutality', type=click.Choice(['brutal', 'professional', 'gentle']), help='Override brutality level')
-def main(path: str, context: str, init: bool, brutality: str):
+@click.option('--jobs', '-j', type=int, help='Worker processes for analysis (0 = one per CPU)')
+@click.option('--no-cache', is_flag=True, help='Ignore and skip writing .shitlint/cache')
+@click.option('--no-daemon', is_flag=True, help='Analyze in-process even if a daemon is running')
+@click.option('--profile-rules', is_flag=True, help='Time every rule and file instead of roasting')
+@click.option('--profile-json', type=click.Path(dir_okay=False), help='Also write the profile as JSON')
+@click.option('--profile-top', type=int, default=10, help='Slowest files to show when profiling')
+@click.option('--sample', help='Estimate from a stratified sample of N files or P% instead of a full scan')
+@click.option('--seed', type=int, help='Random seed for --sample, for repeatable estimates')
+@click.option('--max-violations', type=click.IntRange(min=1), help='Stop and exit 1 once this many violations are found')
+@click.option('--fail-fast', is_flag=True, help='Stop and exit 1 at the first violation (same as --max-violations 1)')
+@click.option('--fail-on', type=click.Choice(['gentle', 'moderate', 'brutal']), default='gentle',
+              help='Least severity that counts towards --max-violations/--fail-fast')
+def main(path: str, context: str, init: bool, brutality: str, jobs: int, no_cache: bool, no_daemon: bool,
+         profile_rules: bool, profile_json: str, profile_top: int, sample: str, seed: int,
+         max_violations: int, fail_fast: bool, fail_on: str):
     """ShitLint: Brutally honest code analysis. Usage: shitlint ."""
     path_obj = Path(path)
     
@@ -43,9 +61,39 @@ def main(path: str, context: str, init: bool, brutality: str):
     config = load_config(path_obj)
     if brutality:
         config.brutality = brutality
+    if jobs is not None:
+        config.jobs = jobs
+    if no_cache:
+        config.cache = False
     
-    # Get analysis context for file count warning
-    analysis_context = get_analysis_context(path_obj, config)
+    if profile_rules or profile_json:
+        _profile(path_obj, config, profile_top, Path(profile_json) if profile_json else None)
+        return
+    
+    if sample:
+        if not path_obj.is_dir():
+            raise click.BadParameter("needs a directory", param_hint="--sample")
+        _sample(path_obj, config, sample, seed)
+        return
+    
+    if fail_fast or max_violations:
+        _gate(path_obj, config, ExitGate(severity=fail_on, max_violations=1 if fail_fast else max_violations))
+        return
+    
+    # A running daemon already has the project parsed - ask it first
+    served = None
+    if path_obj.is_dir() and not no_daemon:
+        from .daemon import request_analysis
+        served = request_analysis(path_obj, config)
+    
+    if served:
+        results, analysis_context = served
+    else:
+        # Discover once - context and analysis share the same index
+        index = ProjectIndex.build(path_obj, config) if path_obj.is_dir() else None
+        
+        # Get analysis context for file count warning
+        analysis_context = get_analysis_context(path_obj, config, index)
     
     # Warning for large directories
     if analysis_context.file_count > 50:
@@ -55,10 +103,16 @@ def main(path: str, context: str, init: bool, brutality: str):
             return
     
     console.print("🔥 Analyzing architectural disasters...")
+    _print_parser(config)
     
     try:
-        with console.status("[bold green]Detecting violations..."):
-            results = analyze_code(path_obj, config)
+        if not served:
+            results = []
+            with console.status("[bold green]Detecting violations...") as status:
+                # Stream results so progress shows while the scan runs
+                for result in iter_analyze(path_obj, config, index):
+                    results.append(result)
+                    status.update(f"[bold green]Detecting violations... {len(results)} found")
         
         with console.status("[bold red]Generating roast..."):
             roast_content = generate_roast(results, context or "", analysis_context, config)
@@ -74,6 +128,132 @@ def main(path: str, context: str, init: bool, brutality: str):
         console.print(f"❌ Roasting failed: {e}", style="red")
 
 
+def _print_parser(config):
+    """Say where statement boundaries come from when the tolerant parser is on."""
+    if config.parser == TOLERANT_BACKEND:
+        console.print(f"🧩 Tolerant parsing, statements split by {IncrementalParser().backend}", style="dim")
+
+
+def _profile(path: Path, config, top: int, json_path: Path = None):
+    """Run the rules with timing on and print where the time went."""
+    profiler = RuleProfiler()
+    with console.status("[bold green]Profiling rules..."):
+        results = list(iter_analyze(path, config, profiler=profiler))
+    
+    rule_table = Table(title="Rules by total time")
+    for column in ("Rule", "Seconds", "Calls", "Files", "Share"):
+        rule_table.add_column(column, justify="left" if column == "Rule" else "right")
+    total = sum(stats.seconds for stats in profiler.rules.values()) or 1.0
+    for name, stats in profiler.slowest_rules():
+        rule_table.add_row(name, f"{stats.seconds:.3f}", str(stats.calls), str(stats.files), f"{stats.seconds / total:.0%}")
+    
+    file_table = Table(title=f"Top {top} slowest files")
+    for column in ("File", "Read", "Parse", "Rules", "Total"):
+        file_table.add_column(column, justify="left" if column == "File" else "right")
+    for name, stats in profiler.slowest_files(top):
+        file_table.add_row(name, f"{stats.read:.3f}", f"{stats.parse:.3f}", f"{stats.rules:.3f}", f"{stats.total:.3f}")
+    
+    console.print(rule_table)
+    console.print(file_table)
+    console.print(f"⏱️  {len(profiler.files)} files, {len(results)} violations", style="yellow")
+    _print_parser(config)
+    
+    if json_path:
+        profiler.dump_json(json_path, top)
+        console.print(f"📝 Profile written to {json_path}", style="green")
+
+
+def _gate(path: Path, config, gate: ExitGate):
+    """CI mode: no roast, stop at the gate, exit 1 if it tripped."""
+    with console.status("[bold green]Checking for violations..."):
+        results = analyze_until(path, gate, config)
+    
+    for result in results:
+        if SEVERITY_RANK.get(result.severity, 0) >= SEVERITY_RANK[gate.severity]:
+            console.print(f"- {result.severity.upper()}: {result.file_path}:{result.line_number or '?'} - {result.message}")
+    
+    if gate.tripped:
+        console.print(f"❌ Stopped early: {gate.count} {gate.severity}+ violation(s) found", style="red")
+        raise SystemExit(1)
+    console.print(f"✅ Gate passed: {gate.count} {gate.severity}+ violation(s), limit {gate.max_violations}", style="green")
+
+
+def _sample(path: Path, config, spec: str, seed: int = None):
+    """Analyze a stratified sample and print projected totals per rule and severity."""
+    from .sampling import sample_analysis
+    
+    try:
+        with console.status("[bold green]Sampling files..."):
+            report = sample_analysis(path, config, spec, seed=seed)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--sample")
+    
+    table = Table(title=f"Projected violations ({report.sampled} of {report.population} files, {report.strata} strata)")
+    for column in ("Rule", "Severity", "In sample", "Projected", "95% CI"):
+        table.add_column(column, justify="left" if column in ("Rule", "Severity") else "right")
+    for estimate in report.estimates:
+        table.add_row(
+            estimate.rule, estimate.severity, str(estimate.observed), f"{estimate.projected:.0f}",
+            f"{estimate.low:.0f} - {estimate.high:.0f}"
+        )
+    
+    console.print(table)
+    console.print(f"🎲 Estimate from a sample in {report.seconds:.1f}s - cross-file, commit and dependency rules not included", style="yellow")
+
+
+@cli.command()
+@click.argument('path', type=click.Path(exists=True, file_okay=False), default='.')
+@click.option('--brutality', type=click.Choice(['brutal', 'professional', 'gentle']), help='Override brutality level')
+@click.option('--debounce', type=int, default=200, help='Milliseconds to wait for edits to settle')
+def watch(path: str, brutality: str, debounce: int):
+    """Re-analyze files as they change. No LLM calls, just violations."""
+    from .watch import watch as watch_path
+    from .roaster import format_violations
+    
+    path_obj = Path(path)
+    config = load_config(path_obj)
+    if brutality:
+        config.brutality = brutality
+    _print_parser(config)
+    
+    def report(changed, results, elapsed):
+        if changed is None:
+            console.print(format_violations(results))
+            console.print(f"👀 Watching {path} - {len(results)} violations ({elapsed * 1000:.0f}ms). Ctrl+C to stop.", style="yellow")
+            return
+        
+        names = ", ".join(p.name for p in changed[:3]) + ("..." if len(changed) > 3 else "")
+        console.print(f"🔄 {names} - {len(results)} violations ({elapsed * 1000:.0f}ms)", style="bold")
+        for result in results:
+            console.print(f"  - {result.file_path}:{result.line_number or '?'} - {result.message}")
+    
+    watch_path(path_obj, config, on_update=report, debounce=debounce / 1000)
+
+
+@cli.command()
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), help='Socket path (default: per-user runtime dir)')
+@click.option('--stop', is_flag=True, help='Stop a running daemon')
+def daemon(socket_path: str, stop: bool):
+    """Keep projects parsed in memory so shitlint runs start warm."""
+    from . import daemon as analysis_daemon
+    
+    socket_path = Path(socket_path) if socket_path else analysis_daemon.default_socket_path()
+    if stop:
+        if analysis_daemon.stop(socket_path):
+            console.print("🛑 Daemon stopped", style="yellow")
+        else:
+            console.print("No daemon running", style="red")
+        return
+    
+    console.print(f"😈 Daemon listening on {socket_path}. Ctrl+C to stop.", style="yellow")
+    try:
+        analysis_daemon.serve(socket_path)
+    except RuntimeError as e:
+        console.print(f"❌ {e}", style="red")
+    except KeyboardInterrupt:
+        pass
+
+
 @cli.command()
 @click.option('--proposal', help='Design proposal text')
 @click.option('--context', help='team=2,users=47,perf=120ms')
@@ -16,6 +16,17 @@ class ShitLintConfig:
     llm_provider: str = "auto"  # auto, gemini, openai, anthropic
     custom_rules: Dict[str, Any] = None
     enabled_rules: Dict[str, bool] = None
+    discovery: str = "auto"  # auto, git, filesystem
+    jobs: int = 1  # Worker processes, 0 = one per CPU
+    io_threads: int = 4  # Reader threads prefetching files, 0 = read inline
+    prefetch_depth: int = 32  # Max files read ahead of analysis
+    cache: bool = True  # Reuse results for unchanged files from .shitlint/cache
+    file_budget_seconds: float = 10.0  # Give up on a single file after this long, 0 = no limit
+    max_ast_depth: int = 1000  # Skip files nested deeper than this, 0 = no limit
+    parser: str = "ast"  # ast, or tolerant for error-tolerant incremental parsing
+    clone_min_lines: int = 0  # Report copied blocks of at least this many statements, 0 = off
+    near_duplicate_threshold: float = 0.0  # Report functions at least this similar, e.g. 0.8, 0 = off
+    fingerprint_index: bool = True  # With cache, keep a fingerprint index so single-file runs see cross-file duplicates
     
     def __post_init__(self):
         if self.ignore_patterns is None:
@@ -43,7 +54,18 @@ def load_config(project_root: Path) -> ShitLintConfig:
             max_file_size=data.get("max_file_size", 100000),
             llm_provider=data.get("llm_provider", "auto"),
             custom_rules=data.get("custom_rules", {}),
-            enabled_rules=data.get("enabled_rules", {})
+            enabled_rules=data.get("enabled_rules", {}),
+            discovery=data.get("discovery", "auto"),
+            jobs=data.get("jobs", 1),
+            io_threads=data.get("io_threads", 4),
+            prefetch_depth=data.get("prefetch_depth", 32),
+            cache=data.get("cache", True),
+            file_budget_seconds=data.get("file_budget_seconds", 10.0),
+            max_ast_depth=data.get("max_ast_depth", 1000),
+            parser=data.get("parser", "ast"),
+            clone_min_lines=data.get("clone_min_lines", 0),
+            near_duplicate_threshold=data.get("near_duplicate_threshold", 0.0),
+            fingerprint_index=data.get("fingerprint_index", True)
         )
     except (json.JSONDecodeError, FileNotFoundError):
         return ShitLintConfig()
@@ -1,10 +1,17 @@
 """Core ShitLint functionality - Heuristics + AST detection."""
 
-from dataclasses import dataclass
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-import pathspec
-from .engine import RuleEngine
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from .config import ShitLintConfig
+from .engine import FileReport, RuleEngine
+from .cache import ResultCache
+from .fingerprint_index import FingerprintIndex
+from .parallel import iter_parallel, resolve_jobs
+from .prefetch import iter_prefetched
+from .profiling import RuleProfiler
+from .discovery import ProjectIndex, discover_files, load_ignore_spec as _load_gitignore_spec
 from .rules.base import Violation
 
 
@@ -19,6 +26,29 @@ class ShitLintResult:
     rule: Optional[str] = None
 
 
+# Severities from least to most damning
+SEVERITY_RANK = {"gentle": 0, "moderate": 1, "brutal": 2}
+
+
+@dataclass
+class ExitGate:
+    """When a CI run can stop early: enough violations at or above a severity."""
+    
+    severity: str = "gentle"
+    max_violations: int = 1
+    count: int = 0
+    
+    def record(self, result: ShitLintResult) -> bool:
+        """Count a result, returning True once the gate has tripped."""
+        if SEVERITY_RANK.get(result.severity, 0) >= SEVERITY_RANK[self.severity]:
+            self.count += 1
+        return self.tripped
+    
+    @property
+    def tripped(self) -> bool:
+        return self.count >= self.max_violations
+
+
 @dataclass
 class AnalysisContext:
     """Context information for analysis."""
@@ -29,38 +59,147 @@ class AnalysisContext:
     naming_violations: List[str]
 
 
-def analyze_code(path: Path, config=None) -> List[ShitLintResult]:
+def analyze_code(path: Path, config=None, index: Optional[ProjectIndex] = None,
+                 profiler: Optional[RuleProfiler] = None) -> List[ShitLintResult]:
     """Analyze code with heuristics + AST rules."""
+    return list(iter_analyze(path, config, index, profiler))
+
+
+def iter_analyze(path: Path, config=None, index: Optional[ProjectIndex] = None,
+                 profiler: Optional[RuleProfiler] = None) -> Iterator[ShitLintResult]:
+    """Yield results as each file finishes, then project-wide, then cross-file.
+    
+    With a profiler, files are read and analyzed serially in this process
+    and the cache is bypassed, so every timing is real and attributable.
+    """
+    if profiler:
+        config = replace(config or ShitLintConfig(), jobs=1, io_threads=0, cache=False)
+    
     brutality = config.brutality if config else "professional"
     engine = RuleEngine(brutality=brutality, config=config.__dict__ if config else None)
-    results = []
+    engine.profiler = profiler
     
     if path.is_file():
-        violations = engine.analyze_file(path)
-        results.extend(_violations_to_results(violations))
+        yield from _violations_to_results(engine.analyze_file(path))
+        yield from _violations_to_results(engine.analyze_project(path.parent))
+        # The rest of the project comes from the index a directory run left behind
+        if config and config.cache and config.fingerprint_index and engine.cross_file:
+            yield from _violations_to_results(_indexed_duplicates(engine, path))
     elif path.is_dir():
-        # Get all Python files first
-        python_files = list(_get_python_files(path, config))
+        # Reuse the caller's index so the tree is only walked once
+        index = index or ProjectIndex.build(path, config)
         
-        # Analyze each file (collects cross-file patterns)
-        for file_path in python_files:
-            violations = engine.analyze_file(file_path)
-            results.extend(_violations_to_results(violations))
+        # Python files first (collects cross-file patterns), then docs
+        files = index.python_files + index.doc_files
+        cache = ResultCache.open(path, engine) if config and config.cache else None
+        finished = False
+        try:
+            for _, violations in _iter_file_violations(engine, files, config, cache):
+                yield from _violations_to_results(violations)
+            finished = True
+        finally:
+            if cache:
+                cache.save(partial=not finished)
         
-        # Also analyze documentation files
-        doc_files = list(_get_doc_files(path, config))
-        for file_path in doc_files:
-            violations = engine.analyze_file(file_path)
-            results.extend(_violations_to_results(violations))
+        # Git history and manifests are checked once per run, not per file
+        yield from _violations_to_results(engine.analyze_project(path, index.project_dirs))
         
-        # Generate cross-file violations after analyzing all files
-        cross_file_violations = engine.get_cross_file_violations()
-        results.extend(_violations_to_results(cross_file_violations))
+        # Cross-file violations need every file analyzed first
+        with profiler.time_rule("cross_file_duplicates") if profiler else nullcontext():
+            cross_file = engine.get_cross_file_violations()
+        if config and config.cache and config.fingerprint_index and engine.cross_file:
+            _update_index(engine, path, index.python_files)
+        yield from _violations_to_results(cross_file)
+
+
+def _update_index(engine: RuleEngine, root: Path, files: List[Path]):
+    """Bring the persistent fingerprint index in line with a full run."""
+    fingerprint_index = FingerprintIndex.open(root)
+    if fingerprint_index is None:
+        return
+    with fingerprint_index:
+        for file_path in files:
+            fingerprint_index.replace_file(file_path, engine.export_file_state(file_path)["functions"])
+        fingerprint_index.retain(files)
+
+
+def _indexed_duplicates(engine: RuleEngine, file_path: Path) -> List[Violation]:
+    """Cross-file duplicates for one file, the other side read from the index."""
+    fingerprint_index = FingerprintIndex.find(file_path)
+    if fingerprint_index is None:
+        return []
+    with fingerprint_index:
+        entries = engine.export_file_state(file_path)["functions"]
+        fingerprint_index.replace_file(file_path, entries)
+        matches = fingerprint_index.matching_files({entry[0] for entry in entries}, exclude=file_path)
+    for other_path, other_entries in matches.items():
+        engine.import_file_state(other_path, {"functions": other_entries})
+    return [v for v in engine.get_cross_file_violations() if v.file_path == str(file_path)]
+
+
+def analyze_until(path: Path, gate: ExitGate, config=None, index: Optional[ProjectIndex] = None) -> List[ShitLintResult]:
+    """Analyze until the gate trips, then stop scheduling and cancel in-flight work.
     
+    Closing the result stream runs its cleanup: queued reads and worker
+    chunks are cancelled and the cache keeps what was already known.
+    """
+    results = []
+    stream = iter_analyze(path, config, index)
+    try:
+        for result in stream:
+            results.append(result)
+            if gate.record(result):
+                break
+    finally:
+        stream.close()
     return results
 
 
-def get_analysis_context(path: Path, config=None) -> AnalysisContext:
+def _iter_file_violations(engine: RuleEngine, files: List[Path], config=None, cache: Optional[ResultCache] = None) -> Iterator[Tuple[Path, List[Violation]]]:
+    """Run the engine over files, serving unchanged files from the cache."""
+    if cache is None:
+        for file_path, report in _iter_reports(engine, files, config):
+            yield file_path, report.violations if report else []
+        return
+    
+    # Cache hits never get read or parsed - their cross-file state is replayed
+    cached = {file_path: cache.lookup(file_path) for file_path in files}
+    reports = _iter_reports(engine, [f for f in files if cached[f] is None], config)
+    try:
+        for file_path in files:
+            report = cached[file_path]
+            if report is None:
+                _, report = next(reports)
+                if report is None:
+                    yield file_path, []
+                    continue
+                cache.store(file_path, report)
+            else:
+                engine.import_file_state(file_path, report.state)
+            
+            yield file_path, report.violations
+    finally:
+        reports.close()
+
+
+def _iter_reports(engine: RuleEngine, files: List[Path], config=None) -> Iterator[Tuple[Path, Optional[FileReport]]]:
+    """Analyze files serially, with read-ahead, or across a process pool."""
+    jobs = resolve_jobs(config.jobs) if config else 1
+    if jobs > 1 and len(files) > 1:
+        yield from iter_parallel(engine, files, jobs)
+        return
+    
+    if config and config.io_threads > 0:
+        # Reader threads hide I/O latency behind parsing and rules
+        sources = iter_prefetched(files, config.io_threads, config.prefetch_depth)
+    else:
+        sources = ((file_path, engine.read(file_path)) for file_path in files)
+    
+    for file_path, content in sources:
+        yield file_path, engine.report_source(file_path, content) if content is not None else None
+
+
+def get_analysis_context(path: Path, config=None, index: Optional[ProjectIndex] = None) -> AnalysisContext:
     """Get full context for tree structure analysis."""
     if path.is_file():
         return AnalysisContext(
@@ -71,144 +210,25 @@ def get_analysis_context(path: Path, config=None) -> AnalysisContext:
         )
     
     # Directory analysis
-    tree = _build_tree_structure(path)
-    python_files = list(_get_python_files(path, config))
-    
-    file_types = {}
-    for file_path in python_files:
-        ext = file_path.suffix
-        file_types[ext] = file_types.get(ext, 0) + 1
-    
-    naming_violations = _detect_naming_violations(python_files)
+    index = index or ProjectIndex.build(path, config)
+    python_files = index.python_files
     
     return AnalysisContext(
-        tree_structure=tree,
+        tree_structure=index.tree,
         file_count=len(python_files),
-        file_types=file_types,
-        naming_violations=naming_violations
+        file_types=index.suffix_counts("python"),
+        naming_violations=_detect_naming_violations(python_files)
     )
 
 
 def _get_python_files(path: Path, config=None) -> List[Path]:
     """Get all Python files, respecting .gitignore and config."""
-    spec = _load_gitignore_spec(path, config)
-    
-    files = []
-    for file_path in path.rglob('*.py'):
-        if file_path.is_file():
-            # Skip files too large
-            if config and file_path.stat().st_size > config.max_file_size:
-                continue
-                
-            # Get relative path for gitignore matching
-            try:
-                rel_path = file_path.relative_to(path)
-                if not spec.match_file(str(rel_path)):
-                    files.append(file_path)
-            except ValueError:
-                # File is outside the root path
-                continue
-    
-    return files
+    return discover_files(path, config, kind="python")
 
 
 def _get_doc_files(path: Path, config=None) -> List[Path]:
     """Get all documentation files, respecting .gitignore and config."""
-    spec = _load_gitignore_spec(path, config)
-    
-    files = []
-    doc_patterns = ['*.md', '*.rst', '*.txt']
-    for pattern in doc_patterns:
-        for file_path in path.rglob(pattern):
-            if file_path.is_file():
-                # Skip files too large
-                if config and file_path.stat().st_size > config.max_file_size:
-                    continue
-                    
-                # Get relative path for gitignore matching
-                try:
-                    rel_path = file_path.relative_to(path)
-                    if not spec.match_file(str(rel_path)):
-                        files.append(file_path)
-                except ValueError:
-                    # File is outside the root path
-                    continue
-    
-    return files
-
-
-def _load_gitignore_spec(path: Path, config=None) -> pathspec.PathSpec:
-    """Load .gitignore patterns and create pathspec."""
-    gitignore_patterns = []
-    
-    # Default ignores
-    gitignore_patterns.extend([
-        '.git/',
-        '__pycache__/',
-        '*.pyc',
-        '.venv/',
-        'venv/',
-        '.pytest_cache/',
-        'node_modules/',
-        '.env.local',
-        '.env.*.local',
-        'dist/',
-        'build/',
-        '*.egg-info/',
-    ])
-    
-    # Add config ignore patterns
-    if config and config.ignore_patterns:
-        gitignore_patterns.extend(config.ignore_patterns)
-    
-    # Read .gitignore if it exists
-    gitignore_path = path / '.gitignore'
-    if gitignore_path.exists():
-        try:
-            with open(gitignore_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        gitignore_patterns.append(line)
-        except Exception:
-            pass  # Ignore gitignore read errors
-    
-    return pathspec.PathSpec.from_lines('gitwildmatch', gitignore_patterns)
-
-
-def _build_tree_structure(path: Path, max_depth: int = 3) -> Dict[str, Any]:
-    """Build tree structure for context, respecting .gitignore."""
-    spec = _load_gitignore_spec(path)
-    
-    def _build_tree(current_path: Path, depth: int = 0) -> Dict[str, Any]:
-        if depth > max_depth:
-            return {"...": "truncated"}
-        
-        tree = {}
-        try:
-            for item in current_path.iterdir():
-                # Get relative path for gitignore matching
-                try:
-                    rel_path = item.relative_to(path)
-                    if spec.match_file(str(rel_path)):
-                        continue
-                except ValueError:
-                    continue
-                
-                # Skip hidden files except important ones
-                if item.name.startswith('.') and item.name not in {'.env', '.gitignore'}:
-                    continue
-                
-                if item.is_dir():
-                    tree[f"{item.name}/"] = _build_tree(item, depth + 1)
-                else:
-                    tree[item.name] = None
-        except PermissionError:
-            pass
-        
-        return tree
-    
-    return _build_tree(path)
+    return discover_files(path, config, kind="doc")
 
 
 def _detect_naming_violations(files: List[Path]) -> List[str]:
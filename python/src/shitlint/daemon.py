@@ -0,0 +1,170 @@
+"""Analysis daemon - keeps sessions warm and serves CLI runs over a Unix socket."""
+
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import ShitLintConfig
+from .core import AnalysisContext, ShitLintResult, get_analysis_context
+from .session import AnalysisSession
+
+# Bump when the request/response format changes
+PROTOCOL_VERSION = 1
+
+
+def default_socket_path() -> Path:
+    """Per-user socket path, under XDG_RUNTIME_DIR when it exists."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and Path(runtime_dir).is_dir():
+        return Path(runtime_dir) / "shitlint.sock"
+    return Path(tempfile.gettempdir()) / f"shitlint-{os.getuid()}.sock"
+
+
+class AnalysisDaemon:
+    """One resident AnalysisSession per (project root, config)."""
+    
+    def __init__(self):
+        self._sessions: Dict[Tuple[str, str], AnalysisSession] = {}
+        self._lock = threading.Lock()
+    
+    def session_for(self, root: Path, config: ShitLintConfig) -> AnalysisSession:
+        key = (str(root), json.dumps(asdict(config), sort_keys=True))
+        with self._lock:
+            if key not in self._sessions:
+                self._sessions[key] = AnalysisSession(root, config)
+            return self._sessions[key]
+    
+    def handle(self, request: Dict) -> Dict:
+        """Answer one decoded request."""
+        if request.get("version") != PROTOCOL_VERSION:
+            return {"error": f"protocol mismatch, daemon speaks v{PROTOCOL_VERSION}"}
+        
+        op = request.get("op")
+        if op in ("ping", "shutdown"):
+            return {"ok": True}
+        if op != "analyze":
+            return {"error": f"unknown op: {op}"}
+        
+        root = Path(request["path"])
+        if not root.is_dir():
+            return {"error": f"not a directory: {root}"}
+        
+        config = ShitLintConfig(**request.get("config", {}))
+        session = self.session_for(root, config)
+        # refresh() re-stats the project and only re-analyzes files whose mtime moved
+        results = session.refresh()
+        context = get_analysis_context(root, config, session.index)
+        
+        return {
+            "results": [asdict(r) for r in results],
+            "context": asdict(context),
+        }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One JSON line in, one JSON line out."""
+    
+    def handle(self):
+        request = {}
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self.server.daemon.handle(request)
+        except Exception as e:
+            response = {"error": str(e)}
+        
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+        if response.get("ok") and request.get("op") == "shutdown":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    
+    def __init__(self, socket_path: Path, daemon: AnalysisDaemon):
+        self.daemon = daemon
+        super().__init__(str(socket_path), _RequestHandler)
+
+
+def serve(socket_path: Optional[Path] = None, ready: Optional[threading.Event] = None) -> None:
+    """Run the daemon in the foreground until shut down."""
+    socket_path = socket_path or default_socket_path()
+    if socket_path.exists():
+        if send_request({"op": "ping"}, socket_path) is not None:
+            raise RuntimeError(f"Daemon already running on {socket_path}")
+        socket_path.unlink()  # Stale socket from a daemon that died
+    
+    old_umask = os.umask(0o077)  # Socket is owner-only
+    try:
+        server = _Server(socket_path, AnalysisDaemon())
+    finally:
+        os.umask(old_umask)
+    
+    try:
+        if ready:
+            ready.set()
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+
+
+def send_request(request: Dict, socket_path: Optional[Path] = None, timeout: Optional[float] = 300) -> Optional[Dict]:
+    """Send one request, returning None when no daemon answers."""
+    socket_path = socket_path or default_socket_path()
+    if not socket_path.exists():
+        return None
+    
+    request = dict(request, version=PROTOCOL_VERSION)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError:
+        return None
+    
+    return json.loads(line) if line else None
+
+
+def request_analysis(path: Path, config: ShitLintConfig,
+                     socket_path: Optional[Path] = None) -> Optional[Tuple[List[ShitLintResult], AnalysisContext]]:
+    """Ask a running daemon to analyze path. None means analyze locally."""
+    root = path.resolve()
+    response = send_request(
+        {"op": "analyze", "path": str(root), "config": asdict(config)},
+        socket_path,
+    )
+    if not response or "error" in response:
+        return None
+    
+    results = [ShitLintResult(**r) for r in response["results"]]
+    for result in results:
+        result.file_path = _localize(result.file_path, root, path)
+    return results, AnalysisContext(**response["context"])
+
+
+def _localize(file_path: str, root: Path, path: Path) -> str:
+    """Map the daemon's absolute paths back onto the path the caller passed."""
+    resolved = Path(file_path)
+    if not resolved.is_absolute():
+        return file_path
+    try:
+        return str(path / resolved.relative_to(root))
+    except ValueError:
+        return file_path
+
+
+def stop(socket_path: Optional[Path] = None) -> bool:
+    """Ask a running daemon to exit. False when none was running."""
+    return send_request({"op": "shutdown"}, socket_path) is not None
@@ -0,0 +1,409 @@
+"""File discovery - one pruned directory walk instead of an rglob per suffix."""
+
+import os
+import stat as stat_module
+import subprocess
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pathspec
+
+
+PYTHON_SUFFIXES = frozenset({'.py'})
+DOC_SUFFIXES = frozenset({'.md', '.rst', '.txt'})
+
+DEFAULT_IGNORES = [
+    '.git/',
+    '__pycache__/',
+    '*.pyc',
+    '.venv/',
+    'venv/',
+    '.pytest_cache/',
+    'node_modules/',
+    '.env.local',
+    '.env.*.local',
+    'dist/',
+    'build/',
+    '*.egg-info/',
+]
+
+# Files project-scoped rules read - each directory holding one is a project
+MANIFESTS = frozenset({'package.json', 'requirements.txt', 'pyproject.toml'})
+
+# Hidden names that still show up in the context tree
+VISIBLE_DOTFILES = frozenset({'.env', '.gitignore'})
+
+
+@dataclass
+class FileRecord:
+    """A discovered file plus the stat data gathered while walking."""
+    
+    path: Path
+    kind: str  # python, doc
+    size: int
+    blob: Optional[str] = None  # Staged git object id, git backend only
+    mtime_ns: int = 0
+
+
+def classify(name: str) -> Optional[str]:
+    """Classify a file name by suffix - None means we don't analyze it."""
+    suffix = os.path.splitext(name)[1]
+    if suffix in PYTHON_SUFFIXES:
+        return "python"
+    if suffix in DOC_SUFFIXES:
+        return "doc"
+    return None
+
+
+def load_ignore_spec(path: Path, config=None) -> pathspec.PathSpec:
+    """Load default, config and .gitignore patterns into one pathspec."""
+    gitignore_patterns = _base_patterns(config)
+    gitignore_patterns.extend(_read_gitignore(path))
+    return pathspec.PathSpec.from_lines('gitwildmatch', gitignore_patterns)
+
+
+def _base_patterns(config=None) -> List[str]:
+    """Default ignores plus config ignore patterns."""
+    patterns = list(DEFAULT_IGNORES)
+    if config and config.ignore_patterns:
+        patterns.extend(config.ignore_patterns)
+    return patterns
+
+
+def _read_gitignore(directory: Path) -> List[str]:
+    """Read the patterns from directory/.gitignore, if there is one."""
+    patterns = []
+    gitignore_path = directory / '.gitignore'
+    if gitignore_path.exists():
+        try:
+            with open(gitignore_path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        patterns.append(line)
+        except Exception:
+            pass  # Ignore gitignore read errors
+    return patterns
+
+
+# (directory prefix relative to root, rules compiled for that directory)
+IgnoreLevels = Tuple[Tuple[str, pathspec.PathSpec], ...]
+
+
+class IgnoreMatcher:
+    """Hierarchical .gitignore matching with one compiled spec per directory.
+    
+    Each directory's .gitignore is compiled once and cached. Paths are tested
+    against the levels active for their directory, relative to the directory
+    that declared them, and the deepest matching pattern wins like in git.
+    """
+    
+    def __init__(self, root: Path, config=None):
+        self.root = root
+        self._base = pathspec.PathSpec.from_lines('gitwildmatch', _base_patterns(config))
+        self._specs: Dict[str, Optional[pathspec.PathSpec]] = {}
+    
+    def base_levels(self) -> IgnoreLevels:
+        """Levels for defaults/config only - git already applied .gitignore."""
+        return (("", self._base),)
+    
+    def root_levels(self) -> IgnoreLevels:
+        """Levels active at the root: defaults/config, then the root .gitignore."""
+        return self.enter("", self.base_levels())
+    
+    def enter(self, rel_dir: str, levels: IgnoreLevels) -> IgnoreLevels:
+        """Extend parent levels with rel_dir's own .gitignore, if it has one."""
+        spec = self.spec_for(rel_dir)
+        return levels + ((rel_dir, spec),) if spec else levels
+    
+    def spec_for(self, rel_dir: str) -> Optional[pathspec.PathSpec]:
+        """Compiled rules from rel_dir/.gitignore, cached per directory."""
+        if rel_dir not in self._specs:
+            patterns = _read_gitignore(self.root / rel_dir)
+            self._specs[rel_dir] = pathspec.PathSpec.from_lines('gitwildmatch', patterns) if patterns else None
+        return self._specs[rel_dir]
+    
+    def is_path_ignored(self, rel_path: str) -> bool:
+        """Check a single root-relative path, ancestors included."""
+        levels = self.root_levels()
+        parts = rel_path.split('/')
+        for depth in range(1, len(parts)):
+            rel_dir = '/'.join(parts[:depth])
+            if self.is_ignored(levels, rel_dir, is_dir=True):
+                return True
+            levels = self.enter(rel_dir + '/', levels)
+        return self.is_ignored(levels, rel_path)
+    
+    def is_ignored(self, levels: IgnoreLevels, rel_path: str, is_dir: bool = False) -> bool:
+        """Check rel_path against the levels of its parent directory."""
+        ignored = False
+        for prefix, spec in levels:
+            local_path = rel_path[len(prefix):]
+            if is_dir:
+                local_path += '/'
+            
+            # Last matching pattern decides, so negations can re-include
+            for pattern in spec.patterns:
+                if pattern.include is not None and pattern.match_file(local_path) is not None:
+                    ignored = pattern.include
+        return ignored
+
+
+def walk_project(root: Path, config=None, tree: Optional[Dict[str, Any]] = None, max_depth: int = 3,
+                 manifests: Optional[List[Path]] = None) -> Iterator[FileRecord]:
+    """Walk root once, pruning ignored directories before entering them.
+
+    Files are classified by suffix in the same pass, the size check reuses
+    the DirEntry stat, and symlinked files/directories are deduped by inode.
+    If tree is given it is filled with the visible layout up to max_depth,
+    and if manifests is given every non-ignored manifest is appended to it.
+    """
+    matcher = IgnoreMatcher(root, config)
+    max_file_size = config.max_file_size if config else None
+    
+    root_stat = root.stat()
+    seen_dirs = {(root_stat.st_dev, root_stat.st_ino)}
+    seen_files = set()
+    stack = [(root, "", matcher.root_levels(), 0, tree)]
+    
+    while stack:
+        dir_path, rel_dir, levels, depth, tree_node = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        
+        subdirs = []
+        for entry in entries:
+            rel_path = rel_dir + entry.name
+            visible = tree_node is not None and _visible(entry.name)
+            try:
+                if entry.is_dir():
+                    # Ignored directories are pruned here, subtree and all
+                    if matcher.is_ignored(levels, rel_path, is_dir=True):
+                        continue
+                    stat = entry.stat()
+                    key = (stat.st_dev, stat.st_ino)
+                    if key not in seen_dirs:
+                        seen_dirs.add(key)
+                        child_node = None
+                        if visible and depth < max_depth:
+                            child_node = {}
+                            tree_node[f"{entry.name}/"] = child_node
+                        elif visible:
+                            tree_node[f"{entry.name}/"] = {"...": "truncated"}
+                        child_dir = rel_path + '/'
+                        subdirs.append((Path(entry.path), child_dir, matcher.enter(child_dir, levels), depth + 1, child_node))
+                    continue
+                
+                kind = classify(entry.name)
+                manifest = manifests is not None and entry.name in MANIFESTS
+                if (kind is None and not visible and not manifest) or not entry.is_file() or matcher.is_ignored(levels, rel_path):
+                    continue
+                if visible:
+                    tree_node[entry.name] = None
+                if manifest:
+                    manifests.append(Path(entry.path))
+                if kind is None:
+                    continue
+                
+                stat = entry.stat()
+            except OSError:
+                continue
+            
+            # Skip files too large
+            if max_file_size is not None and stat.st_size > max_file_size:
+                continue
+            
+            key = (stat.st_dev, stat.st_ino)
+            if key in seen_files:
+                continue
+            seen_files.add(key)
+            
+            yield FileRecord(path=Path(entry.path), kind=kind, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        
+        # Reversed so the stack pops subdirectories in sorted order
+        stack.extend(reversed(subdirs))
+
+
+def walk_git_index(root: Path, config=None, tree: Optional[Dict[str, Any]] = None, max_depth: int = 3,
+                   manifests: Optional[List[Path]] = None) -> Optional[List[FileRecord]]:
+    """Discover files from one `git ls-files` call instead of walking the disk.
+    
+    Git has already applied every .gitignore, so only default/config patterns
+    are matched here (memoized per directory). Returns None outside a work tree
+    so callers can fall back to walk_project.
+    """
+    entries = _git_ls_files(root)
+    if entries is None:
+        return None
+    
+    matcher = IgnoreMatcher(root, config)
+    levels = matcher.base_levels()
+    max_file_size = config.max_file_size if config else None
+    ignored_dirs: Dict[str, bool] = {}
+    
+    def dir_ignored(rel_dir: str) -> bool:
+        if rel_dir not in ignored_dirs:
+            parent = rel_dir.rpartition('/')[0]
+            ignored_dirs[rel_dir] = (bool(parent) and dir_ignored(parent)) or matcher.is_ignored(levels, rel_dir, is_dir=True)
+        return ignored_dirs[rel_dir]
+    
+    seen_files = set()
+    records = []
+    for rel_path in sorted(entries, key=_walk_order):
+        parent, _, name = rel_path.rpartition('/')
+        kind = classify(name)
+        manifest = manifests is not None and name in MANIFESTS
+        if kind is None and tree is None and not manifest:
+            continue
+        if (parent and dir_ignored(parent)) or matcher.is_ignored(levels, rel_path):
+            continue
+        if tree is not None:
+            _add_to_tree(tree, rel_path.split('/'), max_depth)
+        if manifest and (root / rel_path).is_file():
+            manifests.append(root / rel_path)
+        if kind is None:
+            continue
+        
+        file_path = root / rel_path
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue  # Deleted from the work tree but still in the index
+        
+        # Skip submodules, directories behind symlinks, and files too large
+        if not stat_module.S_ISREG(stat.st_mode):
+            continue
+        if max_file_size is not None and stat.st_size > max_file_size:
+            continue
+        
+        key = (stat.st_dev, stat.st_ino)
+        if key in seen_files:
+            continue
+        seen_files.add(key)
+        
+        records.append(FileRecord(path=file_path, kind=kind, size=stat.st_size, blob=entries[rel_path], mtime_ns=stat.st_mtime_ns))
+    
+    return records
+
+
+def _git_ls_files(root: Path) -> Optional[Dict[str, Optional[str]]]:
+    """Map relative path -> staged blob id (None for untracked files)."""
+    try:
+        result = subprocess.run(
+            ['git', 'ls-files', '--cached', '--others', '--exclude-standard', '-s', '-z'],
+            cwd=root,
+            capture_output=True
+        )
+    except OSError:
+        return None  # Git not installed
+    
+    if result.returncode != 0:
+        return None  # Not a git work tree
+    
+    entries: Dict[str, Optional[str]] = {}
+    for raw in result.stdout.split(b'\0'):
+        if not raw:
+            continue
+        line = os.fsdecode(raw)
+        if '\t' in line:
+            # Tracked: "<mode> <blob> <stage>\t<path>"
+            info, rel_path = line.split('\t', 1)
+            mode, blob, _ = info.split(' ')
+            if mode == '160000':
+                continue  # Submodule
+            entries[rel_path] = blob
+        else:
+            # Untracked (not ignored): just the path - nested repos show up as "dir/"
+            if not line.endswith('/'):
+                entries.setdefault(line, None)
+    
+    return entries
+
+
+def _walk_order(rel_path: str) -> List[Tuple[int, str]]:
+    """Sort key matching walk_project: files before subdirectories, by name."""
+    parts = rel_path.split('/')
+    return [(1, part) for part in parts[:-1]] + [(0, parts[-1])]
+
+
+def _add_to_tree(tree: Dict[str, Any], parts: List[str], max_depth: int) -> None:
+    """Insert a relative path into the bounded context tree."""
+    if not all(_visible(part) for part in parts):
+        return
+    
+    node = tree
+    for depth, name in enumerate(parts[:-1]):
+        if depth >= max_depth:
+            node[f"{name}/"] = {"...": "truncated"}
+            return
+        node = node.setdefault(f"{name}/", {})
+    node[parts[-1]] = None
+
+
+def _visible(name: str) -> bool:
+    """Skip hidden files in the context tree except important ones."""
+    return not name.startswith('.') or name in VISIBLE_DOTFILES
+
+
+def discover_files(root: Path, config=None, kind: Optional[str] = None) -> List[Path]:
+    """List discovered file paths, optionally filtered by kind."""
+    return [record.path for record in ProjectIndex.build(root, config).files if kind is None or record.kind == kind]
+
+
+@dataclass
+class ProjectIndex:
+    """Discovery results for one project, built once and shared per run."""
+    
+    root: Path
+    files: List[FileRecord]
+    tree: Dict[str, Any]
+    backend: str = "filesystem"  # filesystem, git
+    manifests: List[Path] = field(default_factory=list)  # package.json, requirements.txt, pyproject.toml
+    
+    @classmethod
+    def build(cls, root: Path, config=None, max_depth: int = 3) -> "ProjectIndex":
+        """Discover root once, collecting the file list and a bounded tree.
+        
+        Inside a git work tree the index is read from git (unless config says
+        discovery="filesystem"); everywhere else the directory is walked.
+        """
+        tree: Dict[str, Any] = {}
+        manifests: List[Path] = []
+        if not config or config.discovery != "filesystem":
+            files = walk_git_index(root, config, tree=tree, max_depth=max_depth, manifests=manifests)
+            if files is not None:
+                return cls(root=root, files=files, tree=tree, backend="git", manifests=manifests)
+            if config and config.discovery == "git":
+                warnings.warn(f"git discovery failed for {root}, walking the filesystem instead")
+        
+        files = list(walk_project(root, config, tree=tree, max_depth=max_depth, manifests=manifests))
+        return cls(root=root, files=files, tree=tree, manifests=manifests)
+    
+    @property
+    def python_files(self) -> List[Path]:
+        return [record.path for record in self.files if record.kind == "python"]
+    
+    @property
+    def doc_files(self) -> List[Path]:
+        return [record.path for record in self.files if record.kind == "doc"]
+    
+    @property
+    def project_dirs(self) -> List[Path]:
+        """Directories holding a manifest, each once, in discovery order."""
+        return list(dict.fromkeys(manifest.parent for manifest in self.manifests))
+    
+    @property
+    def total_size(self) -> int:
+        return sum(record.size for record in self.files)
+    
+    def suffix_counts(self, kind: Optional[str] = None) -> Dict[str, int]:
+        """Count discovered files per suffix, optionally for one kind."""
+        counts: Dict[str, int] = {}
+        for record in self.files:
+            if kind is None or record.kind == kind:
+                counts[record.path.suffix] = counts.get(record.path.suffix, 0) + 1
+        return counts
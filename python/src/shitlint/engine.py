@@ -1,20 +1,37 @@
 """Rule engine for coordinating all violation detection."""
 
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 import ast
+import hashlib
+import sys
 
-from .rules.base import Violation
-from .rules.files import detect_giant_files
-from .rules.imports import detect_import_ceremony
-from .rules.functions import detect_complex_functions, detect_parameter_hell
-from .rules.naming import detect_naming_violations
-from .rules.duplicates import detect_duplicate_blocks, CrossFileAnalyzer
-from .rules.magic import detect_magic_numbers
-from .rules.abstraction import detect_over_abstraction
-from .rules.commits import detect_commit_violations
-from .rules.deps import detect_dependency_violations
-from .rules.docs import detect_documentation_violations
+from .rules.base import (
+    FILE, PROJECT, Budget, BudgetExceeded, FunctionRule, NodeRule, Violation, requires_of, scope_of, walk_rules
+)
+from .rules.clones import CloneDetector
+from .rules.duplicates import CrossFileAnalyzer
+from .rules.registry import discover_rules, load_rule
+from .rules.similarity import NearDuplicateIndex
+from .parsing import TOLERANT_BACKEND, IncrementalParser
+from .source import AST, SourceFile
+
+# Bump whenever rule behaviour changes so cached results are invalidated
+RULESET_VERSION = "5"
+
+# Outcome recorded for files abandoned mid-analysis
+BUDGET_RULE = "budget_exceeded"
+
+
+@dataclass
+class FileReport:
+    """Content-derived results for one file - safe to cache or pickle."""
+    
+    violations: List[Violation]
+    state: Dict[str, List] = field(default_factory=dict)
+    digest: Optional[str] = None
 
 
 class RuleEngine:
@@ -22,30 +39,49 @@ class RuleEngine:
     
     def __init__(self, brutality: str = "professional", config: Dict = None):
         self.brutality = brutality
+        self.config = config
         self.thresholds = self._get_brutality_thresholds(brutality)
         self.cross_file_analyzer = CrossFileAnalyzer()
+        self.profiler = None  # RuleProfiler when running with --profile-rules
         
-        # All available rules
-        all_rules = {
-            "giant_files": detect_giant_files,
-            "import_ceremony": detect_import_ceremony,
-            "duplicate_blocks": detect_duplicate_blocks,
-            "complex_functions": detect_complex_functions,
-            "parameter_hell": detect_parameter_hell,
-            "naming_violations": detect_naming_violations,
-            "magic_numbers": detect_magic_numbers,
-            "over_abstraction": detect_over_abstraction,
-            "commit_violations": detect_commit_violations,
-            "dependency_violations": detect_dependency_violations,
-            "documentation_violations": detect_documentation_violations,
-        }
+        # Built-in and plugin rules - NodeRule classes share one AST walk, functions run as-is
+        available = discover_rules()
         
-        # Filter rules based on config
+        # Filter rules based on config; only enabled rules are ever imported
         if config and "enabled_rules" in config:
             enabled = config["enabled_rules"]
-            self.rules = [rule for name, rule in all_rules.items() if enabled.get(name, True)]
         else:
-            self.rules = list(all_rules.values())
+            enabled = {}
+        all_rules = {}
+        for name, spec in available.items():
+            if enabled.get(name, True):
+                rule = load_rule(spec)
+                if rule is not None:
+                    all_rules[name] = rule
+        self.rule_names = list(all_rules)
+        # Plugin versions go into the cache key alongside RULESET_VERSION
+        self.plugin_versions = {name: available[name].version for name in all_rules if not available[name].builtin}
+        # Cross-file duplicates also need an AST - switchable like any rule
+        self.cross_file = enabled.get("cross_file_duplicates", True)
+        # Copied blocks inside and across functions - off unless a minimum size is set
+        self.clone_min_lines = (config or {}).get("clone_min_lines", 0)
+        self.clone_detector = CloneDetector(self.clone_min_lines) if self.clone_min_lines > 0 else None
+        # Functions that differ by a few statements - off unless a similarity threshold is set
+        self.near_duplicate_threshold = (config or {}).get("near_duplicate_threshold", 0.0)
+        self.near_duplicates = NearDuplicateIndex(self.near_duplicate_threshold) if self.near_duplicate_threshold > 0 else None
+        
+        # Per-file limits so one pathological file can't stall or kill the run
+        self.file_budget_seconds = (config or {}).get("file_budget_seconds", 10.0)
+        self.max_ast_depth = (config or {}).get("max_ast_depth", 1000)
+        
+        # Error-tolerant statement-by-statement parsing instead of one ast.parse per file
+        self.parser_backend = (config or {}).get("parser", "ast")
+        self.parser = IncrementalParser() if self.parser_backend == TOLERANT_BACKEND else None
+        self.rules = list(all_rules.values())
+        
+        # File rules run per file; project and repository rules once per run
+        self.file_rules = [(name, rule) for name, rule in all_rules.items() if scope_of(rule) == FILE]
+        self.project_rules = [(name, rule) for name, rule in all_rules.items() if scope_of(rule) != FILE]
     
     def _get_brutality_thresholds(self, brutality: str) -> Dict:
         """Get detection thresholds based on brutality level."""
@@ -82,30 +118,177 @@ class RuleEngine:
     
     def analyze_file(self, file_path: Path) -> List[Violation]:
         """Run all rules against a file."""
-        violations = []
+        content = self.read(file_path)
+        if content is None:
+            return []
+        return self.analyze_source(file_path, content)
+    
+    def analyze_source(self, file_path: Path, content: str) -> List[Violation]:
+        """Run file-scoped rules against already-read file content.
         
+        Artifacts are built on demand from a SourceFile, so a Python file is
+        only parsed when an enabled rule or cross-file analysis needs the AST.
+        A file that runs past its time or depth budget, or recurses too deep,
+        yields a single budget_exceeded violation instead of partial results.
+        """
+        budget = Budget(self.file_budget_seconds, self.max_ast_depth)
         try:
-            content = file_path.read_text(encoding='utf-8')
-            tree = None
+            return self._analyze_source(file_path, content, budget)
+        except RecursionError:
+            return self._skipped(file_path, BudgetExceeded("recursion", sys.getrecursionlimit()))
+        except BudgetExceeded as e:
+            return self._skipped(file_path, e)
+    
+    def _skipped(self, file_path: Path, error: BudgetExceeded) -> List[Violation]:
+        # Drop any cross-file state collected before giving up
+        self.forget_file(file_path)
+        return [Violation(
+            rule=BUDGET_RULE,
+            file_path=str(file_path),
+            line_number=1,
+            severity="gentle",
+            message=f"Skipped: analysis budget exceeded ({error.reason} limit {error.limit})",
+            context={"reason": error.reason, "limit": error.limit}
+        )]
+    
+    def _analyze_source(self, file_path: Path, content: str, budget: Budget) -> List[Violation]:
+        source = SourceFile(file_path, content, self.parser, self.profiler)
+        profiler = self.profiler
+        
+        tree = None
+        wants_tree = self.cross_file or self.near_duplicates or any(AST in requires_of(rule) for _, rule in self.file_rules)
+        if source.is_python and wants_tree:
+            with profiler.time_parse(file_path) if profiler else nullcontext():
+                tree = source.tree
+            budget.check_time()
+        
+        # Rules that need an AST have nothing to look at without one
+        rules = [
+            (name, self._instantiate(rule, source, tree))
+            for name, rule in self.file_rules
+            if tree is not None or AST not in requires_of(rule)
+        ]
+        
+        if tree is not None:
+            # One walk feeds every node rule plus cross-file collection
+            node_rules = [(name, rule) for name, rule in rules if rule.walks]
+            collector = self.cross_file_analyzer.collector(file_path, source) if self.cross_file else None
+            if collector:
+                node_rules.append(("cross_file_fingerprints", collector))
+            signatures = self.near_duplicates.collector(file_path, source) if self.near_duplicates else None
+            if signatures:
+                node_rules.append(("near_duplicate_signatures", signatures))
             
-            # Only parse Python files with AST
-            if file_path.suffix == '.py':
-                try:
-                    tree = ast.parse(content)
-                    # Collect for cross-file analysis
-                    self.cross_file_analyzer.collect_function_fingerprints(file_path, tree)
-                except SyntaxError:
-                    pass
+            wrap = None
+            if profiler:
+                names = {id(rule): name for name, rule in node_rules}
+                wrap = lambda rule, handler: profiler.wrap_handler(names[id(rule)], file_path, handler)
             
-            # Run all rules
-            for rule in self.rules:
-                violations.extend(rule(file_path, content, tree, self.thresholds))
-                
-        except UnicodeDecodeError:
-            pass
+            walk_rules(tree, [rule for _, rule in node_rules], wrap, budget)
+            if collector:
+                with self._timing("cross_file_fingerprints", file_path):
+                    collector.finish()
+            if signatures:
+                with self._timing("near_duplicate_signatures", file_path):
+                    signatures.finish()
+        
+        if self.clone_detector and source.is_python:
+            with self._timing("copied_blocks", file_path):
+                self.clone_detector.collect(file_path, source.tokens)
+        
+        violations = []
+        for name, rule in rules:
+            budget.check_time()
+            with self._timing(name, file_path):
+                violations.extend(rule.finish())
             
         return violations
     
+    def read(self, file_path: Path) -> Optional[str]:
+        """read_source, timed when profiling."""
+        with self.profiler.time_read(file_path) if self.profiler else nullcontext():
+            return read_source(file_path)
+    
+    def _timing(self, rule_name: str, file_path: Optional[Path] = None):
+        return self.profiler.time_rule(rule_name, file_path) if self.profiler else nullcontext()
+    
+    def _instantiate(self, rule, source: SourceFile, tree: Optional[ast.AST]) -> NodeRule:
+        """Fresh per-file rule instance, wrapping function-style rules."""
+        if isinstance(rule, type) and issubclass(rule, NodeRule):
+            return rule(source.path, source.text, self.thresholds, source)
+        tree = tree if AST in requires_of(rule) else None
+        return FunctionRule(rule, source.path, source.text, tree, self.thresholds, source)
+    
+    def analyze_project(self, root: Path, project_dirs: Optional[List[Path]] = None) -> List[Violation]:
+        """Run repository-scoped rules once for root, project-scoped rules once per project.
+        
+        project_dirs are the directories holding manifests below root; root
+        itself always runs, so a manifest above the analysis root is found.
+        """
+        dirs = list(dict.fromkeys([root, *(project_dirs or [])]))
+        violations = []
+        for name, rule in self.project_rules:
+            with self._timing(name):
+                for target in (dirs if scope_of(rule) == PROJECT else [root]):
+                    violations.extend(rule(target, "", None, self.thresholds))
+        return violations
+    
+    def report_source(self, file_path: Path, content: str) -> FileReport:
+        """Analyze content and package the results with cross-file state."""
+        return FileReport(
+            violations=self.analyze_source(file_path, content),
+            state=self.export_file_state(file_path),
+            digest=content_digest(content)
+        )
+    
+    def export_file_state(self, file_path: Path) -> Dict[str, List]:
+        """Cross-file state collected for one file, picklable for merging."""
+        state = {"functions": self.cross_file_analyzer.export_file(str(file_path))}
+        if self.clone_detector:
+            state["windows"] = self.clone_detector.export_file(str(file_path))
+        if self.near_duplicates:
+            state["signatures"] = self.near_duplicates.export_file(str(file_path))
+        return state
+    
+    def import_file_state(self, file_path: Path, state: Dict[str, List]):
+        """Merge cross-file state that another engine collected for a file."""
+        self.cross_file_analyzer.add_file(str(file_path), state["functions"])
+        if self.clone_detector:
+            self.clone_detector.add_file(str(file_path), state.get("windows", []))
+        if self.near_duplicates:
+            self.near_duplicates.add_file(str(file_path), state.get("signatures", []))
+    
+    def forget_file(self, file_path: Path):
+        """Drop all cross-file state collected for one file."""
+        self.cross_file_analyzer.remove_file(str(file_path))
+        if self.clone_detector:
+            self.clone_detector.remove_file(str(file_path))
+        if self.near_duplicates:
+            self.near_duplicates.remove_file(str(file_path))
+    
+    def forget_source(self, file_path: Path):
+        """Drop parse state kept for a file that no longer exists."""
+        if self.parser:
+            self.parser.forget(file_path)
+    
     def get_cross_file_violations(self) -> List[Violation]:
-        """Generate violations for cross-file duplicates."""
-        return self.cross_file_analyzer.get_violations()
\ No newline at end of file
+        """Generate violations for cross-file duplicates, copied blocks and near-duplicates."""
+        violations = self.cross_file_analyzer.get_violations()
+        if self.clone_detector:
+            violations.extend(self.clone_detector.get_violations())
+        if self.near_duplicates:
+            violations.extend(self.near_duplicates.get_violations())
+        return violations
+
+
+def read_source(file_path: Path) -> Optional[str]:
+    """Read a file as UTF-8, None if it isn't text we can analyze."""
+    try:
+        return file_path.read_text(encoding='utf-8')
+    except UnicodeDecodeError:
+        return None
+
+
+def content_digest(content: str) -> str:
+    """Stable hash of file content for cache validation."""
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""Persistent fingerprint index under .shitlint/cache, for cross-file duplicates without a full run."""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .cache import CACHE_DIR
+from .engine import RULESET_VERSION
+from .rules.duplicates import FINGERPRINT_BYTES
+
+INDEX_FILE = "fingerprints.db"
+
+# What the rows were written with - any difference and they can't be matched
+META = {"ruleset": RULESET_VERSION, "fingerprint_bytes": str(FINGERPRINT_BYTES)}
+
+# A directory holding one of these is a project root; find() doesn't look above it
+PROJECT_MARKERS = (Path(".git"), Path(".shitlint") / "config.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    digest TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    fingerprint INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS functions_by_fingerprint ON functions (fingerprint);
+CREATE INDEX IF NOT EXISTS functions_by_file ON functions (file_id);
+"""
+
+RESET = """
+DROP TABLE IF EXISTS functions;
+DROP TABLE IF EXISTS files;
+DELETE FROM meta;
+"""
+
+Entry = Tuple[int, str, int]  # (fingerprint, function name, line), as CrossFileAnalyzer exports
+
+
+def _signed(fingerprint: int) -> int:
+    # SQLite integers are signed 64-bit
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def _entries_digest(entries: List[Entry]) -> str:
+    return hashlib.blake2b(json.dumps([list(e) for e in entries]).encode(), digest_size=8).hexdigest()
+
+
+class FingerprintIndex:
+    """Function fingerprints for every Python file a directory run saw.
+
+    Rows map fingerprint -> (file, function, line), with a reverse index by
+    file so a changed file's rows are replaced without touching the rest.
+    Paths are stored relative to the project root. An index written by
+    another ruleset or fingerprint width is emptied when opened. Like the
+    result cache this is best effort: a read-only checkout just runs
+    without it.
+    """
+    
+    def __init__(self, root: Path, connection: sqlite3.Connection):
+        self.root = root
+        self.connection = connection
+        self._files: Optional[Dict[str, Tuple[int, str, int, int]]] = None  # path -> (id, digest, mtime_ns, size)
+    
+    @classmethod
+    def open(cls, root: Path) -> Optional["FingerprintIndex"]:
+        """Open or create the index for a project root."""
+        path = root / CACHE_DIR / INDEX_FILE
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            gitignore = path.parent / ".gitignore"
+            if not gitignore.exists():
+                gitignore.write_text("*\n")
+            connection = sqlite3.connect(path)
+            connection.executescript(SCHEMA)
+            if dict(connection.execute("SELECT key, value FROM meta")) != META:
+                connection.executescript(RESET + SCHEMA)
+                connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", META.items())
+                connection.commit()
+        except (OSError, sqlite3.Error):
+            return None
+        return cls(root, connection)
+    
+    @classmethod
+    def find(cls, file_path: Path) -> Optional["FingerprintIndex"]:
+        """The index of the nearest enclosing directory that has one, within the file's project."""
+        for parent in file_path.resolve().parents:
+            if (parent / CACHE_DIR / INDEX_FILE).is_file():
+                return cls.open(parent)
+            if any((parent / marker).exists() for marker in PROJECT_MARKERS):
+                return None
+        return None
+    
+    def __enter__(self) -> "FingerprintIndex":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        try:
+            self.connection.commit()
+        except sqlite3.Error:
+            pass  # Locked by another run - this run's updates are dropped
+        finally:
+            self.connection.close()
+    
+    def _key(self, file_path: Path) -> str:
+        try:
+            return file_path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return file_path.as_posix()
+    
+    def _path(self, key: str) -> Path:
+        return self.root / key
+    
+    def _known_files(self) -> Dict[str, Tuple[int, str, int, int]]:
+        if self._files is None:
+            rows = self.connection.execute("SELECT path, id, digest, mtime_ns, size FROM files")
+            self._files = {path: (file_id, digest, mtime_ns, size) for path, file_id, digest, mtime_ns, size in rows}
+        return self._files
+    
+    def replace_file(self, file_path: Path, entries: List[Entry]) -> bool:
+        """Make one file's rows match entries; False when they already did."""
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+        key = self._key(file_path)
+        digest = _entries_digest(entries)
+        known = self._known_files().get(key)
+        
+        if known and known[1] == digest:
+            if known[2:] != (stat.st_mtime_ns, stat.st_size):
+                self.connection.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                                        (stat.st_mtime_ns, stat.st_size, known[0]))
+                self._files[key] = (known[0], digest, stat.st_mtime_ns, stat.st_size)
+            return False
+        
+        if known:
+            file_id = known[0]
+            self.connection.execute("DELETE FROM functions WHERE file_id = ?", (file_id,))
+            self.connection.execute("UPDATE files SET digest = ?, mtime_ns = ?, size = ? WHERE id = ?",
+                                    (digest, stat.st_mtime_ns, stat.st_size, file_id))
+        else:
+            file_id = self.connection.execute(
+                "INSERT INTO files (path, digest, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                (key, digest, stat.st_mtime_ns, stat.st_size)
+            ).lastrowid
+        self.connection.executemany(
+            "INSERT INTO functions (fingerprint, file_id, name, line) VALUES (?, ?, ?, ?)",
+            [(_signed(fingerprint), file_id, name, line) for fingerprint, name, line in entries]
+        )
+        self._files[key] = (file_id, digest, stat.st_mtime_ns, stat.st_size)
+        return True
+    
+    def retain(self, file_paths: Iterable[Path]):
+        """Drop rows for files a full run no longer saw."""
+        keep = {self._key(file_path) for file_path in file_paths}
+        for key, (file_id, *_) in list(self._known_files().items()):
+            if key not in keep:
+                self.connection.execute("DELETE FROM functions WHERE file_id = ?", (file_id,))
+                self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                del self._files[key]
+    
+    def matching_files(self, fingerprints: Set[int], exclude: Optional[Path] = None) -> Dict[Path, List[Entry]]:
+        """Rows sharing any of fingerprints, grouped by file.
+
+        Files edited since their rows were written are left out - their
+        line numbers can't be trusted until the next run re-indexes them.
+        """
+        excluded = self._key(exclude) if exclude else None
+        matches: Dict[str, List[Entry]] = {}
+        for fingerprint in fingerprints:
+            rows = self.connection.execute(
+                "SELECT files.path, functions.name, functions.line FROM functions "
+                "JOIN files ON files.id = functions.file_id WHERE functions.fingerprint = ?",
+                (_signed(fingerprint),)
+            )
+            for key, name, line in rows:
+                if key != excluded:
+                    matches.setdefault(key, []).append((fingerprint, name, line))
+        
+        known = self._known_files()
+        fresh = {}
+        for key, entries in matches.items():
+            try:
+                stat = self._path(key).stat()
+            except OSError:
+                continue
+            if known[key][2:] == (stat.st_mtime_ns, stat.st_size):
+                fresh[self._path(key)] = sorted(entries, key=lambda entry: entry[2])
+        return fresh
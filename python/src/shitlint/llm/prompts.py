@@ -1,9 +1,11 @@
 """Shared prompt logic - no more copy-paste bullshit."""
 
 import json
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 from ..core import ShitLintResult, AnalysisContext
+from ..engine import read_source
+from ..source import SourceIndex
 
 
 def build_roast_prompt(violations: str, context: str, analysis_context: Optional[AnalysisContext] = None) -> str:
@@ -93,13 +95,14 @@ def format_violations(results: List[ShitLintResult]) -> str:
     if not results:
         return "No violations detected"
     
+    indexes: Dict[str, Optional[SourceIndex]] = {}  # Each file read once, however many snippets
     formatted = []
     for r in results:
         violation_text = f"- {r.severity.upper()}: {r.file_path}:{r.line_number or '?'} - {r.message}"
         
         # Add code snippet for critical violations
         if r.severity.upper() == "CRITICAL" and r.line_number:
-            code_snippet = _extract_code_snippet(r.file_path, r.line_number)
+            code_snippet = _extract_code_snippet(r.file_path, r.line_number, indexes=indexes)
             if code_snippet:
                 violation_text += f"\n```python\n{code_snippet}\n```"
         
@@ -108,25 +111,31 @@ def format_violations(results: List[ShitLintResult]) -> str:
     return "\n".join(formatted)
 
 
-def _extract_code_snippet(file_path: str, line_number: int, context_lines: int = 3) -> str:
+def _source_index(file_path: str, indexes: Dict[str, Optional[SourceIndex]]) -> Optional[SourceIndex]:
+    """SourceIndex for a file, shared across calls through indexes."""
+    if file_path not in indexes:
+        try:
+            content = read_source(Path(file_path))
+        except OSError:
+            content = None
+        indexes[file_path] = SourceIndex(content) if content is not None else None
+    return indexes[file_path]
+
+
+def _extract_code_snippet(file_path: str, line_number: int, context_lines: int = 3,
+                          indexes: Optional[Dict[str, Optional[SourceIndex]]] = None) -> str:
     """Extract code snippet around violation line."""
-    try:
-        path = Path(file_path)
-        if not path.exists():
-            return ""
+    index = _source_index(file_path, {} if indexes is None else indexes)
+    if index is None:
+        return ""
         
-        with open(path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+    start = max(1, line_number - context_lines)
+    end = min(index.line_count, line_number + context_lines)
         
-        start = max(0, line_number - context_lines - 1)
-        end = min(len(lines), line_number + context_lines)
+    snippet_lines = []
+    for i in range(start, end + 1):
+        marker = ">>> " if i == line_number else "    "
+        snippet_lines.append(f"{marker}{i:3d}: {index.line(i).rstrip()}")
         
-        snippet_lines = []
-        for i in range(start, end):
-            marker = ">>> " if i == line_number - 1 else "    "
-            snippet_lines.append(f"{marker}{i+1:3d}: {lines[i].rstrip()}")
-        
-        return "\n".join(snippet_lines)
-    
-    except Exception:
-        return ""
\ No newline at end of file
+    return "\n".join(snippet_lines)
+        
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""Process-pool analysis - one RuleEngine per worker, merged in the parent."""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .engine import FileReport, RuleEngine, read_source
+
+# Each worker process builds its own engine once
+_worker_engine: Optional[RuleEngine] = None
+# Set by the parent when it stops early, so running chunks end after the current file
+_worker_cancel = None
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """0 or None means one job per CPU."""
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def iter_parallel(engine: RuleEngine, files: List[Path], jobs: int) -> Iterator[Tuple[Path, Optional[FileReport]]]:
+    """Fan files out to a process pool, yielding reports in input order.
+    
+    Each worker returns a FileReport holding the violations plus the
+    cross-file state for the file; that state is merged into engine in input
+    order, so cross-file results match a serial run exactly. Reports are None
+    for files that aren't valid UTF-8.
+    """
+    chunk_size = max(1, min(32, len(files) // (jobs * 4)))
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    
+    cancel = multiprocessing.Event()
+    pool = ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(engine.brutality, engine.config, cancel)
+    )
+    pending = deque()
+    try:
+        chunk_iter = iter(chunks)
+        
+        # Keep a bounded number of chunks in flight instead of submitting all
+        for chunk in chunk_iter:
+            pending.append((chunk, pool.submit(_analyze_chunk, chunk)))
+            if len(pending) >= jobs * 2:
+                break
+        
+        while pending:
+            chunk, future = pending.popleft()
+            for file_path, report in zip(chunk, future.result()):
+                if report is not None:
+                    engine.import_file_state(file_path, report.state)
+                yield file_path, report
+            
+            next_chunk = next(chunk_iter, None)
+            if next_chunk is not None:
+                pending.append((next_chunk, pool.submit(_analyze_chunk, next_chunk)))
+    finally:
+        # Consumer stopped early or something failed - don't start queued work,
+        # and cut short the chunks already running
+        cancel.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _init_worker(brutality: str, config: Optional[Dict], cancel=None):
+    global _worker_engine, _worker_cancel
+    _worker_engine = RuleEngine(brutality=brutality, config=config)
+    _worker_cancel = cancel
+
+
+def _analyze_chunk(files: List[Path]) -> List[Optional[FileReport]]:
+    """Analyze files in a worker, handing cross-file state back to the parent."""
+    reports = []
+    for file_path in files:
+        if _worker_cancel is not None and _worker_cancel.is_set():
+            break  # Parent has stopped reading - the partial chunk is discarded
+        content = read_source(file_path)
+        if content is None:
+            reports.append(None)
+            continue
+        reports.append(_worker_engine.report_source(file_path, content))
+        _worker_engine.forget_file(file_path)
+    return reports
@@ -0,0 +1,218 @@
+"""Error-tolerant, incremental parsing for the tolerant backend.
+
+Rules keep consuming `ast` nodes - that stays the common node API. What
+changes is how the module tree is built: the file is split into top-level
+statements (by tree-sitter when the tree-sitter extra provides a Python
+grammar, otherwise by the tokenizer), statements that don't parse are left out instead of losing
+the whole file, and parsed statements are remembered per file so an edit
+only re-parses the statements whose text changed.
+"""
+
+import ast
+import io
+import tokenize
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+AST_BACKEND = "ast"
+TOLERANT_BACKEND = "tolerant"
+
+# Keywords that continue the compound statement above them
+CONTINUATIONS = {"else", "elif", "except", "finally"}
+
+
+def statement_starts(text: str) -> List[int]:
+    """First line of each top-level statement, from the tokenizer.
+    
+    Decorators stay with their definition and else/except clauses with
+    their statement. Past a tokenizer error, any line starting in column 0
+    begins a new statement so the rest of the file can still be parsed.
+    """
+    starts = [1]
+    depth = 0
+    line_start = True  # Next significant token begins a logical line
+    decorated = False
+    last_line = 1
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(text).readline):
+            if token.type == tokenize.INDENT:
+                depth += 1
+            elif token.type == tokenize.DEDENT:
+                depth -= 1
+            elif token.type == tokenize.NEWLINE:
+                line_start = True
+            elif token.type == tokenize.ENDMARKER:
+                break
+            elif token.type not in (tokenize.NL, tokenize.COMMENT) and line_start:
+                line_start = False
+                last_line = token.start[0]
+                if depth == 0:
+                    if not decorated and token.string not in CONTINUATIONS and last_line > starts[-1]:
+                        starts.append(last_line)
+                    decorated = token.string == "@"
+    except (tokenize.TokenError, SyntaxError):
+        lines = text.split('\n')
+        for lineno in range(last_line + 1, len(lines) + 1):
+            line = lines[lineno - 1]
+            if line[:1].strip() and line[0] not in "#)]}" and line.split(None, 1)[0].rstrip(":") not in CONTINUATIONS:
+                starts.append(lineno)
+    return starts
+
+
+def _tree_sitter_language():
+    """Python grammar from tree_sitter_languages, None if it isn't installed."""
+    try:
+        from tree_sitter_languages import get_language
+        return get_language("python")
+    except Exception:  # Not installed, or grammar and binding versions disagree
+        return None
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _point(data: bytes, offset: int) -> Tuple[int, int]:
+    row = data.count(b'\n', 0, offset)
+    return row, offset - (data.rfind(b'\n', 0, offset) + 1)
+
+
+class TreeSitterSplitter:
+    """Top-level statement lines from tree-sitter, re-parsing incrementally."""
+    
+    def __init__(self, language):
+        from tree_sitter import Parser
+        self.parser = Parser()
+        self.parser.set_language(language)
+        self.trees: Dict[str, Tuple[bytes, object]] = {}  # Last bytes and tree per file
+    
+    def starts(self, key: str, text: str, retain: bool) -> List[int]:
+        data = text.encode('utf-8')
+        previous = self.trees.get(key)
+        if previous:
+            old_data, old_tree = previous
+            # Describe the edit as one replaced span so unchanged subtrees are reused
+            start = _common_prefix(old_data, data)
+            suffix = _common_prefix(old_data[start:][::-1], data[start:][::-1])
+            old_end, new_end = len(old_data) - suffix, len(data) - suffix
+            old_tree.edit(
+                start_byte=start, old_end_byte=old_end, new_end_byte=new_end,
+                start_point=_point(old_data, start),
+                old_end_point=_point(old_data, old_end),
+                new_end_point=_point(data, new_end),
+            )
+            tree = self.parser.parse(data, old_tree)
+        else:
+            tree = self.parser.parse(data)
+        if retain:
+            self.trees[key] = (data, tree)
+        
+        starts = [1]
+        for node in tree.root_node.children:
+            line = node.start_point[0] + 1
+            if node.type != "comment" and line > starts[-1]:
+                starts.append(line)
+        return starts
+    
+    def forget(self, key: str):
+        self.trees.pop(key, None)
+
+
+@dataclass
+class Chunk:
+    """One top-level statement's text and its parsed nodes."""
+    
+    text: str
+    start: int  # Line the nodes are currently numbered from
+    body: Optional[List[ast.stmt]]  # None when the statement doesn't parse
+
+
+class IncrementalParser:
+    """Builds module trees statement by statement, reusing unchanged statements.
+    
+    With retain off nothing is remembered between calls - the mode for
+    one-shot runs. Watch mode and the daemon turn it on.
+    """
+    
+    def __init__(self, retain: bool = False):
+        language = _tree_sitter_language()
+        self.splitter = TreeSitterSplitter(language) if language is not None else None
+        self.retain = retain
+        self.files: Dict[str, List[Chunk]] = {}
+        self.parses = 0  # ast.parse calls made, whole files and single statements
+    
+    @property
+    def backend(self) -> str:
+        """Where statement boundaries come from."""
+        return "tree-sitter" if self.splitter else "tokenize"
+    
+    def parse(self, path: Path, text: str) -> ast.Module:
+        key = str(path)
+        starts = self.splitter.starts(key, text, self.retain) if self.splitter else statement_starts(text)
+        lines = text.split('\n')
+        bounds = starts + [len(lines) + 1]
+        
+        reusable: Dict[str, List[Chunk]] = {}
+        for chunk in self.files.get(key, []):
+            reusable.setdefault(chunk.text, []).append(chunk)
+        
+        # Nothing to reuse - one parse of the whole file is cheapest when it succeeds
+        whole = self._parse_whole(text) if not reusable else None
+        position = 0
+        
+        chunks = []
+        body = []
+        for first, stop in zip(bounds, bounds[1:]):
+            chunk_text = '\n'.join(lines[first - 1:stop - 1])
+            if reusable.get(chunk_text):
+                chunk = reusable[chunk_text].pop()
+                if chunk.body and chunk.start != first:
+                    for node in chunk.body:
+                        ast.increment_lineno(node, first - chunk.start)
+                chunk.start = first
+            elif whole is not None:
+                end = position
+                while end < len(whole) and whole[end].lineno < stop:
+                    end += 1
+                chunk = Chunk(chunk_text, first, whole[position:end])
+                position = end
+            else:
+                chunk = Chunk(chunk_text, first, self._parse_statement(chunk_text, first))
+            
+            chunks.append(chunk)
+            body.extend(chunk.body or [])
+        
+        if self.retain:
+            self.files[key] = chunks
+        return ast.Module(body=body, type_ignores=[])
+    
+    def _parse_whole(self, text: str) -> Optional[List[ast.stmt]]:
+        self.parses += 1
+        try:
+            return ast.parse(text).body
+        except (SyntaxError, ValueError):
+            return None
+    
+    def _parse_statement(self, text: str, first: int) -> Optional[List[ast.stmt]]:
+        self.parses += 1
+        try:
+            body = ast.parse(text).body
+        except (SyntaxError, ValueError):
+            return None
+        for node in body:
+            ast.increment_lineno(node, first - 1)
+        return body
+    
+    def forget(self, path: Path):
+        """Drop what was remembered for a file that no longer exists."""
+        self.files.pop(str(path), None)
+        if self.splitter:
+            self.splitter.forget(str(path))
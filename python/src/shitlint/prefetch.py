@@ -0,0 +1,36 @@
+"""Read-ahead pipeline - reader threads keep the analysis stage fed."""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+from .engine import read_source
+
+
+def iter_prefetched(files: Iterable[Path], threads: int = 4, depth: int = 32) -> Iterator[Tuple[Path, Optional[str]]]:
+    """Yield (path, content) in input order while later files are being read.
+    
+    At most depth reads are queued ahead of the consumer, so memory stays
+    bounded. Content is None for files that aren't valid UTF-8.
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="shitlint-read")
+    pending = deque()
+    try:
+        file_iter = iter(files)
+        for file_path in file_iter:
+            pending.append((file_path, pool.submit(read_source, file_path)))
+            if len(pending) >= max(1, depth):
+                break
+        
+        while pending:
+            file_path, future = pending.popleft()
+            
+            # Top the queue back up before handing this file to the consumer
+            next_path = next(file_iter, None)
+            if next_path is not None:
+                pending.append((next_path, pool.submit(read_source, next_path)))
+            
+            yield file_path, future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,133 @@
+"""Rule and file timing for --profile-rules."""
+
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class RuleStats:
+    """Accumulated cost of one rule across every file."""
+    
+    seconds: float = 0.0
+    calls: int = 0  # Node handler invocations plus per-file finish() calls
+    files: int = 0
+
+
+@dataclass
+class FileStats:
+    """Where the time went for one file."""
+    
+    read: float = 0.0
+    parse: float = 0.0
+    rules: float = 0.0
+    
+    @property
+    def total(self) -> float:
+        return self.read + self.parse + self.rules
+
+
+class RuleProfiler:
+    """Collects wall time per rule and per file while the engine runs."""
+    
+    def __init__(self):
+        self.rules: Dict[str, RuleStats] = {}
+        self.files: Dict[str, FileStats] = {}
+        self._shared = 0.0  # Seconds spent in time_shared so far, taken out of the enclosing rule
+    
+    def file(self, file_path: Path) -> FileStats:
+        return self.files.setdefault(str(file_path), FileStats())
+    
+    @contextmanager
+    def time_read(self, file_path: Path) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.file(file_path).read += time.perf_counter() - start
+    
+    @contextmanager
+    def time_parse(self, file_path: Path) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.file(file_path).parse += time.perf_counter() - start
+    
+    @contextmanager
+    def time_rule(self, rule_name: str, file_path: Optional[Path] = None) -> Iterator[None]:
+        """Time one rule call - finish(), a function rule, or a project-wide pass."""
+        stats = self.rules.setdefault(rule_name, RuleStats())
+        start, shared = time.perf_counter(), self._shared
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start - (self._shared - shared)
+            stats.seconds += elapsed
+            stats.calls += 1
+            if file_path is not None:
+                stats.files += 1
+                self.file(file_path).rules += elapsed
+    
+    @contextmanager
+    def time_shared(self, name: str, file_path: Path) -> Iterator[None]:
+        """Time work several rules share, like hashing a function once for every duplicate rule.
+        
+        It gets its own row instead of being charged to whichever rule
+        happened to ask first.
+        """
+        stats = self.rules.setdefault(name, RuleStats())
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.seconds += elapsed
+            stats.calls += 1
+            self.file(file_path).rules += elapsed
+            self._shared += elapsed
+    
+    def wrap_handler(self, rule_name: str, file_path: Path, handler: Callable) -> Callable:
+        """Time every call of one node handler during the shared walk."""
+        stats = self.rules.setdefault(rule_name, RuleStats())
+        file_stats = self.file(file_path)
+        
+        def timed(node, parent):
+            start, shared = time.perf_counter(), self._shared
+            try:
+                handler(node, parent)
+            finally:
+                elapsed = time.perf_counter() - start - (self._shared - shared)
+                stats.seconds += elapsed
+                stats.calls += 1
+                file_stats.rules += elapsed
+        
+        return timed
+    
+    def slowest_rules(self) -> List[Tuple[str, RuleStats]]:
+        return sorted(self.rules.items(), key=lambda item: item[1].seconds, reverse=True)
+    
+    def slowest_files(self, top: int = 10) -> List[Tuple[str, FileStats]]:
+        return sorted(self.files.items(), key=lambda item: item[1].total, reverse=True)[:top]
+    
+    def to_dict(self, top: int = 10) -> Dict:
+        """Report as plain data, stable enough to diff across releases."""
+        return {
+            "rules": {name: asdict(stats) for name, stats in self.slowest_rules()},
+            "slowest_files": [
+                dict(asdict(stats), file=name, total=stats.total)
+                for name, stats in self.slowest_files(top)
+            ],
+            "totals": {
+                "files": len(self.files),
+                "read": sum(s.read for s in self.files.values()),
+                "parse": sum(s.parse for s in self.files.values()),
+                "rules": sum(s.rules for s in self.files.values()),
+            },
+        }
+    
+    def dump_json(self, path: Path, top: int = 10):
+        path.write_text(json.dumps(self.to_dict(top), indent=2))
@@ -1,5 +1,6 @@
 """ShitLint rule engine and violation detection."""
 
-from .base import Violation
+from .base import FunctionRule, NodeRule, Violation, walk_rules
+from .registry import ENTRY_POINT_GROUP, RuleSpec, discover_rules
 
-__all__ = ["Violation"]
\ No newline at end of file
+__all__ = ["Violation", "NodeRule", "FunctionRule", "walk_rules", "ENTRY_POINT_GROUP", "RuleSpec", "discover_rules"]
\ No newline at end of file
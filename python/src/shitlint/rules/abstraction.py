@@ -4,118 +4,124 @@ from pathlib import Path
 from typing import List, Dict, Set
 import ast
 
-from .base import Violation
+from ..source import SourceFile
+from .base import NodeRule, Violation
 
 
 def detect_over_abstraction(file_path: Path, content: str, tree: ast.AST, thresholds: Dict) -> List[Violation]:
     """Detect unnecessary abstraction layers and architectural bloat."""
-    violations = []
-    
-    # Skip if not a Python file
-    if tree is None:
-        return violations
-    
-    # Track inheritance chains and class relationships
-    class_info = {}
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef):
-            class_info[node.name] = {
-                'node': node,
-                'bases': [base.id for base in node.bases if isinstance(base, ast.Name)],
-                'methods': [n for n in node.body if isinstance(n, ast.FunctionDef)],
-                'abstract_methods': [],
-                'delegation_methods': 0,
-                'total_methods': 0
-            }
+    return OverAbstractionRule.detect(file_path, content, tree, thresholds)
+    
+    
+class OverAbstractionRule(NodeRule):
+    """Collects class shapes during the walk, judges them once it is done."""
             
-            # Analyze methods
-            for method in class_info[node.name]['methods']:
-                class_info[node.name]['total_methods'] += 1
+    def __init__(self, file_path: Path, content: str = "", thresholds: Dict = None, source: SourceFile = None):
+        super().__init__(file_path, content, thresholds, source)
+        # Track inheritance chains and class relationships
+        self.class_info = {}
                 
-                # Check for abstract methods (only raise NotImplementedError)
-                if len(method.body) == 1 and isinstance(method.body[0], ast.Raise):
-                    exc = method.body[0].exc
-                    if isinstance(exc, ast.Name) and exc.id == 'NotImplementedError':
-                        class_info[node.name]['abstract_methods'].append(method.name)
-                    elif isinstance(exc, ast.Call) and isinstance(exc.func, ast.Name) and exc.func.id == 'NotImplementedError':
-                        class_info[node.name]['abstract_methods'].append(method.name)
+    def visit_ClassDef(self, node, parent):
+        self.class_info[node.name] = {
+            'node': node,
+            'bases': [base.id for base in node.bases if isinstance(base, ast.Name)],
+            'methods': [n for n in node.body if isinstance(n, ast.FunctionDef)],
+            'abstract_methods': [],
+            'delegation_methods': 0,
+            'total_methods': 0
+        }
                 
-                # Check for pure delegation
-                if _is_pure_delegation(method):
-                    class_info[node.name]['delegation_methods'] += 1
-    
-    # Detect violations
-    for class_name, info in class_info.items():
-        node = info['node']
+        # Analyze methods
+        for method in self.class_info[node.name]['methods']:
+            self.class_info[node.name]['total_methods'] += 1
+    
+            # Check for abstract methods (only raise NotImplementedError)
+            if len(method.body) == 1 and isinstance(method.body[0], ast.Raise):
+                exc = method.body[0].exc
+                if isinstance(exc, ast.Name) and exc.id == 'NotImplementedError':
+                    self.class_info[node.name]['abstract_methods'].append(method.name)
+                elif isinstance(exc, ast.Call) and isinstance(exc.func, ast.Name) and exc.func.id == 'NotImplementedError':
+                    self.class_info[node.name]['abstract_methods'].append(method.name)
         
-        # 1. God abstractions - too many abstract methods
-        if len(info['abstract_methods']) >= 10:
-            violations.append(Violation(
-                rule="god_abstraction",
-                file_path=str(file_path),
-                line_number=node.lineno,
-                severity="brutal",
-                message=f"Class '{class_name}' is a god abstraction with {len(info['abstract_methods'])} abstract methods",
-                context={"abstract_count": len(info['abstract_methods'])}
-            ))
+            # Check for pure delegation
+            if _is_pure_delegation(method):
+                self.class_info[node.name]['delegation_methods'] += 1
         
-        # 2. Wrapper hell - classes that mostly delegate
-        if info['total_methods'] > 1 and info['delegation_methods'] >= info['total_methods'] * 0.7:
-            violations.append(Violation(
-                rule="wrapper_hell",
-                file_path=str(file_path),
-                line_number=node.lineno,
-                severity="brutal",
-                message=f"Class '{class_name}' is wrapper hell - {info['delegation_methods']}/{info['total_methods']} methods just delegate",
-                context={"delegation_ratio": info['delegation_methods'] / info['total_methods']}
-            ))
+    def finish(self) -> List[Violation]:
+        class_info = self.class_info
         
-        # 3. Inheritance depth check
-        depth = _calculate_inheritance_depth(class_name, class_info, set())
-        if depth > 4:
-            violations.append(Violation(
-                rule="inheritance_hell",
-                file_path=str(file_path),
-                line_number=node.lineno,
-                severity="brutal",
-                message=f"Class '{class_name}' has inheritance depth of {depth} - delete some layers",
-                context={"depth": depth}
-            ))
-        elif depth > 3:
-            violations.append(Violation(
-                rule="inheritance_hell",
-                file_path=str(file_path),
-                line_number=node.lineno,
-                severity="moderate",
-                message=f"Class '{class_name}' has inheritance depth of {depth} - consider flattening",
-                context={"depth": depth}
-            ))
+        # Detect violations
+        for class_name, info in class_info.items():
+            node = info['node']
         
-        # 4. Pointless factory detection
-        if _is_pointless_factory(class_name, info):
-            violations.append(Violation(
-                rule="pointless_factory",
-                file_path=str(file_path),
-                line_number=node.lineno,
-                severity="moderate",
-                message=f"Class '{class_name}' is a pointless factory - just use direct instantiation",
-                context={}
-            ))
+            # 1. God abstractions - too many abstract methods
+            if len(info['abstract_methods']) >= 10:
+                self.violations.append(Violation(
+                    rule="god_abstraction",
+                    file_path=str(self.file_path),
+                    line_number=node.lineno,
+                    severity="brutal",
+                    message=f"Class '{class_name}' is a god abstraction with {len(info['abstract_methods'])} abstract methods",
+                    context={"abstract_count": len(info['abstract_methods'])}
+                ))
+        
+            # 2. Wrapper hell - classes that mostly delegate
+            if info['total_methods'] > 1 and info['delegation_methods'] >= info['total_methods'] * 0.7:
+                self.violations.append(Violation(
+                    rule="wrapper_hell",
+                    file_path=str(self.file_path),
+                    line_number=node.lineno,
+                    severity="brutal",
+                    message=f"Class '{class_name}' is wrapper hell - {info['delegation_methods']}/{info['total_methods']} methods just delegate",
+                    context={"delegation_ratio": info['delegation_methods'] / info['total_methods']}
+                ))
+    
+            # 3. Inheritance depth check
+            depth = _calculate_inheritance_depth(class_name, class_info, set())
+            if depth > 4:
+                self.violations.append(Violation(
+                    rule="inheritance_hell",
+                    file_path=str(self.file_path),
+                    line_number=node.lineno,
+                    severity="brutal",
+                    message=f"Class '{class_name}' has inheritance depth of {depth} - delete some layers",
+                    context={"depth": depth}
+                ))
+            elif depth > 3:
+                self.violations.append(Violation(
+                    rule="inheritance_hell",
+                    file_path=str(self.file_path),
+                    line_number=node.lineno,
+                    severity="moderate",
+                    message=f"Class '{class_name}' has inheritance depth of {depth} - consider flattening",
+                    context={"depth": depth}
+                ))
+            
+            # 4. Pointless factory detection
+            if _is_pointless_factory(class_name, info):
+                self.violations.append(Violation(
+                    rule="pointless_factory",
+                    file_path=str(self.file_path),
+                    line_number=node.lineno,
+                    severity="moderate",
+                    message=f"Class '{class_name}' is a pointless factory - just use direct instantiation",
+                    context={}
+                ))
+            
+            # 5. Interface overkill - abstract class with only one concrete implementation
+            if info['abstract_methods'] and len(info['abstract_methods']) >= 3:
+                # This would need cross-file analysis to be fully accurate
+                # For now, flag classes with many abstract methods in single file
+                self.violations.append(Violation(
+                    rule="interface_overkill",
+                    file_path=str(self.file_path),
+                    line_number=node.lineno,
+                    severity="moderate",
+                    message=f"Class '{class_name}' defines {len(info['abstract_methods'])} abstract methods - might be overkill",
+                    context={"abstract_count": len(info['abstract_methods'])}
+                ))
         
-        # 5. Interface overkill - abstract class with only one concrete implementation
-        if info['abstract_methods'] and len(info['abstract_methods']) >= 3:
-            # This would need cross-file analysis to be fully accurate
-            # For now, flag classes with many abstract methods in single file
-            violations.append(Violation(
-                rule="interface_overkill",
-                file_path=str(file_path),
-                line_number=node.lineno,
-                severity="moderate",
-                message=f"Class '{class_name}' defines {len(info['abstract_methods'])} abstract methods - might be overkill",
-                context={"abstract_count": len(info['abstract_methods'])}
-            ))
-    
-    return violations
+        return self.violations
 
 
 def _is_pure_delegation(method: ast.FunctionDef) -> bool:
@@ -1,7 +1,46 @@
 """Base classes for ShitLint violations."""
 
 from dataclasses import dataclass
-from typing import Dict
+from pathlib import Path
+import time
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+import ast
+
+from ..source import AST, TEXT, SourceFile
+
+
+# Rule scopes - what one run of the rule looks at
+FILE = "file"  # One file's content, once per file
+PROJECT = "project"  # Project-level files like manifests, once per run
+REPOSITORY = "repository"  # Version-control state, once per run
+
+
+def rule_scope(scope: str):
+    """Declare the scope of a function-style rule; undecorated rules are FILE."""
+    def decorate(function: Callable) -> Callable:
+        function.scope = scope
+        return function
+    return decorate
+
+
+def scope_of(rule) -> str:
+    return getattr(rule, "scope", FILE)
+
+
+# Function rules receive the tree, so without a declaration assume they need it
+DEFAULT_REQUIRES = frozenset({TEXT, AST})
+
+
+def rule_requires(*artifacts: str):
+    """Declare the source artifacts a function-style rule reads."""
+    def decorate(function: Callable) -> Callable:
+        function.requires = frozenset(artifacts)
+        return function
+    return decorate
+
+
+def requires_of(rule) -> FrozenSet[str]:
+    return getattr(rule, "requires", DEFAULT_REQUIRES)
 
 
 @dataclass
@@ -12,4 +51,143 @@ class Violation:
     line_number: int
     severity: str
     message: str
-    context: Dict = None
\ No newline at end of file
+    context: Dict = None
+
+
+class NodeRule:
+    """Rule that sees each AST node during one shared walk of the tree.
+    
+    Subclasses define visit_<NodeType>(node, parent) and, when they need to
+    know a subtree is done, leave_<NodeType>(node, parent). One instance is
+    created per file; finish() is called after the walk. Artifacts other
+    than the AST are read from self.source, built on first use.
+    """
+    
+    scope = FILE
+    requires: FrozenSet[str] = frozenset({AST})
+    _visit_handlers: Dict[str, str] = {}
+    _leave_handlers: Dict[str, str] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Resolve handler names once per class, not once per file
+        cls._visit_handlers = {name[6:]: name for name in dir(cls) if name.startswith("visit_")}
+        cls._leave_handlers = {name[6:]: name for name in dir(cls) if name.startswith("leave_")}
+    
+    def __init__(self, file_path: Path, content: str = "", thresholds: Optional[Dict] = None,
+                 source: Optional[SourceFile] = None):
+        self.file_path = file_path
+        self.content = content
+        self.thresholds = thresholds or {}
+        self.source = source or SourceFile(file_path, content)
+        self.violations: List[Violation] = []
+    
+    def finish(self) -> List[Violation]:
+        """Violations for the file, once every node has been visited."""
+        return self.violations
+    
+    @classmethod
+    def detect(cls, file_path: Path, content: str, tree: ast.AST, thresholds: Dict) -> List[Violation]:
+        """Run this rule on its own, with the function-rule signature."""
+        if AST in cls.requires and tree is None:
+            return []
+        
+        rule = cls(file_path, content, thresholds, SourceFile.with_tree(file_path, content, tree))
+        if tree is not None and rule.walks:
+            walk_rules(tree, [rule])
+        return rule.finish()
+    
+    @property
+    def walks(self) -> bool:
+        """Whether this rule has any node handlers to feed."""
+        return bool(self._visit_handlers or self._leave_handlers)
+
+
+class FunctionRule(NodeRule):
+    """Adapter for function-style rules - called once, after the walk."""
+    
+    def __init__(self, function: Callable, file_path: Path, content: str, tree: Optional[ast.AST], thresholds: Dict,
+                 source: Optional[SourceFile] = None):
+        super().__init__(file_path, content, thresholds, source)
+        self.function = function
+        self.requires = requires_of(function)
+        self.tree = tree
+    
+    def finish(self) -> List[Violation]:
+        return self.function(self.file_path, self.content, self.tree, self.thresholds)
+
+
+class BudgetExceeded(Exception):
+    """One file blew its time or depth budget - analysis of it is abandoned."""
+    
+    def __init__(self, reason: str, limit):
+        super().__init__(f"{reason} limit {limit} exceeded")
+        self.reason = reason
+        self.limit = limit
+
+
+class Budget:
+    """Per-file limits, checked cooperatively during analysis. 0 disables a limit."""
+    
+    def __init__(self, seconds: float = 0, max_depth: int = 0):
+        self.seconds = seconds
+        self.max_depth = max_depth
+        self.deadline = time.perf_counter() + seconds if seconds else None
+    
+    def check_time(self):
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise BudgetExceeded("time", f"{self.seconds}s")
+    
+    def check_depth(self, depth: int):
+        if self.max_depth and depth > self.max_depth:
+            raise BudgetExceeded("depth", self.max_depth)
+
+
+# Nodes visited between deadline checks - perf_counter per node would add up
+TIME_CHECK_INTERVAL = 1024
+
+Handler = Callable[[ast.AST, Optional[ast.AST]], None]
+
+
+def walk_rules(tree: ast.AST, rules: List[NodeRule], wrap: Optional[Callable[[NodeRule, Handler], Handler]] = None,
+               budget: Optional[Budget] = None):
+    """Walk the tree once, depth-first in source order, dispatching to every rule.
+    
+    wrap, if given, decorates each bound handler - used for profiling.
+    budget, if given, raises BudgetExceeded on deep nesting or a passed deadline.
+    """
+    visit: Dict[str, List[Handler]] = {}
+    leave: Dict[str, List[Handler]] = {}
+    for rule in rules:
+        for node_type, name in rule._visit_handlers.items():
+            handler = getattr(rule, name)
+            visit.setdefault(node_type, []).append(wrap(rule, handler) if wrap else handler)
+        for node_type, name in rule._leave_handlers.items():
+            handler = getattr(rule, name)
+            leave.setdefault(node_type, []).append(wrap(rule, handler) if wrap else handler)
+    
+    # (node, parent, leaving, depth) - explicit stack so deep trees can't hit the recursion limit
+    stack: List[Tuple[ast.AST, Optional[ast.AST], bool, int]] = [(tree, None, False, 1)]
+    visited = 0
+    while stack:
+        node, parent, leaving, depth = stack.pop()
+        node_type = type(node).__name__
+        
+        if leaving:
+            for handler in leave[node_type]:
+                handler(node, parent)
+            continue
+        
+        if budget:
+            budget.check_depth(depth)
+            visited += 1
+            if visited % TIME_CHECK_INTERVAL == 0:
+                budget.check_time()
+        
+        for handler in visit.get(node_type, ()):
+            handler(node, parent)
+        if node_type in leave:
+            stack.append((node, parent, True, depth))
+        
+        children = list(ast.iter_child_nodes(node))
+        stack.extend((child, node, False, depth + 1) for child in reversed(children))
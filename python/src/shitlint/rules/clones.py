@@ -0,0 +1,218 @@
+"""Copied-block detection - repeated statement windows across the project.
+
+Each file's token stream is normalized statement by statement (variable
+names and literals become placeholders, comments and layout are dropped),
+every statement is hashed, and a rolling hash over windows of consecutive
+statements feeds one project-wide index. Windows whose hash shows up in
+more than one place are copies; consecutive copied windows merge into one
+block. The cost is linear in the number of tokens.
+"""
+
+import hashlib
+import keyword
+import tokenize
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .base import Violation
+
+# Rolling hash over statement hashes, modulo a Mersenne prime
+_MODULUS = (1 << 61) - 1
+_BASE = 1_000_003
+
+_SKIPPED = {tokenize.COMMENT, tokenize.NL, tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING, tokenize.ENDMARKER}
+_LITERALS = {tokenize.NUMBER, tokenize.STRING} | ({tokenize.FSTRING_MIDDLE} if hasattr(tokenize, "FSTRING_MIDDLE") else set())
+
+# How many other copies a violation lists
+MAX_COPIES = 5
+
+Window = Tuple[int, int, int]  # (hash, first line, last line)
+
+
+def _normalize(tokens: List[tokenize.TokenInfo]) -> str:
+    """One statement's shape: keywords, operators, attribute and call names.
+
+    Plain names become "N" and literals "L", so a block copied with its
+    variables renamed or constants changed still matches.
+    """
+    parts = []
+    for i, token in enumerate(tokens):
+        if token.type in _LITERALS:
+            parts.append("L")
+        elif token.type == tokenize.NAME and not keyword.iskeyword(token.string):
+            follows_dot = i > 0 and tokens[i - 1].string == "."
+            called = i + 1 < len(tokens) and tokens[i + 1].string == "("
+            parts.append(token.string if follows_dot or called else "N")
+        else:
+            parts.append(token.string)
+    return " ".join(parts)
+
+
+def statement_hashes(tokens: List[tokenize.TokenInfo]) -> List[Tuple[int, int, int]]:
+    """(hash, first line, last line) per logical line, imports left out."""
+    statements = []
+    current: List[tokenize.TokenInfo] = []
+    for token in tokens:
+        if token.type in _SKIPPED:
+            continue
+        if token.type != tokenize.NEWLINE:
+            current.append(token)
+            continue
+        if current and current[0].string not in ("import", "from"):
+            digest = hashlib.blake2b(_normalize(current).encode(), digest_size=8).digest()
+            statements.append((int.from_bytes(digest, "big"), current[0].start[0], current[-1].end[0]))
+        current = []
+    return statements
+
+
+def token_windows(tokens: List[tokenize.TokenInfo], min_lines: int) -> List[Window]:
+    """Rolling hash of every run of min_lines consecutive statements.
+
+    Runs made mostly of one repeated statement shape, like a column of
+    `option = 0` assignments, are left out - they aren't copied logic.
+    """
+    statements = statement_hashes(tokens)
+    if min_lines <= 0 or len(statements) < min_lines:
+        return []
+    
+    top = pow(_BASE, min_lines - 1, _MODULUS)
+    window_hash = 0
+    for h, _, _ in statements[:min_lines]:
+        window_hash = (window_hash * _BASE + h) % _MODULUS
+    
+    shapes: Dict[int, int] = {}  # Statement hash -> count inside the window
+    for h, _, _ in statements[:min_lines]:
+        shapes[h] = shapes.get(h, 0) + 1
+    
+    windows = []
+    for start in range(len(statements) - min_lines + 1):
+        if start:
+            leaving, entering = statements[start - 1][0], statements[start + min_lines - 1][0]
+            window_hash = ((window_hash - leaving * top) * _BASE + entering) % _MODULUS
+            shapes[leaving] -= 1
+            if not shapes[leaving]:
+                del shapes[leaving]
+            shapes[entering] = shapes.get(entering, 0) + 1
+        if len(shapes) * 2 >= min_lines:
+            windows.append((window_hash, statements[start][1], statements[start + min_lines - 1][2]))
+    return windows
+
+
+class CloneDetector:
+    """Project-wide index of statement windows, finding blocks copied anywhere.
+
+    Like CrossFileAnalyzer, per-file state can be exported, merged from
+    other processes or the cache, and removed when a file changes.
+    """
+    
+    def __init__(self, min_lines: int):
+        self.min_lines = min_lines
+        self._paths: List[str] = []  # file id -> path
+        self._path_ids: Dict[str, int] = {}
+        self._windows: Dict[int, List[Window]] = {}  # file_id -> windows in source order
+        self._index: Dict[int, List[Tuple[int, int, int]]] = {}  # window hash -> [(file_id, first line, last line)]
+    
+    def _file_id(self, file_path: str) -> int:
+        file_id = self._path_ids.get(file_path)
+        if file_id is None:
+            file_id = self._path_ids[file_path] = len(self._paths)
+            self._paths.append(file_path)
+        return file_id
+    
+    def collect(self, file_path: Path, tokens: List[tokenize.TokenInfo]):
+        """Index one file's windows from its token stream."""
+        self.add_file(str(file_path), token_windows(tokens, self.min_lines))
+    
+    def add_file(self, file_path: str, windows: List[Window]):
+        """Merge one file's windows, e.g. collected in another process."""
+        file_id = self._file_id(file_path)
+        windows = [tuple(window) for window in windows]
+        self._windows.setdefault(file_id, []).extend(windows)
+        for window_hash, first, last in windows:
+            self._index.setdefault(window_hash, []).append((file_id, first, last))
+    
+    def export_file(self, file_path: str) -> List[Window]:
+        """Windows collected for one file, in a form add_file accepts."""
+        return list(self._windows.get(self._path_ids.get(file_path), []))
+    
+    def remove_file(self, file_path: str):
+        """Drop everything collected for one file."""
+        file_id = self._path_ids.get(file_path)
+        # A file can repeat a window - drop each hash once
+        for window_hash in {window_hash for window_hash, _, _ in self._windows.pop(file_id, [])}:
+            occurrences = [o for o in self._index.get(window_hash, []) if o[0] != file_id]
+            if occurrences:
+                self._index[window_hash] = occurrences
+            else:
+                del self._index[window_hash]
+    
+    def _spans(self) -> Dict[int, Dict[int, Tuple[List[int], List[int]]]]:
+        """Window hash -> file_id -> (first lines, last lines), each in source order."""
+        spans: Dict[int, Dict[int, Tuple[List[int], List[int]]]] = {}
+        for file_id, windows in self._windows.items():
+            for window_hash, first, last in windows:
+                if len(self._index[window_hash]) > 1:
+                    firsts, lasts = spans.setdefault(window_hash, {}).setdefault(file_id, ([], []))
+                    firsts.append(first)
+                    lasts.append(last)
+        return spans
+    
+    def _copies(self, file_id: int, window: Window) -> List[Tuple[int, int]]:
+        """The first MAX_COPIES other places a window occurs, ignoring overlapping runs in the same file.
+        
+        Only runs overlapping the window are skipped, and there are at most
+        a couple of min_lines of those, so this stops early however common
+        the window is.
+        """
+        window_hash, first, last = window
+        return list(islice((
+            (other_id, other_first) for other_id, other_first, other_last in self._index[window_hash]
+            if other_id != file_id or other_first > last or other_last < first
+        ), MAX_COPIES))
+    
+    def get_violations(self) -> List[Violation]:
+        """One violation per maximal copied block in each file.
+        
+        Copies are counted per window hash from sorted same-file spans, so
+        a window occurring k times costs O(log k) rather than a scan of all
+        k occurrences.
+        """
+        spans = self._spans()
+        violations = []
+        for file_id, windows in self._windows.items():
+            block: Optional[List] = None  # [first, last, copies of the first window, copy count]
+            for window in windows:
+                window_hash, first, last = window
+                count = 0
+                if window_hash in spans:
+                    # Windows in one file come in source order, so first and last lines are both sorted
+                    firsts, lasts = spans[window_hash][file_id]
+                    count = len(self._index[window_hash]) - (bisect_right(firsts, last) - bisect_left(lasts, first))
+                if count and block and first <= block[1]:
+                    block[1] = max(block[1], last)
+                    continue
+                if block:
+                    violations.append(self._violation(file_id, *block))
+                block = [first, last, self._copies(file_id, window), count] if count else None
+            if block:
+                violations.append(self._violation(file_id, *block))
+        return violations
+    
+    def _violation(self, file_id: int, first: int, last: int, copies: List[Tuple[int, int]], count: int) -> Violation:
+        locations = [(self._paths[other_id], line) for other_id, line in copies]
+        shown = ", ".join(f"{Path(path).name}:{line}" for path, line in locations)
+        more = f" and {count - len(locations)} more" if count > len(locations) else ""
+        return Violation(
+            rule="copied_block",
+            file_path=self._paths[file_id],
+            line_number=first,
+            severity="moderate",
+            message=f"Lines {first}-{last} are copied code, also at {shown}{more}",
+            context={
+                "lines": [first, last],
+                "copies": locations,
+                "count": count
+            }
+        )
@@ -4,11 +4,15 @@ import subprocess
 import re
 from pathlib import Path
 from typing import List, Dict
-from .base import Violation
+from .base import REPOSITORY, Violation, rule_scope
 
 
+@rule_scope(REPOSITORY)
 def detect_commit_violations(file_path: Path, content: str, tree, thresholds: Dict) -> List[Violation]:
-    """Detect garbage commit messages in git history."""
+    """Detect garbage commit messages in git history.
+    
+    Repository-scoped: file_path is the analysis root, checked once per run.
+    """
     violations = []
     
     try:
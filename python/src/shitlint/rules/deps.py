@@ -4,9 +4,10 @@ import json
 import re
 from pathlib import Path
 from typing import List, Dict
-from .base import Violation
+from .base import PROJECT, Violation, rule_scope
 
 
+@rule_scope(PROJECT)
 def detect_dependency_violations(file_path: Path, content: str, tree, thresholds: Dict) -> List[Violation]:
     """Detect dependency violations across package.json, requirements.txt, pyproject.toml."""
     violations = []
@@ -3,15 +3,17 @@
 import re
 from pathlib import Path
 from typing import List, Dict
-from .base import Violation
+from ..source import TEXT
+from .base import Violation, rule_requires
 
 
+@rule_requires(TEXT)
 def detect_documentation_violations(file_path: Path, content: str, tree, thresholds: Dict) -> List[Violation]:
     """Detect documentation violations in README and doc files."""
     violations = []
     
-    # Skip if this is a Python file (tree will be provided)
-    if tree is not None:
+    # Skip Python files - the engine no longer parses them just for this rule
+    if tree is not None or file_path.suffix == '.py':
         return violations
     
     # If this is a documentation file, analyze it directly
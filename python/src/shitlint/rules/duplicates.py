@@ -1,143 +1,286 @@
 """Duplicate code detection - single file and cross-file."""
 
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import ast
 import hashlib
-import copy
+import sys
 
-from .base import Violation
+from ..source import SourceFile
+from .base import NodeRule, Violation, walk_rules
 
 
 def detect_duplicate_blocks(file_path: Path, content: str, tree: ast.AST, thresholds: Dict) -> List[Violation]:
     """Detect copy-paste violations within a single file."""
-    # Skip if not a Python file
-    if tree is None:
-        return []
-    
-    functions = []
-    
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            # Normalize function structure for comparison
-            normalized = _normalize_function_structure(node)
-            func_hash = hashlib.md5(normalized.encode()).hexdigest()
-            functions.append((node.name, node.lineno, func_hash))
-    
-    # Find duplicates
-    hash_counts = {}
-    for name, line, func_hash in functions:
-        if func_hash not in hash_counts:
-            hash_counts[func_hash] = []
-        hash_counts[func_hash].append((name, line))
-    
-    violations = []
-    for func_hash, occurrences in hash_counts.items():
-        if len(occurrences) > 1:
-            names = [name for name, line in occurrences]
-            lines = [line for name, line in occurrences]
+    return DuplicateBlockRule.detect(file_path, content, tree, thresholds)
+    
+    
+class DuplicateBlockRule(NodeRule):
+    """Groups functions in one file by structural hash."""
+    
+    def __init__(self, file_path: Path, content: str = "", thresholds: Dict = None, source: SourceFile = None):
+        super().__init__(file_path, content, thresholds, source)
+        self.functions = []  # [name, line, hash] in source order
+        self.open_functions = []
+    
+    def visit_FunctionDef(self, node, parent):
+        slot = [node.name, node.lineno, None]
+        self.functions.append(slot)
+        self.open_functions.append(slot)
+    
+    def leave_FunctionDef(self, node, parent):
+        # Hash on the way out - the walk has checked the body's depth by now
+        self.open_functions.pop()[2] = function_fingerprint(node, self.source)
             
-            violations.append(Violation(
-                rule="duplicate_code",
-                file_path=str(file_path),
-                line_number=min(lines),
-                severity="moderate",
-                message=f"Copy-paste detected: {', '.join(names)} are identical",
-                context={"duplicates": occurrences}
-            ))
-    
-    return violations
+    def finish(self) -> List[Violation]:
+        # Find duplicates
+        hash_counts = {}
+        for name, line, func_hash in self.functions:
+            if func_hash not in hash_counts:
+                hash_counts[func_hash] = []
+            hash_counts[func_hash].append((name, line))
+    
+        for func_hash, occurrences in hash_counts.items():
+            if len(occurrences) > 1:
+                names = [name for name, line in occurrences]
+                lines = [line for name, line in occurrences]
+                
+                self.violations.append(Violation(
+                    rule="duplicate_code",
+                    file_path=str(self.file_path),
+                    line_number=min(lines),
+                    severity="moderate",
+                    message=f"Copy-paste detected: {', '.join(names)} are identical",
+                    context={"duplicates": occurrences}
+                ))
+        
+        return self.violations
 
 
-def _normalize_function_structure(node: ast.FunctionDef) -> str:
-    """Extract structural fingerprint, ignoring variable names."""
+class _Token(bytes):
+    """Structural punctuation - told apart from bytes constants during the walk."""
     
-    class StructureNormalizer(ast.NodeTransformer):
-        def __init__(self):
-            self.var_counter = 0
-            self.var_map = {}
         
-        def visit_Name(self, node):
-            if isinstance(node.ctx, ast.Store):
-                # Variable assignment - normalize variable names
-                if node.id not in self.var_map:
-                    self.var_map[node.id] = f"var_{self.var_counter}"
-                    self.var_counter += 1
-                node.id = self.var_map[node.id]
-            elif isinstance(node.ctx, ast.Load):
-                # Variable usage - use normalized name if available
-                if node.id in self.var_map:
-                    node.id = self.var_map[node.id]
-            return node
+_CLOSE_NODE = _Token(b")")
+_OPEN_LIST = _Token(b"[")
+_CLOSE_LIST = _Token(b"]")
+_RAW_START = _Token(b"")  # Annotations are hashed as written, names and all
+_RAW_END = _Token(b"")
             
-        def visit_arg(self, node):
-            # Normalize parameter names
-            if node.arg not in self.var_map:
-                self.var_map[node.arg] = f"param_{len(self.var_map)}"
-            node.arg = self.var_map[node.arg]
-            return node
+_TYPE_TAGS: Dict[type, bytes] = {}  # Node class -> b"Name(", built on first sight
             
-        def visit_FunctionDef(self, node):
-            # Normalize function name
-            node.name = "func"
-            return self.generic_visit(node)
-    
-    normalizer = StructureNormalizer()
-    normalized_node = normalizer.visit(copy.deepcopy(node))
-    return ast.dump(normalized_node)
+# 64-bit fingerprints - collisions stay negligible well past a million functions
+FINGERPRINT_BYTES = 8
+
+# Profile row for hashing shared by every rule that fingerprints functions
+FINGERPRINT_TIMING = "function_fingerprints"
+    
+    
+def structural_fingerprint(node: ast.FunctionDef) -> int:
+    """Fixed-size digest of a function's structure, ignoring variable names.
+    
+    Node types, field values and normalized identifiers are streamed into
+    one digest while walking the original tree - nothing is copied, mutated
+    or dumped. Stores and parameters are numbered in first-seen order,
+    loads follow that mapping, and nested function names are dropped.
+    """
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_BYTES)
+    emit = digest.update
+    names: Dict[str, str] = {}
+    variables = 0
+    raw = 0
+    
+    # Explicit stack - nodes, field values and punctuation in pre-order
+    stack: List = [node]
+    while stack:
+        item = stack.pop()
+        item_type = type(item)
+        
+        if item_type is _Token:
+            if item is _RAW_START:
+                raw += 1
+            elif item is _RAW_END:
+                raw -= 1
+            else:
+                emit(item)
+        elif item_type is list:
+            emit(_OPEN_LIST)
+            stack.append(_CLOSE_LIST)
+            stack.extend(reversed(item))
+        elif not isinstance(item, ast.AST):
+            emit(repr(item).encode() + b"\0")
+        elif item_type is ast.Name and not raw:
+            identifier = item.id
+            context = type(item.ctx)
+            if context is ast.Store:
+                if identifier not in names:
+                    names[identifier] = f"var_{variables}"
+                    variables += 1
+                identifier = names[identifier]
+            elif context is ast.Load:
+                identifier = names.get(identifier, identifier)
+            emit(b"Name(" + repr(identifier).encode() + b"\0")
+            stack.append(_CLOSE_NODE)
+            stack.append(item.ctx)
+        else:
+            tag = _TYPE_TAGS.get(item_type)
+            if tag is None:
+                tag = _TYPE_TAGS[item_type] = item_type.__name__.encode() + b"("
+            emit(tag)
+            stack.append(_CLOSE_NODE)
+            
+            fields = [getattr(item, field, None) for field in item_type._fields]
+            if raw:
+                pass
+            elif item_type is ast.arg:
+                if item.arg not in names:
+                    names[item.arg] = f"param_{len(names)}"
+                fields[0] = names[item.arg]
+                # Only the parameter name is normalized, not its annotation
+                stack.append(_RAW_END)
+                stack.extend(reversed(fields[1:]))
+                stack.append(_RAW_START)
+                stack.append(fields[0])
+                continue
+            elif item_type is ast.FunctionDef:
+                fields[0] = "func"
+            stack.extend(reversed(fields))
+    
+    return int.from_bytes(digest.digest(), "big")
+
+
+def function_fingerprint(node: ast.FunctionDef, source: Optional[SourceFile] = None) -> int:
+    """structural_fingerprint, hashed once per function and shared through the source."""
+    if source is None:
+        return structural_fingerprint(node)
+    memo = source.fingerprints
+    if id(node) not in memo:
+        profiler = source.profiler
+        with profiler.time_shared(FINGERPRINT_TIMING, source.path) if profiler else nullcontext():
+            memo[id(node)] = structural_fingerprint(node)
+    return memo[id(node)]
 
 
 class CrossFileAnalyzer:
-    """Analyzes structural similarity across multiple files."""
+    """Analyzes structural similarity across multiple files.
+    
+    Memory grows with the number of functions, not the size of the code:
+    fingerprints are 64-bit ints, and each file path is stored once and
+    referred to by id.
+    """
     
     def __init__(self):
-        self._function_fingerprints = {}  # signature -> [(file_path, func_name, line_no)]
+        self._paths: List[str] = []  # file id -> path
+        self._path_ids: Dict[str, int] = {}
+        self._function_fingerprints: Dict[int, List[Tuple[int, str, int]]] = {}  # fingerprint -> [(file_id, func_name, line_no)]
+        self._file_fingerprints: Dict[int, List[Tuple[int, str, int]]] = {}  # file_id -> [(fingerprint, func_name, line_no)]
+    
+    def _file_id(self, file_path: str) -> int:
+        file_id = self._path_ids.get(file_path)
+        if file_id is None:
+            file_id = self._path_ids[file_path] = len(self._paths)
+            self._paths.append(file_path)
+        return file_id
     
     def collect_function_fingerprints(self, file_path: Path, tree: ast.AST):
         """Collect function structural fingerprints."""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                # Skip tiny functions
-                if len(node.body) < 3:
-                    continue
+        collector = self.collector(file_path)
+        walk_rules(tree, [collector])
+        collector.finish()
                     
-                fingerprint = self._normalize_function_structure(node)
-                
-                if fingerprint not in self._function_fingerprints:
-                    self._function_fingerprints[fingerprint] = []
+    def collector(self, file_path: Path, source: Optional[SourceFile] = None) -> "FingerprintCollector":
+        """A node rule that feeds this analyzer during a shared walk."""
+        return FingerprintCollector(self, file_path, source)
                 
-                self._function_fingerprints[fingerprint].append((
-                    str(file_path), 
-                    node.name, 
-                    node.lineno
-                ))
+    def add_file(self, file_path: str, entries: List[Tuple[int, str, int]]):
+        """Merge one file's fingerprints, e.g. collected in another process."""
+        file_id = self._file_id(file_path)
+        entries = [(fingerprint, sys.intern(func_name), line_no) for fingerprint, func_name, line_no in entries]
+        self._file_fingerprints.setdefault(file_id, []).extend(entries)
+        for fingerprint, func_name, line_no in entries:
+            if fingerprint not in self._function_fingerprints:
+                self._function_fingerprints[fingerprint] = []
+            
+            self._function_fingerprints[fingerprint].append((file_id, func_name, line_no))
     
-    def _normalize_function_structure(self, node: ast.FunctionDef) -> str:
-        """Extract structural fingerprint, ignoring variable names."""
-        return _normalize_function_structure(node)
+    def export_file(self, file_path: str) -> List[Tuple[int, str, int]]:
+        """Fingerprints collected for one file, in a form add_file accepts."""
+        return list(self._file_fingerprints.get(self._path_ids.get(file_path), []))
+    
+    def remove_file(self, file_path: str):
+        """Drop everything collected for one file."""
+        file_id = self._path_ids.get(file_path)
+        # A file can hold the same fingerprint twice - drop each key once
+        for fingerprint in {fingerprint for fingerprint, _, _ in self._file_fingerprints.pop(file_id, [])}:
+            occurrences = [o for o in self._function_fingerprints.get(fingerprint, []) if o[0] != file_id]
+            if occurrences:
+                self._function_fingerprints[fingerprint] = occurrences
+            else:
+                del self._function_fingerprints[fingerprint]
     
     def get_violations(self) -> List[Violation]:
         """Generate violations for cross-file duplicates."""
         violations = []
         
-        for fingerprint, occurrences in self._function_fingerprints.items():
-            if len(occurrences) > 1:
-                # Only flag cross-file duplicates
-                files = set(file_path for file_path, _, _ in occurrences)
-                if len(files) > 1:
-                    file_names = [Path(fp).name for fp, _, _ in occurrences]
-                    
-                    for file_path, func_name, line_no in occurrences:
-                        violations.append(Violation(
-                            rule="cross_file_duplicate",
-                            file_path=file_path,
-                            line_number=line_no,
-                            severity="moderate",
-                            message=f"Function '{func_name}' duplicated across files: {', '.join(file_names)}",
-                            context={
-                                "duplicates": occurrences,
-                                "fingerprint": fingerprint[:8]
-                            }
-                        ))
+        for fingerprint in self._function_fingerprints:
+            violations.extend(self.violations_for(fingerprint))
+        
+        return violations
+    
+    def violations_for(self, fingerprint: int) -> List[Violation]:
+        """Cross-file duplicate violations for a single fingerprint."""
+        violations = []
+        occurrences = [
+            (self._paths[file_id], func_name, line_no)
+            for file_id, func_name, line_no in self._function_fingerprints.get(fingerprint, [])
+        ]
+        
+        if len(occurrences) > 1:
+            # Only flag cross-file duplicates
+            files = set(file_path for file_path, _, _ in occurrences)
+            if len(files) > 1:
+                file_names = [Path(fp).name for fp, _, _ in occurrences]
+                
+                for file_path, func_name, line_no in occurrences:
+                    violations.append(Violation(
+                        rule="cross_file_duplicate",
+                        file_path=file_path,
+                        line_number=line_no,
+                        severity="moderate",
+                        message=f"Function '{func_name}' duplicated across files: {', '.join(file_names)}",
+                        context={
+                            "duplicates": occurrences,
+                            "fingerprint": f"{fingerprint:016x}"[:8]
+                        }
+                    ))
+        
+        return violations
+
+
+class FingerprintCollector(NodeRule):
+    """Collects one file's function fingerprints into a CrossFileAnalyzer."""
+    
+    def __init__(self, analyzer: CrossFileAnalyzer, file_path: Path, source: Optional[SourceFile] = None):
+        super().__init__(file_path, source=source)
+        self.analyzer = analyzer
+        self.entries = []  # [fingerprint, name, line] in source order
+        self.open_functions = []
+    
+    def visit_FunctionDef(self, node, parent):
+        # Skip tiny functions
+        slot = None
+        if len(node.body) >= 3:
+            slot = [None, node.name, node.lineno]
+            self.entries.append(slot)
+        self.open_functions.append(slot)
         
-        return violations
\ No newline at end of file
+    def leave_FunctionDef(self, node, parent):
+        slot = self.open_functions.pop()
+        if slot is not None:
+            slot[0] = function_fingerprint(node, self.source)
+    
+    def finish(self) -> List[Violation]:
+        # Violations come later, from get_violations across all files
+        self.analyzer.add_file(str(self.file_path), [tuple(entry) for entry in self.entries])
+        return []
\ No newline at end of file
@@ -4,33 +4,59 @@ from pathlib import Path
 from typing import List, Dict
 import ast
 
-from .base import Violation
+from ..source import AST, INDEX, SourceFile
+from .base import NodeRule, Violation
 
 
 def detect_complex_functions(file_path: Path, content: str, tree: ast.AST, thresholds: Dict) -> List[Violation]:
     """Detect overly complex functions."""
-    violations = []
+    return ComplexFunctionRule.detect(file_path, content, tree, thresholds)
     
-    # Skip if not a Python file
-    if tree is None:
-        return violations
     
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            # Count decision points
-            complexity = 1
+def detect_parameter_hell(file_path: Path, content: str, tree: ast.AST, thresholds: Dict) -> List[Violation]:
+    """Detect functions with too many parameters."""
+    return ParameterHellRule.detect(file_path, content, tree, thresholds)
             
-            for child in ast.walk(node):
-                if isinstance(child, (ast.If, ast.For, ast.While, ast.Try, ast.With)):
-                    complexity += 1
-                elif isinstance(child, ast.BoolOp):
-                    complexity += len(child.values) - 1
             
+class ComplexFunctionRule(NodeRule):
+    """Counts decision points inside each function, nested functions included."""
+    
+    requires = frozenset({AST, INDEX})
+    
+    def __init__(self, file_path: Path, content: str = "", thresholds: Dict = None, source: SourceFile = None):
+        super().__init__(file_path, content, thresholds, source)
+        self.functions = []  # [node, complexity] in source order
+        self.open_functions = []  # Frames of functions enclosing the current node
+    
+    def visit_FunctionDef(self, node, parent):
+        frame = [node, 1]
+        self.functions.append(frame)
+        self.open_functions.append(frame)
+    
+    def leave_FunctionDef(self, node, parent):
+        self.open_functions.pop()
+    
+    def _add_complexity(self, amount: int):
+        # A branch counts towards every function it sits inside
+        for frame in self.open_functions:
+            frame[1] += amount
+    
+    def visit_If(self, node, parent):
+        self._add_complexity(1)
+    
+    visit_For = visit_While = visit_Try = visit_With = visit_If
+    
+    def visit_BoolOp(self, node, parent):
+        self._add_complexity(len(node.values) - 1)
+    
+    def finish(self) -> List[Violation]:
+        index = self.source.index
+        complexity_thresholds = self.thresholds["complexity"]
+        line_thresholds = self.thresholds["function_lines"]
+        
+        for node, complexity in self.functions:
             # Count lines in function
-            func_lines = len([line for line in content.split('\n')[node.lineno-1:node.end_lineno] if line.strip()])
-            
-            complexity_thresholds = thresholds["complexity"]
-            line_thresholds = thresholds["function_lines"]
+            func_lines = index.nonblank_lines(node.lineno, node.end_lineno)
             
             if complexity > complexity_thresholds["moderate"] or func_lines > line_thresholds["moderate"]:
                 if complexity > complexity_thresholds["brutal"] or func_lines > line_thresholds["brutal"]:
@@ -40,50 +66,42 @@ def detect_complex_functions(file_path: Path, content: str, tree: ast.AST, thres
                     severity = "moderate"
                     message = f"Function '{node.name}' is getting complex: {complexity} branches, {func_lines} lines"
                 
-                violations.append(Violation(
+                self.violations.append(Violation(
                     rule="complex_function",
-                    file_path=str(file_path),
+                    file_path=str(self.file_path),
                     line_number=node.lineno,
                     severity=severity,
                     message=message,
                     context={"complexity": complexity, "lines": func_lines}
                 ))
     
-    return violations
+        return self.violations
 
 
-def detect_parameter_hell(file_path: Path, content: str, tree: ast.AST, thresholds: Dict) -> List[Violation]:
-    """Detect functions with too many parameters."""
-    violations = []
+class ParameterHellRule(NodeRule):
+    """Flags functions with too many parameters."""
     
-    # Skip if not a Python file
-    if tree is None:
-        return violations
+    def visit_FunctionDef(self, node, parent):
+        # Count parameters (exclude self for methods)
+        param_count = len(node.args.args)
+        if param_count > 0 and node.args.args[0].arg == 'self':
+            param_count -= 1
     
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            # Count parameters (exclude self for methods)
-            param_count = len(node.args.args)
-            if param_count > 0 and node.args.args[0].arg == 'self':
-                param_count -= 1
+        param_thresholds = self.thresholds.get("parameters", {"moderate": 4, "brutal": 6})
             
-            param_thresholds = thresholds.get("parameters", {"moderate": 4, "brutal": 6})
+        if param_count >= param_thresholds["moderate"]:
+            if param_count >= param_thresholds["brutal"]:
+                severity = "brutal"
+                message = f"Function '{node.name}' has {param_count} parameters - parameter hell detected"
+            else:
+                severity = "moderate"
+                message = f"Function '{node.name}' has {param_count} parameters - consider refactoring"
             
-            if param_count >= param_thresholds["moderate"]:
-                if param_count >= param_thresholds["brutal"]:
-                    severity = "brutal"
-                    message = f"Function '{node.name}' has {param_count} parameters - parameter hell detected"
-                else:
-                    severity = "moderate"
-                    message = f"Function '{node.name}' has {param_count} parameters - consider refactoring"
-                
-                violations.append(Violation(
-                    rule="parameter_hell",
-                    file_path=str(file_path),
-                    line_number=node.lineno,
-                    severity=severity,
-                    message=message,
-                    context={"param_count": param_count}
-                ))
-    
-    return violations
\ No newline at end of file
+            self.violations.append(Violation(
+                rule="parameter_hell",
+                file_path=str(self.file_path),
+                line_number=node.lineno,
+                severity=severity,
+                message=message,
+                context={"param_count": param_count}
+            ))
\ No newline at end of file
@@ -4,42 +4,49 @@ from pathlib import Path
 from typing import List, Dict
 import ast
 
-from .base import Violation
+from ..source import SourceFile
+from .base import NodeRule, Violation
 
 
 def detect_import_ceremony(file_path: Path, content: str, tree: ast.AST, thresholds: Dict) -> List[Violation]:
     """Detect import addiction."""
-    # Skip if not a Python file
-    if tree is None:
-        return []
+    return ImportCeremonyRule.detect(file_path, content, tree, thresholds)
     
-    imports = []
     
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Import):
-            imports.extend([alias.name for alias in node.names])
-        elif isinstance(node, ast.ImportFrom):
-            # Count each individual import from the module
-            imports.extend([alias.name for alias in node.names])
+class ImportCeremonyRule(NodeRule):
+    """Counts every imported name in the file."""
     
-    import_count = len(imports)
-    import_thresholds = thresholds["imports"]
+    def __init__(self, file_path: Path, content: str = "", thresholds: Dict = None, source: SourceFile = None):
+        super().__init__(file_path, content, thresholds, source)
+        self.imports = []
     
-    if import_count < import_thresholds["moderate"]:
-        return []
+    def visit_Import(self, node, parent):
+        self.imports.extend([alias.name for alias in node.names])
     
-    if import_count >= import_thresholds["brutal"]:
-        severity = "brutal"
-        message = f"Import addiction detected: {import_count} dependencies is architectural heroin"
-    else:
-        severity = "moderate"
-        message = f"Import ceremony: {import_count} imports suggests tight coupling"
+    def visit_ImportFrom(self, node, parent):
+        # Count each individual import from the module
+        self.imports.extend([alias.name for alias in node.names])
     
-    return [Violation(
-        rule="import_ceremony",
-        file_path=str(file_path),
-        line_number=1,
-        severity=severity,
-        message=message,
-        context={"import_count": import_count, "imports": imports}
-    )]
\ No newline at end of file
+    def finish(self) -> List[Violation]:
+        imports = self.imports
+        import_count = len(imports)
+        import_thresholds = self.thresholds["imports"]
+        
+        if import_count < import_thresholds["moderate"]:
+            return []
+        
+        if import_count >= import_thresholds["brutal"]:
+            severity = "brutal"
+            message = f"Import addiction detected: {import_count} dependencies is architectural heroin"
+        else:
+            severity = "moderate"
+            message = f"Import ceremony: {import_count} imports suggests tight coupling"
+        
+        return [Violation(
+            rule="import_ceremony",
+            file_path=str(self.file_path),
+            line_number=1,
+            severity=severity,
+            message=message,
+            context={"import_count": import_count, "imports": imports}
+        )]
\ No newline at end of file
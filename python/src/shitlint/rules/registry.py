@@ -0,0 +1,81 @@
+"""Rule registry - built-in rules plus third-party rules from entry points.
+
+Rules are referenced as "module:attribute" and only imported when loaded,
+so disabled rules cost nothing. A plugin package registers rules with the
+same signature as the built-ins (a NodeRule subclass or a detect function):
+
+    [project.entry-points."shitlint.rules"]
+    todo_comments = "my_package.rules:TodoCommentRule"
+"""
+
+import importlib
+import warnings
+from dataclasses import dataclass, field
+from importlib.metadata import entry_points
+from typing import Any, Dict, Optional
+
+ENTRY_POINT_GROUP = "shitlint.rules"
+
+# Built-in rules, in the order they run
+BUILTIN_RULES = {
+    "giant_files": "shitlint.rules.files:GiantFileRule",
+    "import_ceremony": "shitlint.rules.imports:ImportCeremonyRule",
+    "duplicate_blocks": "shitlint.rules.duplicates:DuplicateBlockRule",
+    "complex_functions": "shitlint.rules.functions:ComplexFunctionRule",
+    "parameter_hell": "shitlint.rules.functions:ParameterHellRule",
+    "naming_violations": "shitlint.rules.naming:NamingRule",
+    "magic_numbers": "shitlint.rules.magic:MagicNumberRule",
+    "over_abstraction": "shitlint.rules.abstraction:OverAbstractionRule",
+    "commit_violations": "shitlint.rules.commits:detect_commit_violations",
+    "dependency_violations": "shitlint.rules.deps:detect_dependency_violations",
+    "documentation_violations": "shitlint.rules.docs:detect_documentation_violations",
+}
+
+
+@dataclass
+class RuleSpec:
+    """Where to find one rule, imported on first load()."""
+    
+    name: str
+    target: str  # "module:attribute"
+    version: Optional[str] = None  # Plugin distribution version, None for built-ins
+    _rule: Any = field(default=None, repr=False, compare=False)
+    
+    @property
+    def builtin(self) -> bool:
+        return self.version is None
+    
+    def load(self):
+        if self._rule is None:
+            module_name, _, attribute = self.target.partition(":")
+            rule = importlib.import_module(module_name)
+            for part in attribute.split("."):
+                rule = getattr(rule, part)
+            self._rule = rule
+        return self._rule
+
+
+def discover_rules() -> Dict[str, RuleSpec]:
+    """Built-in rules followed by installed plugin rules, without importing any."""
+    rules = {name: RuleSpec(name, target) for name, target in BUILTIN_RULES.items()}
+    
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name in rules:
+            warnings.warn(f"Ignoring plugin rule '{entry_point.name}': name already registered")
+            continue
+        dist = getattr(entry_point, "dist", None)
+        version = dist.version if dist else "unknown"
+        rules[entry_point.name] = RuleSpec(entry_point.name, entry_point.value, version)
+    
+    return rules
+
+
+def load_rule(spec: RuleSpec):
+    """Import a rule, or warn and return None if a plugin is broken."""
+    if spec.builtin:
+        return spec.load()
+    try:
+        return spec.load()
+    except Exception as e:
+        warnings.warn(f"Skipping plugin rule '{spec.name}' ({spec.target}): {e}")
+        return None
@@ -0,0 +1,292 @@
+"""Near-duplicate functions - MinHash signatures over AST shingles, paired by LSH.
+
+Each function becomes a set of shingles: hashes of short runs in its
+pre-order node sequence, with variable names left out. A one-permutation
+MinHash turns that set into a fixed 64-slot signature whose slot agreement
+estimates Jaccard similarity. Signatures are cut into bands; only functions
+sharing a band become candidates, and only candidates are compared, so
+the cost stays near-linear in the number of functions instead of pairwise.
+Candidates are verified against their exact shingle sets - a 64-slot
+estimate is off by about 0.06, enough to drop real matches near the
+threshold.
+"""
+
+import ast
+import operator
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..source import SourceFile
+from .base import NodeRule, Violation, walk_rules
+from .duplicates import function_fingerprint
+
+SLOTS = 64  # Signature length - more slots, tighter similarity estimates
+SHINGLE_SIZE = 4  # Consecutive nodes per shingle
+MIN_STATEMENTS = 3  # Same cut-off as exact duplicate detection
+
+# Band buckets bigger than this are only compared between signature-order neighbours
+MAX_BUCKET = 64
+
+# How many similar functions a violation lists
+MAX_MATCHES = 5
+
+_MASK64 = (1 << 64) - 1
+_MASK32 = (1 << 32) - 1
+_MIX = 0x9E3779B97F4A7C15  # Golden-ratio multiplier, spreads shingle hashes over the top bits
+_SLOT_BITS = SLOTS.bit_length() - 1
+
+_TOKEN_IDS: Dict[str, int] = {}  # Node label -> crc32, stable across processes
+
+Entry = Tuple[str, int, int, str, str]  # (function name, line, exact fingerprint, signature hex, shingles hex)
+
+
+def _labels(node: ast.FunctionDef) -> Iterator[str]:
+    """Pre-order node labels of a function body.
+
+    Variable names and literal values are dropped; called names, attribute
+    names and literal types are kept.
+    """
+    stack = list(reversed(node.args.args + node.body))
+    while stack:
+        item = stack.pop()
+        if isinstance(item, ast.expr_context):
+            continue
+        if isinstance(item, ast.Attribute):
+            yield "." + item.attr
+        elif isinstance(item, ast.Constant):
+            yield type(item.value).__name__
+        elif isinstance(item, ast.Call) and isinstance(item.func, ast.Name):
+            yield item.func.id + "()"
+            stack.extend(reversed(item.args + item.keywords))
+            continue
+        else:
+            yield type(item).__name__
+        stack.extend(reversed(list(ast.iter_child_nodes(item))))
+
+
+def shingles(node: ast.FunctionDef) -> set:
+    """Hashes of every SHINGLE_SIZE consecutive labels."""
+    ids = []
+    for label in _labels(node):
+        token_id = _TOKEN_IDS.get(label)
+        if token_id is None:
+            token_id = _TOKEN_IDS[label] = zlib.crc32(label.encode())
+        ids.append(token_id)
+    
+    # Tuples of ints hash the same in every process, unlike strings
+    runs = zip(*(ids[offset:] for offset in range(SHINGLE_SIZE))) if len(ids) >= SHINGLE_SIZE else [tuple(ids)]
+    return {hash(run) * _MIX & _MASK64 for run in runs}
+
+
+def minhash(shingle_set: set) -> Optional[bytes]:
+    """One-permutation MinHash: the top bits pick a slot, each slot keeps its minimum.
+    
+    Empty slots borrow from a filled slot picked by a fixed pseudo-random
+    probe sequence (optimal densification), so every function gets a full
+    signature from one hash per shingle.
+    """
+    if not shingle_set:
+        return None
+    slots = [None] * SLOTS
+    for value in shingle_set:
+        slot, low = value >> (64 - _SLOT_BITS), value & _MASK32
+        if slots[slot] is None or low < slots[slot]:
+            slots[slot] = low
+    
+    signature = array('I', [0] * SLOTS)
+    for slot in range(SLOTS):
+        attempt, donor = 0, slot
+        while slots[donor] is None:
+            attempt += 1
+            donor = hash((slot, attempt)) % SLOTS
+        signature[slot] = (slots[donor] + attempt * _MIX) & _MASK32
+    return signature.tobytes()
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """Estimated Jaccard similarity - the share of agreeing slots."""
+    return sum(map(operator.eq, array('I', a), array('I', b))) / SLOTS
+
+
+def jaccard(a: set, b: set) -> float:
+    """Exact Jaccard similarity of two shingle sets."""
+    return len(a & b) / len(a | b)
+
+
+def band_rows(threshold: float) -> int:
+    """Rows per band: the most selective banding that still catches pairs at the threshold.
+
+    Pairs become candidates with probability 1 - (1 - s^r)^(SLOTS/r); the
+    curve's midpoint (r/SLOTS)^(1/r) is kept well below the threshold so
+    near-threshold pairs are almost never missed.
+    """
+    rows = 1
+    while rows * 2 <= SLOTS and (rows * 2 / SLOTS) ** (1 / (rows * 2)) <= threshold - 0.15:
+        rows *= 2
+    return rows
+
+
+class NearDuplicateIndex:
+    """Project-wide MinHash signatures, reporting functions above a similarity threshold.
+
+    Like CrossFileAnalyzer, per-file state can be exported, merged from
+    other processes or the cache, and removed when a file changes. Exact
+    duplicates are left to cross_file_duplicate and duplicate_code.
+    """
+    
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.rows = band_rows(threshold)
+        self._paths: List[str] = []  # file id -> path
+        self._path_ids: Dict[str, int] = {}
+        self._functions: Dict[int, List[Tuple[str, int, int, bytes, bytes]]] = {}  # file_id -> [(name, line, fingerprint, signature, shingles)]
+        self.truncated_buckets = 0  # Oversized band buckets in the last candidate_pairs run
+    
+    def _file_id(self, file_path: str) -> int:
+        file_id = self._path_ids.get(file_path)
+        if file_id is None:
+            file_id = self._path_ids[file_path] = len(self._paths)
+            self._paths.append(file_path)
+        return file_id
+    
+    def collect_function_signatures(self, file_path: Path, tree: ast.AST):
+        """Collect signatures for every function in a tree."""
+        collector = self.collector(file_path)
+        walk_rules(tree, [collector])
+        collector.finish()
+    
+    def collector(self, file_path: Path, source: Optional[SourceFile] = None) -> "SignatureCollector":
+        """A node rule that feeds this index during a shared walk."""
+        return SignatureCollector(self, file_path, source)
+    
+    def add_file(self, file_path: str, entries: List[Entry]):
+        """Merge one file's signatures, e.g. collected in another process."""
+        file_id = self._file_id(file_path)
+        self._functions.setdefault(file_id, []).extend(
+            (sys.intern(name), line, fingerprint, bytes.fromhex(signature), bytes.fromhex(shingle_bytes))
+            for name, line, fingerprint, signature, shingle_bytes in entries
+        )
+    
+    def export_file(self, file_path: str) -> List[Entry]:
+        """Signatures collected for one file, in a form add_file accepts."""
+        return [
+            (name, line, fingerprint, signature.hex(), shingle_bytes.hex())
+            for name, line, fingerprint, signature, shingle_bytes in self._functions.get(self._path_ids.get(file_path), [])
+        ]
+    
+    def remove_file(self, file_path: str):
+        """Drop everything collected for one file."""
+        self._functions.pop(self._path_ids.get(file_path), None)
+    
+    def _copies(self) -> Dict[int, List[Tuple[int, int]]]:
+        """Exact fingerprint -> every (file_id, index) with it, the first standing for the rest."""
+        copies: Dict[int, List[Tuple[int, int]]] = {}
+        for file_id, functions in self._functions.items():
+            for i, function in enumerate(functions):
+                copies.setdefault(function[2], []).append((file_id, i))
+        return copies
+    
+    def candidate_pairs(self) -> Iterator[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """Pairs of (file_id, index) sharing at least one band, each yielded once.
+        
+        Only one function per exact fingerprint is bucketed, so copies don't
+        crowd out the code they were copied from. A bucket bigger than
+        MAX_BUCKET is sorted by signature and each member paired with its
+        next MAX_BUCKET - 1 neighbours only; truncated_buckets counts those.
+        """
+        width = self.rows * 4  # Signature bytes per band
+        representatives = [members[0] for members in self._copies().values()]
+        seen = set()
+        self.truncated_buckets = 0
+        for band in range(SLOTS // self.rows):
+            buckets: Dict[bytes, List[Tuple[int, int]]] = {}
+            for file_id, i in representatives:
+                key = self._functions[file_id][i][3][band * width:(band + 1) * width]
+                buckets.setdefault(key, []).append((file_id, i))
+            
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                if len(members) > MAX_BUCKET:
+                    self.truncated_buckets += 1
+                    members.sort(key=lambda member: self._functions[member[0]][member[1]][3])
+                for i, first in enumerate(members):
+                    for second in members[i + 1:i + MAX_BUCKET]:
+                        pair = (first, second) if first < second else (second, first)
+                        if pair not in seen:
+                            seen.add(pair)
+                            yield pair
+    
+    def _shingles(self, member: Tuple[int, int]) -> set:
+        return set(array('Q', self._functions[member[0]][member[1]][4]))
+    
+    def get_violations(self) -> List[Violation]:
+        """One violation per function with near-duplicates, listing the closest.
+        
+        Matches are found between one function per exact fingerprint and
+        shared by all its copies; exact copies of each other are left out.
+        """
+        copies = self._copies()
+        shingle_sets: Dict[Tuple[int, int], set] = {}
+        matches: Dict[Tuple[int, int], List[Tuple[float, int]]] = {}  # representative -> [(score, other fingerprint)]
+        for first, second in self.candidate_pairs():
+            for member in (first, second):
+                if member not in shingle_sets:
+                    shingle_sets[member] = self._shingles(member)
+            score = jaccard(shingle_sets[first], shingle_sets[second])
+            if score >= self.threshold:
+                matches.setdefault(first, []).append((score, self._functions[second[0]][second[1]][2]))
+                matches.setdefault(second, []).append((score, self._functions[first[0]][first[1]][2]))
+        
+        violations = []
+        for (file_id, i), similar in matches.items():
+            similar.sort(key=lambda match: -match[0])
+            shown = []
+            for score, fingerprint in similar:
+                for other_id, j in copies[fingerprint][:MAX_MATCHES - len(shown)]:
+                    other = self._functions[other_id][j]
+                    shown.append((self._paths[other_id], other[0], other[1], round(score, 2)))
+            count = sum(len(copies[fingerprint]) for _, fingerprint in similar)
+            best_path, best_name, best_line, best_score = shown[0]
+            for member_id, k in copies[self._functions[file_id][i][2]]:
+                name, line = self._functions[member_id][k][:2]
+                violations.append(((member_id, k), Violation(
+                    rule="near_duplicate",
+                    file_path=self._paths[member_id],
+                    line_number=line,
+                    severity="gentle",
+                    message=f"Function '{name}' is {best_score:.0%} similar to '{best_name}' in {Path(best_path).name}:{best_line}",
+                    context={
+                        "similar": shown,
+                        "count": count
+                    }
+                )))
+        return [violation for _, violation in sorted(violations, key=lambda item: item[0])]
+
+
+class SignatureCollector(NodeRule):
+    """Collects one file's function signatures into a NearDuplicateIndex."""
+    
+    def __init__(self, index: NearDuplicateIndex, file_path: Path, source: Optional[SourceFile] = None):
+        super().__init__(file_path, source=source)
+        self.index = index
+        self.entries = []
+    
+    def visit_FunctionDef(self, node, parent):
+        if len(node.body) < MIN_STATEMENTS:
+            return
+        shingle_set = shingles(node)
+        signature = minhash(shingle_set)
+        if signature is not None:
+            self.entries.append((
+                node.name, node.lineno, function_fingerprint(node, self.source),
+                signature.hex(), array('Q', sorted(shingle_set)).tobytes().hex()
+            ))
+    
+    def finish(self) -> List[Violation]:
+        # Violations come later, from get_violations across all files
+        self.index.add_file(str(self.file_path), self.entries)
+        return []
@@ -0,0 +1,227 @@
+"""Sampling mode - projected violation counts from a stratified file sample."""
+
+import math
+import random
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .cache import ResultCache
+from .config import ShitLintConfig
+from .core import _iter_file_violations
+from .discovery import FileRecord, ProjectIndex
+from .engine import RuleEngine
+
+# Size bucket upper bounds in bytes - small, medium, everything else
+SIZE_BUCKETS = (4_096, 32_768)
+
+# Two-sided 95% normal interval
+Z_95 = 1.96
+
+StratumKey = Tuple
+
+
+def parse_sample(spec: str, population: int) -> int:
+    """Files to draw for --sample: a count like "500" or a share like "2%"."""
+    spec = spec.strip()
+    try:
+        if spec.endswith("%"):
+            share = float(spec[:-1])
+            if not 0 < share <= 100:
+                raise ValueError
+            size = math.ceil(population * share / 100)
+        else:
+            size = int(spec)
+            if size <= 0:
+                raise ValueError
+    except ValueError:
+        raise ValueError(f"Invalid sample '{spec}': use a file count like 500 or a percentage like 2%")
+    return min(size, population)
+
+
+def _size_bucket(size: int) -> int:
+    for bucket, limit in enumerate(SIZE_BUCKETS):
+        if size < limit:
+            return bucket
+    return len(SIZE_BUCKETS)
+
+
+def _stratum_keys(record: FileRecord, root: Path) -> List[StratumKey]:
+    """Keys from finest to coarsest: kind, top-level directory, size bucket."""
+    parts = record.path.relative_to(root).parts if record.path.is_relative_to(root) else record.path.parts
+    directory = parts[0] if len(parts) > 1 else "."
+    return [
+        (record.kind, directory, _size_bucket(record.size)),
+        (record.kind, directory),
+        (record.kind,),
+    ]
+
+
+def stratify(records: List[FileRecord], root: Path, size: int) -> Dict[StratumKey, List[FileRecord]]:
+    """Group files into the finest strata the sample can cover twice over.
+    
+    Strata need two sampled files for a variance estimate, so there can be
+    at most size / 2 of them: size buckets are merged first, then the
+    smallest directories are lumped together per kind. A sample smaller
+    than the number of kinds gets one stratum, since an unsampled stratum
+    would drop out of the projection.
+    """
+    limit = max(1, size // 2)
+    keyed = [(_stratum_keys(record, root), record) for record in records]
+    
+    strata: Dict[StratumKey, List[FileRecord]] = {}
+    for level in range(2):
+        strata = {}
+        for keys, record in keyed:
+            strata.setdefault(keys[level], []).append(record)
+        if len(strata) <= limit:
+            return strata
+    
+    kinds = {keys[2] for keys, _ in keyed}
+    biggest = sorted(strata, key=lambda key: len(strata[key]), reverse=True)
+    kept = set(biggest[:max(0, limit - len(kinds))])
+    lumped: Dict[StratumKey, List[FileRecord]] = {}
+    for keys, record in keyed:
+        key = keys[1] if keys[1] in kept else keys[2] + ("*",)
+        lumped.setdefault(key, []).append(record)
+    if len(lumped) > size:
+        return {("*",): list(records)}
+    return lumped
+
+
+def allocate(strata: Dict[StratumKey, List[FileRecord]], size: int) -> Dict[StratumKey, int]:
+    """Split the sample across strata in proportion to their file counts.
+
+    Every stratum gets at least one file when the sample allows; leftovers
+    go to the largest remainders.
+    """
+    population = sum(len(files) for files in strata.values())
+    quotas = {key: size * len(files) / population for key, files in strata.items()}
+    counts = {key: min(len(strata[key]), max(1, int(quota))) for key, quota in quotas.items()}
+    
+    # Too many minimums - take back from the biggest allocations first
+    while sum(counts.values()) > size:
+        key = max(counts, key=lambda k: (counts[k], k))
+        counts[key] -= 1
+    
+    by_remainder = sorted(quotas, key=lambda k: quotas[k] - int(quotas[k]), reverse=True)
+    while sum(counts.values()) < size:
+        grew = False
+        for key in by_remainder:
+            if sum(counts.values()) == size:
+                break
+            if counts[key] < len(strata[key]):
+                counts[key] += 1
+                grew = True
+        if not grew:
+            break
+    return counts
+
+
+@dataclass
+class Estimate:
+    """Projected project-wide count for one rule and severity."""
+    
+    rule: str
+    severity: str
+    observed: int  # Violations actually found in the sample
+    projected: float
+    low: float  # 95% confidence interval
+    high: float
+
+
+@dataclass
+class SampleReport:
+    """What a sampled run found and what it projects for the whole project."""
+    
+    population: int
+    sampled: int
+    strata: int
+    seconds: float
+    estimates: List[Estimate] = field(default_factory=list)
+
+
+def project_counts(strata: Dict[StratumKey, List[FileRecord]], sampled: Dict[StratumKey, List[Path]],
+                   counts: Dict[Path, Dict[Tuple[str, str], int]]) -> List[Estimate]:
+    """Stratified estimate of totals, with a finite-population-corrected interval."""
+    categories = sorted({category for per_file in counts.values() for category in per_file})
+    estimates = []
+    for category in categories:
+        observed = 0
+        total = 0.0
+        variance = 0.0
+        for key, files in sampled.items():
+            if not files:
+                continue
+            values = [counts.get(file_path, {}).get(category, 0) for file_path in files]
+            population, n = len(strata[key]), len(values)
+            mean = sum(values) / n
+            observed += sum(values)
+            total += population * mean
+            if n > 1:
+                spread = sum((value - mean) ** 2 for value in values) / (n - 1)
+                variance += population ** 2 * (1 - n / population) * spread / n
+        
+        margin = Z_95 * math.sqrt(variance)
+        estimates.append(Estimate(
+            rule=category[0],
+            severity=category[1],
+            observed=observed,
+            projected=total,
+            low=max(float(observed), total - margin),  # Sampled violations are certain
+            high=total + margin,
+        ))
+    return sorted(estimates, key=lambda e: e.projected, reverse=True)
+
+
+def sample_analysis(path: Path, config: Optional[ShitLintConfig], spec: str, index: Optional[ProjectIndex] = None,
+                    seed: Optional[int] = None) -> SampleReport:
+    """Analyze a stratified random sample of files and project totals.
+
+    Only file-scoped rules are projected - cross-file duplicates, copied
+    blocks, near-duplicates, commit and dependency checks don't scale with
+    a file sample, so they are off.
+    """
+    start = time.perf_counter()
+    config = config or ShitLintConfig()
+    enabled = dict(config.enabled_rules, cross_file_duplicates=False)
+    config = replace(config, enabled_rules=enabled, clone_min_lines=0, near_duplicate_threshold=0.0)
+    
+    index = index or ProjectIndex.build(path, config)
+    records = [record for record in index.files if record.kind in ("python", "doc")]
+    if not records:
+        return SampleReport(population=0, sampled=0, strata=0, seconds=time.perf_counter() - start)
+    
+    size = parse_sample(spec, len(records))
+    strata = stratify(records, path, size)
+    rng = random.Random(seed)
+    sampled = {
+        key: [record.path for record in rng.sample(strata[key], count)]
+        for key, count in allocate(strata, size).items()
+    }
+    
+    # Python files first, like a full run
+    kinds = {record.path: record.kind for record in records}
+    files = sorted((p for paths in sampled.values() for p in paths), key=lambda p: (kinds[p] != "python", str(p)))
+    engine = RuleEngine(brutality=config.brutality, config=config.__dict__)
+    cache = ResultCache.open(path, engine) if config.cache else None
+    
+    counts: Dict[Path, Dict[Tuple[str, str], int]] = {}
+    try:
+        for file_path, violations in _iter_file_violations(engine, files, config, cache):
+            per_file = counts.setdefault(file_path, {})
+            for violation in violations:
+                category = (violation.rule, violation.severity)
+                per_file[category] = per_file.get(category, 0) + 1
+    finally:
+        if cache:
+            cache.save(partial=True)
+    
+    return SampleReport(
+        population=len(records),
+        sampled=len(files),
+        strata=len(strata),
+        seconds=time.perf_counter() - start,
+        estimates=project_counts(strata, sampled, counts),
+    )
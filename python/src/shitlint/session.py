@@ -0,0 +1,208 @@
+"""Resident analysis state that can be updated one file at a time."""
+
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .core import ShitLintResult, _violations_to_results
+from .discovery import MANIFESTS, IgnoreMatcher, ProjectIndex, classify
+from .engine import RuleEngine, read_source
+from .rules.base import Violation
+
+# Files project-scoped rules read - editing one re-runs the project phase
+PROJECT_FILES = MANIFESTS
+
+
+class AnalysisSession:
+    """Keeps per-file results and cross-file fingerprints in memory.
+    
+    analyze_all does one full scan; update re-analyzes only the files that
+    changed and recomputes cross-file duplicates for the fingerprints those
+    files touched, instead of rescanning the project.
+    """
+    
+    def __init__(self, root: Path, config=None):
+        self.root = root
+        self.config = config
+        self._lock = threading.RLock()
+        self._reset()
+    
+    def _reset(self):
+        brutality = self.config.brutality if self.config else "professional"
+        self.engine = RuleEngine(brutality=brutality, config=self.config.__dict__ if self.config else None)
+        if self.engine.parser:
+            # Resident, so keep parsed statements around for the next edit
+            self.engine.parser.retain = True
+        self.matcher = IgnoreMatcher(self.root, self.config)
+        self.index: Optional[ProjectIndex] = None
+        self.file_results: Dict[Path, List[ShitLintResult]] = {}
+        self.file_kinds: Dict[Path, str] = {}
+        self.file_stats: Dict[Path, Tuple[int, int]] = {}  # (mtime_ns, size) when analyzed
+        self.project_results: List[ShitLintResult] = []
+        self.cross_file: Dict[int, List[Violation]] = {}
+        self.clones: List[Violation] = []
+        self.near_duplicates: List[Violation] = []
+    
+    def analyze_all(self, index: Optional[ProjectIndex] = None) -> List[ShitLintResult]:
+        """Full scan - builds every file's results from scratch."""
+        with self._lock:
+            self._reset()
+            self.index = index or ProjectIndex.build(self.root, self.config)
+            for record in sorted(self.index.files, key=lambda r: r.kind != "python"):
+                self.file_kinds[record.path] = record.kind
+                self.file_stats[record.path] = (record.mtime_ns, record.size)
+                self._analyze(record.path)
+            
+            for fingerprint in self._all_fingerprints():
+                self._refresh_fingerprint(fingerprint)
+            self._refresh_clones()
+            self._refresh_near_duplicates()
+            
+            self._analyze_project()
+            return self.results()
+    
+    def update(self, changed: Iterable[Path]) -> List[ShitLintResult]:
+        """Re-analyze changed files, returning their results plus affected duplicates."""
+        with self._lock:
+            changed = [Path(p) for p in changed]
+            if any(p.name == '.gitignore' for p in changed):
+                # Ignore rules changed - the file set itself may be different
+                return self.analyze_all()
+            
+            affected: Set[str] = set()
+            updated = []
+            for file_path in changed:
+                file_path = self._known_path(file_path)
+                affected.update(self._fingerprints(file_path))
+                self.engine.forget_file(file_path)
+                self.file_results.pop(file_path, None)
+                self.file_stats.pop(file_path, None)
+                
+                kind = self._kind(file_path)
+                if kind is None:
+                    self.file_kinds.pop(file_path, None)
+                    self.engine.forget_source(file_path)
+                    continue
+                
+                self.file_kinds[file_path] = kind
+                stat = file_path.stat()
+                self.file_stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+                self._analyze(file_path)
+                affected.update(self._fingerprints(file_path))
+                updated.append(file_path)
+            
+            results = [r for file_path in updated for r in self.file_results[file_path]]
+            if any(p.name in PROJECT_FILES for p in changed):
+                if self.index is not None:
+                    # A manifest may have appeared in a new directory or gone away
+                    self.index.manifests = [m for m in self.index.manifests if m.is_file()]
+                    self.index.manifests.extend(
+                        known for known in map(self._known_path, changed)
+                        if known.name in PROJECT_FILES and known.is_file() and known not in self.index.manifests
+                    )
+                results.extend(self._analyze_project())
+            for fingerprint in affected:
+                results.extend(_violations_to_results(self._refresh_fingerprint(fingerprint)))
+            touched = {str(p) for p in changed} | {str(p) for p in updated}
+            for violations, key in ((self._refresh_clones(), "copies"), (self._refresh_near_duplicates(), "similar")):
+                results.extend(_violations_to_results([
+                    v for v in violations
+                    if v.file_path in touched or any(match[0] in touched for match in v.context[key])
+                ]))
+            return results
+    
+    def refresh(self) -> List[ShitLintResult]:
+        """Rediscover the project and update files whose mtime or size moved."""
+        with self._lock:
+            if self.index is None:
+                return self.analyze_all()
+            
+            index = ProjectIndex.build(self.root, self.config)
+            current = {record.path: record for record in index.files}
+            changed = [p for p in self.file_kinds if p not in current]
+            changed.extend(
+                record.path for record in index.files
+                if self.file_stats.get(record.path) != (record.mtime_ns, record.size)
+            )
+            
+            self.index = index
+            if changed:
+                self.update(changed)
+            
+            # Commits don't show up as file changes - recheck once per refresh
+            self._analyze_project()
+            return self.results()
+    
+    def results(self) -> List[ShitLintResult]:
+        """Current results: Python files, docs, project-wide, then cross-file."""
+        results = []
+        for kind in ("python", "doc"):
+            for file_path, file_kind in self.file_kinds.items():
+                if file_kind == kind:
+                    results.extend(self.file_results.get(file_path, []))
+        results.extend(self.project_results)
+        for violations in self.cross_file.values():
+            results.extend(_violations_to_results(violations))
+        results.extend(_violations_to_results(self.clones))
+        results.extend(_violations_to_results(self.near_duplicates))
+        return results
+    
+    def _analyze(self, file_path: Path):
+        content = read_source(file_path)
+        violations = self.engine.analyze_source(file_path, content) if content is not None else []
+        self.file_results[file_path] = _violations_to_results(violations)
+    
+    def _analyze_project(self) -> List[ShitLintResult]:
+        project_dirs = self.index.project_dirs if self.index else None
+        self.project_results = _violations_to_results(self.engine.analyze_project(self.root, project_dirs))
+        return self.project_results
+    
+    def _refresh_fingerprint(self, fingerprint: int) -> List[Violation]:
+        violations = self.engine.cross_file_analyzer.violations_for(fingerprint)
+        if violations:
+            self.cross_file[fingerprint] = violations
+        else:
+            self.cross_file.pop(fingerprint, None)
+        return violations
+    
+    def _refresh_clones(self) -> List[Violation]:
+        # The window index is already up to date - regrouping it is one linear pass
+        self.clones = self.engine.clone_detector.get_violations() if self.engine.clone_detector else []
+        return self.clones
+    
+    def _refresh_near_duplicates(self) -> List[Violation]:
+        # Candidates come from LSH buckets, so regrouping stays near-linear too
+        self.near_duplicates = self.engine.near_duplicates.get_violations() if self.engine.near_duplicates else []
+        return self.near_duplicates
+    
+    def _fingerprints(self, file_path: Path) -> List[int]:
+        return [entry[0] for entry in self.engine.export_file_state(file_path)["functions"]]
+    
+    def _all_fingerprints(self) -> List[int]:
+        return list(dict.fromkeys(fp for file_path in self.file_kinds for fp in self._fingerprints(file_path)))
+    
+    def _known_path(self, file_path: Path) -> Path:
+        """Map an event path onto the path form discovery used."""
+        for known in (file_path, self.root / self._relative(file_path)):
+            if known in self.file_kinds:
+                return known
+        return self.root / self._relative(file_path)
+    
+    def _relative(self, file_path: Path) -> Path:
+        try:
+            return file_path.resolve().relative_to(self.root.resolve())
+        except ValueError:
+            return file_path
+    
+    def _kind(self, file_path: Path) -> Optional[str]:
+        """Classify a changed path, None if it's gone, ignored or too big."""
+        kind = classify(file_path.name)
+        if kind is None or not file_path.is_file():
+            return None
+        
+        rel_path = self._relative(file_path)
+        if rel_path.is_absolute() or self.matcher.is_path_ignored(rel_path.as_posix()):
+            return None
+        if self.config and file_path.stat().st_size > self.config.max_file_size:
+            return None
+        return kind
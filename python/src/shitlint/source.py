@@ -0,0 +1,142 @@
+"""Per-file artifacts rules can ask for, each built lazily and at most once."""
+
+import ast
+import io
+import tokenize
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Artifact names rules declare in `requires`
+TEXT = "text"  # Raw file content
+LINES = "lines"  # content.split('\n')
+TOKENS = "tokens"  # tokenize stream, Python files only
+AST = "ast"  # Parsed module, None for non-Python files and syntax errors (plain ast backend)
+PARENTS = "parents"  # id(node) -> parent node
+INDEX = "index"  # SourceIndex - line offsets and non-blank line counts
+FINGERPRINTS = "fingerprints"  # id(function node) -> structural digest, filled as rules ask
+
+ARTIFACTS = (TEXT, LINES, TOKENS, AST, PARENTS, INDEX, FINGERPRINTS)
+
+
+class SourceIndex:
+    """Line start offsets plus a prefix sum of non-blank lines, built in one pass.
+    
+    Lines are numbered from 1 like AST nodes; a trailing newline does not
+    start another line. Non-blank counts over any line span are O(1).
+    """
+    
+    def __init__(self, text: str, lines: Optional[List[str]] = None):
+        self.text = text
+        lines = text.split('\n') if lines is None else lines
+        if len(lines) > 1 and lines[-1] == "":
+            lines = lines[:-1]
+        
+        self.line_starts: List[int] = []
+        self._nonblank: List[int] = [0]  # _nonblank[n] = non-blank lines among the first n
+        offset = 0
+        count = 0
+        for line in lines:
+            self.line_starts.append(offset)
+            offset += len(line) + 1
+            if line.strip():
+                count += 1
+            self._nonblank.append(count)
+    
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+    
+    def offset(self, lineno: int) -> int:
+        """Character offset where a line starts."""
+        return self.line_starts[lineno - 1]
+    
+    def line(self, lineno: int) -> str:
+        """Text of one line, without its newline."""
+        start = self.line_starts[lineno - 1]
+        end = self.text.find('\n', start)
+        return self.text[start:end if end != -1 else len(self.text)]
+    
+    def nonblank_lines(self, first: int = 1, last: Optional[int] = None) -> int:
+        """Non-blank lines from first to last inclusive, clamped to the file."""
+        last = self.line_count if last is None else min(last, self.line_count)
+        first = max(first, 1)
+        if last < first:
+            return 0
+        return self._nonblank[last] - self._nonblank[first - 1]
+
+
+class SourceFile:
+    """One file's content plus whatever has been derived from it so far."""
+    
+    def __init__(self, path: Path, text: str, parser=None, profiler=None):
+        self.path = path
+        self.text = text
+        self.parser = parser  # IncrementalParser for the tolerant backend, None for plain ast
+        self.profiler = profiler  # RuleProfiler timing shared artifacts, None when not profiling
+    
+    @classmethod
+    def with_tree(cls, path: Path, text: str, tree: Optional[ast.AST]) -> "SourceFile":
+        """A source whose AST was already parsed by the caller."""
+        source = cls(path, text)
+        source.__dict__["tree"] = tree
+        return source
+    
+    @property
+    def is_python(self) -> bool:
+        return self.path.suffix == '.py'
+    
+    def built(self, artifact: str) -> bool:
+        """Whether an artifact has been computed yet - text always has."""
+        attribute = {LINES: "lines", TOKENS: "tokens", AST: "tree", PARENTS: "parents", INDEX: "index",
+                     FINGERPRINTS: "fingerprints"}.get(artifact)
+        return attribute is None or attribute in self.__dict__
+    
+    @cached_property
+    def lines(self) -> List[str]:
+        return self.text.split('\n')
+    
+    @cached_property
+    def tokens(self) -> List[tokenize.TokenInfo]:
+        """Tokens up to the first tokenizer error."""
+        tokens = []
+        if not self.is_python:
+            return tokens
+        try:
+            for token in tokenize.generate_tokens(io.StringIO(self.text).readline):
+                tokens.append(token)
+        except (tokenize.TokenError, SyntaxError):
+            pass
+        return tokens
+    
+    @cached_property
+    def tree(self) -> Optional[ast.AST]:
+        if not self.is_python:
+            return None
+        if self.parser is not None:
+            return self.parser.parse(self.path, self.text)
+        try:
+            return ast.parse(self.text)
+        except SyntaxError:
+            return None
+    
+    @cached_property
+    def parents(self) -> Dict[int, ast.AST]:
+        """Parent of every node, keyed by id() so the AST isn't mutated."""
+        parents = {}
+        if self.tree is None:
+            return parents
+        for parent in ast.walk(self.tree):
+            for child in ast.iter_child_nodes(parent):
+                parents[id(child)] = parent
+        return parents
+
+    @cached_property
+    def index(self) -> SourceIndex:
+        # Reuse the line list if a rule already asked for it
+        return SourceIndex(self.text, self.__dict__.get("lines"))
+
+    @cached_property
+    def fingerprints(self) -> Dict[int, int]:
+        """Memo shared by the duplicate rules, so each function is hashed once."""
+        return {}
@@ -0,0 +1,88 @@
+"""Watch mode - re-analyze only what changed, debounced."""
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Set
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from .core import ShitLintResult
+from .session import AnalysisSession
+
+# (changed paths or None for the initial scan, results, elapsed seconds)
+UpdateCallback = Callable[[Optional[List[Path]], List[ShitLintResult], float], None]
+
+# Opened/closed events fire on our own reads - only content changes count
+CHANGE_EVENTS = {'created', 'modified', 'deleted', 'moved'}
+
+
+class DebouncedHandler(FileSystemEventHandler):
+    """Collects changed paths and flushes them once events go quiet."""
+    
+    def __init__(self, on_flush: Callable[[Set[Path]], None], delay: float = 0.2):
+        self.on_flush = on_flush
+        self.delay = delay
+        self._pending: Set[Path] = set()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+    
+    def on_any_event(self, event: FileSystemEvent):
+        if event.is_directory or event.event_type not in CHANGE_EVENTS:
+            return
+        
+        with self._lock:
+            self._pending.add(Path(event.src_path))
+            if getattr(event, 'dest_path', None):
+                self._pending.add(Path(event.dest_path))
+            
+            # Every new event pushes the flush back
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _flush(self):
+        with self._lock:
+            paths, self._pending = self._pending, set()
+            self._timer = None
+        if paths:
+            self.on_flush(paths)
+
+
+def watch(root: Path, config=None, on_update: Optional[UpdateCallback] = None, debounce: float = 0.2):
+    """Analyze root once, then keep re-analyzing changed files until interrupted."""
+    session = AnalysisSession(root, config)
+    
+    start = time.perf_counter()
+    results = session.analyze_all()
+    if on_update:
+        on_update(None, results, time.perf_counter() - start)
+    
+    def handle(paths: Iterable[Path]):
+        changed = sorted(p for p in paths if not _is_internal(p))
+        if not changed:
+            return
+        start = time.perf_counter()
+        results = session.update(changed)
+        if on_update:
+            on_update(changed, results, time.perf_counter() - start)
+    
+    observer = Observer()
+    observer.schedule(DebouncedHandler(handle, debounce), str(root), recursive=True)
+    observer.start()
+    try:
+        while observer.is_alive():
+            observer.join(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def _is_internal(file_path: Path) -> bool:
+    """Skip churn in .git and shitlint's own state directory."""
+    return any(part in ('.git', '.shitlint') for part in file_path.parts)
@@ -0,0 +1,115 @@
+"""Tests for single-walk rule dispatch."""
+
+import ast
+from pathlib import Path
+import pytest
+from shitlint.rules.base import Budget, BudgetExceeded, FunctionRule, NodeRule, Violation, walk_rules
+
+
+class RecordingRule(NodeRule):
+    """Records handler calls in order."""
+    
+    def __init__(self, file_path=Path("test.py"), content="", thresholds=None):
+        super().__init__(file_path, content, thresholds)
+        self.calls = []
+    
+    def visit_FunctionDef(self, node, parent):
+        self.calls.append(("enter", node.name, type(parent).__name__))
+    
+    def leave_FunctionDef(self, node, parent):
+        self.calls.append(("leave", node.name, type(parent).__name__))
+    
+    def visit_Constant(self, node, parent):
+        self.calls.append(("const", node.value, type(parent).__name__))
+
+
+def test_walk_rules_dispatches_in_source_order():
+    """Test handlers fire depth-first with parents, leave after the subtree."""
+    code = """
+def outer():
+    def inner():
+        return 1
+    return 2
+
+x = 3
+"""
+    rule = RecordingRule()
+    
+    walk_rules(ast.parse(code), [rule])
+    
+    assert rule.calls == [
+        ("enter", "outer", "Module"),
+        ("enter", "inner", "FunctionDef"),
+        ("const", 1, "Return"),
+        ("leave", "inner", "FunctionDef"),
+        ("const", 2, "Return"),
+        ("leave", "outer", "Module"),
+        ("const", 3, "Assign"),
+    ]
+
+
+def test_walk_rules_shares_one_walk(monkeypatch):
+    """Test several rules are fed by a single traversal."""
+    visited = []
+    original = ast.iter_child_nodes
+    monkeypatch.setattr(ast, "iter_child_nodes", lambda node: visited.append(node) or original(node))
+    tree = ast.parse("def f():\n    return 42\n")
+    rules = [RecordingRule(), RecordingRule()]
+    
+    walk_rules(tree, rules)
+    
+    assert rules[0].calls == rules[1].calls
+    assert len(visited) == len(list(ast.walk(tree)))
+
+
+def test_walk_rules_handles_deep_nesting():
+    """Test the explicit stack copes with trees deeper than the recursion limit."""
+    tree = ast.parse("x = 0")
+    node = tree.body[0].value
+    for _ in range(5000):
+        node = ast.UnaryOp(op=ast.USub(), operand=node)
+    tree.body[0].value = node
+    rule = RecordingRule()
+    
+    walk_rules(tree, [rule])
+    
+    assert rule.calls == [("const", 0, "UnaryOp")]
+
+
+def test_walk_rules_enforces_budget(monkeypatch):
+    """Test a budget stops the walk on deep nesting or a passed deadline."""
+    tree = ast.parse("x = " + "-" * 50 + "1")
+    
+    with pytest.raises(BudgetExceeded) as error:
+        walk_rules(tree, [RecordingRule()], budget=Budget(max_depth=20))
+    assert error.value.reason == "depth"
+    
+    walk_rules(tree, [RecordingRule()], budget=Budget(max_depth=100))
+    
+    budget = Budget(seconds=1)
+    budget.deadline = 0  # Already passed
+    monkeypatch.setattr("shitlint.rules.base.TIME_CHECK_INTERVAL", 1)
+    with pytest.raises(BudgetExceeded) as error:
+        walk_rules(tree, [RecordingRule()], budget=budget)
+    assert error.value.reason == "time"
+
+
+def test_function_rule_adapter():
+    """Test function-style rules run once with the usual arguments."""
+    seen = []
+    
+    def detect_anything(file_path, content, tree, thresholds):
+        seen.append((file_path, content, tree, thresholds))
+        return [Violation("anything", str(file_path), 1, "gentle", "found")]
+    
+    tree = ast.parse("x = 1")
+    rule = FunctionRule(detect_anything, Path("test.py"), "x = 1", tree, {"a": 1})
+    walk_rules(tree, [rule])
+    
+    assert rule.finish()[0].rule == "anything"
+    assert seen == [(Path("test.py"), "x = 1", tree, {"a": 1})]
+
+
+def test_detect_skips_non_python():
+    """Test the standalone detect path returns nothing without a tree."""
+    assert RecordingRule.detect(Path("README.md"), "# Readme", None, {}) == []
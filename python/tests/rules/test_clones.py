@@ -0,0 +1,116 @@
+"""Tests for copied-block detection."""
+
+import io
+import tempfile
+import textwrap
+import tokenize
+from pathlib import Path
+
+from shitlint.config import ShitLintConfig
+from shitlint.core import analyze_code
+from shitlint.engine import RuleEngine
+from shitlint.rules.clones import CloneDetector, statement_hashes, token_windows
+
+
+BLOCK = """    rows = load(path)
+    total = 0
+    for row in rows:
+        if row.valid:
+            total += row.amount * 1.2
+    report.write(total)
+    return summarize(rows, total)
+"""
+
+RENAMED = """    records = load(source)
+    acc = 0
+    for rec in records:
+        if rec.valid:
+            acc += rec.amount * 3.5
+    report.write(acc)
+    return summarize(records, acc)
+"""
+
+
+def tokens(code):
+    return list(tokenize.generate_tokens(io.StringIO(code).readline))
+
+
+def test_statements_normalize_names_and_literals():
+    """Test renamed variables and changed constants hash the same, calls and attributes don't."""
+    assert [h for h, _, _ in statement_hashes(tokens(BLOCK))] == [h for h, _, _ in statement_hashes(tokens(RENAMED))]
+    assert statement_hashes(tokens("x = load(a)\n"))[0][0] != statement_hashes(tokens("x = save(a)\n"))[0][0]
+    assert statement_hashes(tokens("x = a.left\n"))[0][0] != statement_hashes(tokens("x = a.right\n"))[0][0]
+    assert statement_hashes(tokens("import os\nfrom a import b\nx = 1\n"))[0][1] == 3
+
+
+def test_repetitive_runs_are_not_windows():
+    """Test a column of one statement shape doesn't count as copied logic."""
+    code = "".join(f"option_{i} = {i}\n" for i in range(12))
+    assert token_windows(tokens(code), 5) == []
+    assert len(token_windows(tokens(BLOCK), 5)) == 3
+
+
+def test_block_copied_into_different_functions():
+    """Test a block inside two unrelated functions is found and merged into one span per file."""
+    first = "def report(path):\n    check(path)\n" + BLOCK
+    second = "class Job:\n    def run(self, source):\n        self.start()\n" + textwrap.indent(RENAMED, "    ")
+    
+    detector = CloneDetector(5)
+    detector.collect(Path("a.py"), tokens(first))
+    detector.collect(Path("b.py"), tokens(second))
+    
+    violations = detector.get_violations()
+    assert [(v.file_path, v.context["lines"]) for v in violations] == [("a.py", [3, 9]), ("b.py", [4, 10])]
+    assert violations[0].context["copies"] == [("b.py", 4)]
+    assert all(v.rule == "copied_block" for v in violations)
+    
+    # A file's windows can move between processes and be dropped again
+    merged = CloneDetector(5)
+    merged.add_file("a.py", detector.export_file("a.py"))
+    merged.add_file("b.py", detector.export_file("b.py"))
+    assert len(merged.get_violations()) == 2
+    merged.remove_file("b.py")
+    assert merged.get_violations() == []
+
+
+def test_remove_file_with_repeated_window():
+    """Test a file repeating a block within itself is removed without leaving windows behind."""
+    code = tokens("def f(path):\n" + BLOCK + "\n\ndef g(path):\n" + BLOCK)
+    detector = CloneDetector(5)
+    detector.collect(Path("a.py"), code)
+    detector.collect(Path("b.py"), code)
+    
+    detector.remove_file("a.py")
+    assert all(file_id == 1 for occurrences in detector._index.values() for file_id, _, _ in occurrences)
+    detector.remove_file("b.py")
+    assert detector._index == {}
+
+
+def test_common_block_counts_every_copy():
+    """Test a block copied into many files reports its full count but lists only a few copies."""
+    code = tokens("def f(path):\n" + BLOCK)
+    detector = CloneDetector(5)
+    for i in range(300):
+        detector.collect(Path(f"m{i}.py"), code)
+    
+    violations = detector.get_violations()
+    assert len(violations) == 300
+    assert [v.context["count"] for v in violations] == [299] * 300
+    assert violations[0].context["copies"] == [(f"m{i}.py", 1) for i in range(1, 6)]
+    assert violations[0].message.endswith("and 294 more")
+
+
+def test_copied_blocks_in_project_run():
+    """Test the detector is off by default and reports through a cached project run."""
+    code = "def f(path):\n" + BLOCK
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text(code)
+        (root / "b.py").write_text(code.replace("def f", "def g"))
+        
+        assert RuleEngine().clone_detector is None
+        
+        config = ShitLintConfig(discovery="filesystem", clone_min_lines=5)
+        for _ in range(2):  # Second run replays windows from the cache
+            results = [r for r in analyze_code(root, config) if r.rule == "copied_block"]
+            assert sorted(Path(r.file_path).name for r in results) == ["a.py", "b.py"]
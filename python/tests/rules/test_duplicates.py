@@ -3,7 +3,9 @@
 import ast
 from pathlib import Path
 import pytest
-from shitlint.rules.duplicates import detect_duplicate_blocks, CrossFileAnalyzer
+from shitlint.engine import RuleEngine
+from shitlint.rules import duplicates
+from shitlint.rules.duplicates import detect_duplicate_blocks, structural_fingerprint, CrossFileAnalyzer
 from shitlint.rules.base import Violation
 
 
@@ -152,4 +154,90 @@ def another_small_func(b):
     violations = analyzer.get_violations()
     
     # Should not detect any violations (tiny functions are ignored)
-    assert len(violations) == 0
\ No newline at end of file
+    assert len(violations) == 0
+
+
+def test_cross_file_analyzer_merge_and_remove():
+    """Test per-file fingerprints can be exported, merged and removed."""
+    code = """
+def calculate_total(items):
+    total = 0
+    for item in items:
+        total += item
+    return total
+"""
+    worker = CrossFileAnalyzer()
+    worker.collect_function_fingerprints(Path("file1.py"), ast.parse(code))
+    
+    analyzer = CrossFileAnalyzer()
+    analyzer.add_file("file1.py", worker.export_file("file1.py"))
+    analyzer.collect_function_fingerprints(Path("file2.py"), ast.parse(code))
+    
+    assert len(analyzer.get_violations()) == 2
+    
+    analyzer.remove_file("file1.py")
+    
+    assert analyzer.get_violations() == []
+    assert analyzer.export_file("file1.py") == []
+
+
+def test_cross_file_analyzer_removes_file_with_repeated_function():
+    """Test a file holding two identical functions is removed without leaving either behind."""
+    code = "def f(a):\n    x = a\n    y = x\n    return y\n\n\ndef g(b):\n    x = b\n    y = x\n    return y\n"
+    analyzer = CrossFileAnalyzer()
+    analyzer.collect_function_fingerprints(Path("a.py"), ast.parse(code))
+    analyzer.collect_function_fingerprints(Path("b.py"), ast.parse(code))
+    
+    analyzer.remove_file("a.py")
+    assert [occurrence[0] for occurrence in next(iter(analyzer._function_fingerprints.values()))] == [1, 1]
+    analyzer.remove_file("b.py")
+    assert analyzer._function_fingerprints == {}
+
+
+def test_cross_file_analyzer_stores_paths_once():
+    """Test occurrences refer to interned paths by id and violations map them back."""
+    code = "def f(a):\n    x = a\n    y = x\n    return y\n"
+    analyzer = CrossFileAnalyzer()
+    for name in ("a.py", "b.py", "a.py"):
+        analyzer.collect_function_fingerprints(Path(name), ast.parse(code))
+    
+    assert analyzer._paths == ["a.py", "b.py"]
+    [occurrences] = analyzer._function_fingerprints.values()
+    assert [file_id for file_id, _, _ in occurrences] == [0, 1, 0]
+    
+    violations = analyzer.get_violations()
+    assert [v.file_path for v in violations] == ["a.py", "b.py", "a.py"]
+    assert violations[0].context["duplicates"][1] == ("b.py", "f", 1)
+
+
+def test_structural_fingerprint_ignores_names_only():
+    """Test renamed variables match, changed structure or annotations don't."""
+    def fingerprint(code):
+        return structural_fingerprint(ast.parse(code).body[0])
+    
+    base = fingerprint("def f(a, b):\n    x = a + b\n    return x\n")
+    
+    assert base == fingerprint("def g(p, q):\n    total = p + q\n    return total\n")
+    assert base != fingerprint("def f(a, b):\n    x = a - b\n    return x\n")
+    assert base != fingerprint("def f(a, b):\n    x = b + a\n    return x\n")
+    assert fingerprint("def f(a: int):\n    return a\n") != fingerprint("def f(a: str):\n    return a\n")
+    assert fingerprint("def f():\n    return b'x'\n") != fingerprint("def f():\n    return 'x'\n")
+    assert isinstance(base, int) and 0 <= base < 2 ** 64
+
+
+def test_fingerprints_are_streamed_and_shared(monkeypatch):
+    """Test no tree copies or dumps, and one hash per function for both duplicate rules."""
+    code = "def f(a):\n    x = a\n    y = x\n    return y\n\ndef g(a):\n    x = a\n    y = x\n    return y\n"
+    calls = []
+    original = duplicates.structural_fingerprint
+    monkeypatch.setattr(duplicates, "structural_fingerprint", lambda node: calls.append(node.name) or original(node))
+    monkeypatch.setattr(ast, "dump", lambda *args, **kwargs: pytest.fail("dumped a tree"))
+    monkeypatch.setattr("copy.deepcopy", lambda *args, **kwargs: pytest.fail("copied a tree"))
+    
+    engine = RuleEngine()
+    violations = engine.analyze_source(Path("a.py"), code)
+    monkeypatch.undo()
+    
+    assert any(v.rule == "duplicate_code" for v in violations)
+    assert sorted(calls) == ["f", "g"]
+    assert len(engine.export_file_state(Path("a.py"))["functions"]) == 2
@@ -0,0 +1,79 @@
+"""Tests for the rule registry and plugin loading."""
+
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from pathlib import Path
+import pytest
+
+from shitlint.engine import RuleEngine
+from shitlint.rules import registry
+from shitlint.rules.base import NodeRule, Violation
+from shitlint.rules.registry import BUILTIN_RULES, ENTRY_POINT_GROUP, discover_rules
+
+
+class PrintCallRule(NodeRule):
+    """Third-party style rule flagging print() calls."""
+    
+    def visit_Call(self, node, parent):
+        if getattr(node.func, "id", None) == "print":
+            self.violations.append(Violation(
+                rule="print_call",
+                file_path=str(self.file_path),
+                line_number=node.lineno,
+                severity="gentle",
+                message="print() in library code"
+            ))
+
+
+def plugin(name, value):
+    return EntryPoint(name=name, value=value, group=ENTRY_POINT_GROUP)
+
+
+def test_discover_rules_does_not_import():
+    """Test discovery and a narrow engine only import enabled rule modules."""
+    script = (
+        "import sys\n"
+        "from shitlint.engine import RuleEngine\n"
+        "engine = RuleEngine(config={'enabled_rules': {'magic_numbers': False, 'naming_violations': False}})\n"
+        "print(','.join(sorted(m for m in ('shitlint.rules.magic', 'shitlint.rules.naming', 'shitlint.rules.files') if m in sys.modules)))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    
+    assert result.stdout.strip() == "shitlint.rules.files"
+
+
+def test_plugin_rules_join_the_shared_walk(monkeypatch):
+    """Test entry point rules run in the engine like built-ins."""
+    monkeypatch.setattr(registry, "entry_points", lambda group: [
+        plugin("print_calls", "tests.rules.test_registry:PrintCallRule"),
+    ])
+    
+    rules = discover_rules()
+    assert list(rules)[:len(BUILTIN_RULES)] == list(BUILTIN_RULES)
+    assert not rules["print_calls"].builtin
+    
+    engine = RuleEngine()
+    violations = engine.analyze_source(Path("lib.py"), "def f():\n    print('hi')\n")
+    
+    assert [(v.rule, v.line_number) for v in violations] == [("print_call", 2)]
+    assert engine.plugin_versions == {"print_calls": "unknown"}
+    
+    # Plugins are switched off like any rule
+    engine = RuleEngine(config={"enabled_rules": {"print_calls": False}})
+    assert "print_calls" not in engine.rule_names
+
+
+def test_broken_or_clashing_plugins_are_skipped(monkeypatch):
+    """Test a plugin that fails to import or reuses a built-in name is ignored with a warning."""
+    monkeypatch.setattr(registry, "entry_points", lambda group: [
+        plugin("missing", "no_such_module:Rule"),
+        plugin("magic_numbers", "tests.rules.test_registry:PrintCallRule"),
+    ])
+    
+    with pytest.warns(UserWarning) as record:
+        engine = RuleEngine()
+    
+    assert "missing" not in engine.rule_names
+    assert engine.rules[engine.rule_names.index("magic_numbers")] is not PrintCallRule
+    assert len(record) == 2
@@ -0,0 +1,138 @@
+"""Tests for near-duplicate function detection."""
+
+import ast
+import tempfile
+from pathlib import Path
+
+from shitlint.config import ShitLintConfig
+from shitlint.core import analyze_code
+from shitlint.engine import RuleEngine
+from shitlint.rules.similarity import MAX_BUCKET, NearDuplicateIndex, band_rows, jaccard, minhash, shingles, similarity
+
+
+ORIGINAL = """
+def load_orders(path, limit):
+    rows = read_rows(path)
+    orders = []
+    for row in rows:
+        if row.status == "open" and row.total > 0:
+            orders.append(Order(row.id, row.total, row.customer))
+        elif row.status == "held":
+            log.warning("held order %s", row.id)
+    orders.sort(key=lambda order: order.total)
+    return orders[:limit]
+"""
+
+# Renamed, plus one added statement
+EDITED = """
+def fetch_orders(source, count):
+    records = read_rows(source)
+    found = []
+    for rec in records:
+        if rec.status == "open" and rec.total > 0:
+            found.append(Order(rec.id, rec.total, rec.customer))
+        elif rec.status == "held":
+            log.warning("held order %s", rec.id)
+    found.sort(key=lambda order: order.total)
+    metrics.count("orders", len(found))
+    return found[:count]
+"""
+
+UNRELATED = """
+def render_page(request):
+    template = env.get_template("page.html")
+    context = {"user": request.user, "items": []}
+    with open(request.path) as handle:
+        context["body"] = handle.read()
+    return template.render(**context)
+"""
+
+
+def signature(code):
+    return minhash(shingles(ast.parse(code).body[0]))
+
+
+def test_signatures_estimate_similarity():
+    """Test an edited copy scores high and unrelated code low."""
+    assert similarity(signature(ORIGINAL), signature(ORIGINAL)) == 1.0
+    assert similarity(signature(ORIGINAL), signature(EDITED)) >= 0.7
+    assert similarity(signature(ORIGINAL), signature(UNRELATED)) < 0.3
+
+
+def test_band_rows_follow_threshold():
+    """Test stricter thresholds use wider, more selective bands."""
+    assert band_rows(0.5) == 2
+    assert band_rows(0.8) == 4
+    assert band_rows(0.95) == 8
+
+
+def test_index_reports_near_but_not_exact_duplicates():
+    """Test candidates are verified against the threshold and exact copies are left alone."""
+    index = NearDuplicateIndex(0.7)
+    index.collect_function_signatures(Path("a.py"), ast.parse(ORIGINAL + UNRELATED))
+    index.collect_function_signatures(Path("b.py"), ast.parse(EDITED))
+    index.collect_function_signatures(Path("c.py"), ast.parse(UNRELATED))
+    
+    violations = index.get_violations()
+    assert [(v.file_path, v.line_number) for v in violations] == [("a.py", 2), ("b.py", 2)]
+    assert violations[0].context["similar"][0][:3] == ("b.py", "fetch_orders", 2)
+    assert all(v.rule == "near_duplicate" for v in violations)
+    
+    # A file's signatures can move between processes and be dropped again
+    merged = NearDuplicateIndex(0.7)
+    for name in ("a.py", "b.py"):
+        merged.add_file(name, index.export_file(name))
+    assert len(merged.get_violations()) == 2
+    merged.remove_file("b.py")
+    assert merged.get_violations() == []
+
+
+def test_candidates_are_verified_exactly():
+    """Test a pair whose estimate falls just under the threshold is still reported at its true score."""
+    exact = jaccard(shingles(ast.parse(ORIGINAL).body[0]), shingles(ast.parse(EDITED).body[0]))
+    assert similarity(signature(ORIGINAL), signature(EDITED)) < 0.83 <= exact
+    
+    index = NearDuplicateIndex(0.83)
+    index.collect_function_signatures(Path("a.py"), ast.parse(ORIGINAL))
+    index.collect_function_signatures(Path("b.py"), ast.parse(EDITED))
+    violations = index.get_violations()
+    assert [v.file_path for v in violations] == ["a.py", "b.py"]
+    assert violations[0].context["similar"][0][3] == round(exact, 2)
+
+
+def test_common_functions_are_not_dropped():
+    """Test exact copies share one bucket slot and oversized buckets are trimmed, not skipped."""
+    index = NearDuplicateIndex(0.7)
+    for i in range(MAX_BUCKET + 10):
+        index.collect_function_signatures(Path(f"copy{i}.py"), ast.parse(ORIGINAL))
+    index.collect_function_signatures(Path("edited.py"), ast.parse(EDITED))
+    
+    violations = index.get_violations()
+    assert len(violations) == MAX_BUCKET + 11
+    assert violations[-1].file_path == "edited.py"
+    assert violations[-1].context["count"] == MAX_BUCKET + 10
+    assert len(violations[-1].context["similar"]) == 5
+    assert all(v.context["similar"][0][:2] == ("edited.py", "fetch_orders") for v in violations[:-1])
+    assert index.truncated_buckets == 0
+    
+    # Distinct variants all land in the same buckets
+    variants = NearDuplicateIndex(0.7)
+    for i in range(MAX_BUCKET * 2):
+        variants.collect_function_signatures(Path(f"v{i}.py"), ast.parse(ORIGINAL.replace("orders.sort", f"orders.sort_{i}")))
+    assert len(variants.get_violations()) == MAX_BUCKET * 2
+    assert variants.truncated_buckets > 0
+
+
+def test_near_duplicates_in_project_run():
+    """Test the index is off by default and reports through a cached project run."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text(ORIGINAL)
+        (root / "b.py").write_text(EDITED)
+        
+        assert RuleEngine().near_duplicates is None
+        
+        config = ShitLintConfig(discovery="filesystem", near_duplicate_threshold=0.7)
+        for _ in range(2):  # Second run replays signatures from the cache
+            results = [r for r in analyze_code(root, config) if r.rule == "near_duplicate"]
+            assert sorted(Path(r.file_path).name for r in results) == ["a.py", "b.py"]
@@ -0,0 +1,107 @@
+"""Tests for the persistent result cache."""
+
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+from shitlint.config import ShitLintConfig
+from shitlint.core import ExitGate, analyze_code, analyze_until
+from shitlint.cache import CACHE_DIR
+
+
+DUPLICATE = """
+def calculate_total(items):
+    total = 0
+    for item in items:
+        total += item.price * item.quantity
+    return total
+"""
+
+
+def _make_project(root: Path):
+    (root / "a.py").write_text("value = 42\n" + DUPLICATE)
+    (root / "b.py").write_text(DUPLICATE)
+
+
+def test_warm_run_skips_parsing():
+    """Test unchanged files are served from cache, cross-file results included."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_project(root)
+        config = ShitLintConfig()
+        
+        cold = analyze_code(root, config)
+        assert list((root / CACHE_DIR).glob("*.json"))
+        
+        with patch('shitlint.engine.ast.parse', side_effect=AssertionError("parsed")):
+            warm = analyze_code(root, config)
+        
+        assert warm == cold
+        assert sum(r.rule == "cross_file_duplicate" for r in warm) == 2
+
+
+def test_changed_file_is_reanalyzed():
+    """Test a content change invalidates that file's entry."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_project(root)
+        config = ShitLintConfig()
+        analyze_code(root, config)
+        
+        (root / "b.py").write_text("def other(x):\n    return x\n")
+        results = analyze_code(root, config)
+        
+        assert not any(r.rule == "cross_file_duplicate" for r in results)
+
+
+def test_touched_file_hits_on_content_hash():
+    """Test an mtime change with identical content still hits."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_project(root)
+        config = ShitLintConfig()
+        cold = analyze_code(root, config)
+        
+        stat = (root / "a.py").stat()
+        os.utime(root / "a.py", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        with patch('shitlint.engine.ast.parse', side_effect=AssertionError("parsed")):
+            assert analyze_code(root, config) == cold
+
+
+def test_thresholds_are_part_of_the_key():
+    """Test a different brutality level doesn't reuse cached results."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_project(root)
+        analyze_code(root, ShitLintConfig(brutality="gentle"))
+        analyze_code(root, ShitLintConfig(brutality="brutal"))
+        
+        assert len(list((root / CACHE_DIR).glob("*.json"))) == 2
+
+
+def test_no_cache_writes_nothing():
+    """Test cache=False leaves no cache directory behind."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_project(root)
+        
+        analyze_code(root, ShitLintConfig(cache=False))
+        
+        assert not (root / CACHE_DIR).exists()
+
+
+def test_early_exit_keeps_unvisited_entries():
+    """Test a run stopped by a gate doesn't drop cache entries it never reached."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        _make_project(root)
+        config = ShitLintConfig()
+        cold = analyze_code(root, config)
+        
+        assert analyze_until(root, ExitGate(max_violations=1), config) == cold[:1]
+        
+        with patch('shitlint.engine.ast.parse', side_effect=AssertionError("parsed")):
+            assert analyze_code(root, config) == cold
@@ -3,9 +3,17 @@
 import os
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 import pytest
+from shitlint.config import ShitLintConfig
+from shitlint.discovery import ProjectIndex
+from shitlint.engine import RuleEngine
+from shitlint.rules.base import PROJECT, REPOSITORY, rule_scope
 from shitlint.core import (
+    ExitGate,
     analyze_code, 
+    analyze_until,
+    iter_analyze,
     get_analysis_context, 
     _get_python_files,
     _get_doc_files,
@@ -40,6 +48,87 @@ def test_analyze_code_directory():
         assert any(r.rule == "ceremony_parameter" for r in results)
 
 
+def test_iter_analyze_streams_per_file():
+    """Test results are yielded before later files are analyzed."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dup = 'def calculate_total(items):\n    total = 0\n    for item in items:\n        total += item\n    return total\n'
+        (Path(tmpdir) / "a.py").write_text('x = 123\n' + dup)
+        (Path(tmpdir) / "b.py").write_text(dup)
+        
+        stream = iter_analyze(Path(tmpdir))
+        first = next(stream)
+        assert first.file_path.endswith("a.py")
+        
+        rest = list(stream)
+        # Cross-file results come last, after every file has been seen
+        assert rest[-1].rule == "cross_file_duplicate"
+        assert [first] + rest == analyze_code(Path(tmpdir))
+
+
+def test_analyze_until_stops_at_the_gate():
+    """Test the gate ends the scan at its threshold, serially and across workers."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for i in range(40):
+            (root / f"m{i:02d}.py").write_text(f"def process_data(data):\n    return data * {i + 100}\n")
+        
+        for jobs in (1, 2):
+            config = ShitLintConfig(jobs=jobs, cache=False)
+            full = analyze_code(root, config)
+            
+            gate = ExitGate(severity="moderate", max_violations=3)
+            results = analyze_until(root, gate, config)
+            assert gate.tripped
+            assert results == full[:len(results)]
+            assert sum(r.severity == "moderate" for r in results) == 3
+            
+            # Nothing brutal - the gate never trips and the scan completes
+            gate = ExitGate(severity="brutal")
+            assert analyze_until(root, gate, config) == full
+            assert not gate.tripped
+
+
+def test_shared_index_walks_once():
+    """Test context and analysis reuse one ProjectIndex instead of re-walking."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "test.py"
+        file_path.write_text('def process_data(data):\n    return data\n')
+        
+        index = ProjectIndex.build(Path(tmpdir))
+        
+        with patch('shitlint.discovery.walk_project') as mock_walk:
+            context = get_analysis_context(Path(tmpdir), index=index)
+            results = analyze_code(Path(tmpdir), index=index)
+        
+        mock_walk.assert_not_called()
+        assert context.file_count == 1
+        assert any(r.rule == "ceremony_parameter" for r in results)
+
+
+def test_project_rules_run_once_per_run():
+    """Test commit and dependency rules run once for the root, not per file."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for name in ("a.py", "b.py", "c.py", "README.md"):
+            (root / name).write_text("x = 1\n")
+        (root / "requirements.txt").write_text("six\n")
+        
+        # Patching subprocess.run is global - keep discovery off git
+        config = ShitLintConfig(discovery="filesystem", cache=False)
+        with patch('shitlint.rules.commits.subprocess.run') as mock_run:
+            mock_run.return_value.returncode = 0
+            mock_run.return_value.stdout = "wip\nwip\n"
+            results = analyze_code(root, config)
+        
+        mock_run.assert_called_once()
+        assert mock_run.call_args.kwargs["cwd"] == root
+        
+        garbage = [r for r in results if r.rule == "commit_garbage"]
+        assert len(garbage) == 2
+        assert all(r.file_path == str(root) for r in garbage)
+        assert len([r for r in results if r.rule == "deps_leftpad"]) == 1
+
+
 def test_get_python_files():
     """Test getting Python files with gitignore patterns."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -129,4 +218,31 @@ def test_detect_naming_violations():
     # Test inconsistent naming
     files = [Path("snake_case.py"), Path("camelCase.py")]
     violations = _detect_naming_violations(files)
-    assert "Inconsistent naming convention: mix of snake_case and camelCase" in violations
\ No newline at end of file
+    assert "Inconsistent naming convention: mix of snake_case and camelCase" in violations
+
+
+def test_project_rules_run_per_manifest_directory():
+    """Test manifests below the analysis root are audited once each, commit checks once per run."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "svc").mkdir()
+        (root / "svc" / "requirements.txt").write_text("six==1.16.0\n")
+        (root / "web").mkdir()
+        (root / "web" / "package.json").write_text('{"dependencies": {"left-pad": "1.3.0"}}')
+        (root / "app.py").write_text("x = 1\n")
+        config = ShitLintConfig(cache=False, discovery="filesystem")
+        
+        index = ProjectIndex.build(root, config)
+        assert sorted(d.name for d in index.project_dirs) == ["svc", "web"]
+        
+        results = analyze_code(root, config, index)
+        leftpad = sorted(Path(r.file_path).relative_to(root).as_posix() for r in results if r.rule == "deps_leftpad")
+        assert leftpad == ["svc/requirements.txt", "web/package.json"]
+        
+        calls = []
+        project = rule_scope(PROJECT)(lambda target, *args: calls.append(("project", target.name)) or [])
+        repository = rule_scope(REPOSITORY)(lambda target, *args: calls.append(("repository", target.name)) or [])
+        engine = RuleEngine()
+        engine.project_rules = [("project", project), ("repository", repository)]
+        engine.analyze_project(root, index.project_dirs)
+        assert sorted(calls) == sorted([("project", root.name), ("project", "svc"), ("project", "web"), ("repository", root.name)])
@@ -0,0 +1,115 @@
+"""Tests for the analysis daemon."""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+import pytest
+
+from shitlint.config import ShitLintConfig
+from shitlint.core import analyze_code, get_analysis_context
+from shitlint.daemon import AnalysisDaemon, PROTOCOL_VERSION, request_analysis, send_request, serve, stop
+
+
+DUPLICATE = """
+def calculate_total(items):
+    total = 0
+    for item in items:
+        total += item.price * item.quantity
+    return total
+"""
+
+
+@pytest.fixture
+def socket_path():
+    # AF_UNIX paths are length-limited, keep it short
+    with tempfile.TemporaryDirectory(dir="/tmp") as tmpdir:
+        path = Path(tmpdir) / "d.sock"
+        ready = threading.Event()
+        thread = threading.Thread(target=serve, args=(path, ready), daemon=True)
+        thread.start()
+        ready.wait(5)
+        yield path
+        stop(path)
+        thread.join(5)
+
+
+def test_daemon_matches_local_analysis(socket_path):
+    """Test served results and context match an in-process run."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text("value = 42\n" + DUPLICATE)
+        (root / "b.py").write_text(DUPLICATE)
+        config = ShitLintConfig(cache=False)
+        
+        results, context = request_analysis(root, config, socket_path)
+        
+        assert results == analyze_code(root, config)
+        assert context == get_analysis_context(root, config)
+
+
+def test_daemon_invalidates_by_mtime(socket_path):
+    """Test edited, added and deleted files are picked up on the next request."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text(DUPLICATE)
+        (root / "b.py").write_text("x = 1\n")
+        config = ShitLintConfig(cache=False)
+        
+        results, _ = request_analysis(root, config, socket_path)
+        assert not any(r.rule == "cross_file_duplicate" for r in results)
+        
+        (root / "b.py").write_text(DUPLICATE)
+        os.utime(root / "b.py", ns=(0, 10**18))
+        (root / "c.py").write_text("value = 42\n")
+        results, context = request_analysis(root, config, socket_path)
+        
+        assert results == analyze_code(root, config)
+        assert any(r.rule == "cross_file_duplicate" for r in results)
+        assert context.file_count == 3
+        
+        (root / "a.py").unlink()
+        results, _ = request_analysis(root, config, socket_path)
+        
+        assert results == analyze_code(root, config)
+
+
+def test_daemon_refreshes_file_with_repeated_function(socket_path):
+    """Test an edited file holding two identical functions is refreshed, not a failed request."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        twice = DUPLICATE + "\n" + DUPLICATE.replace("calculate_total", "calculate_sum")
+        (root / "a.py").write_text(twice)
+        config = ShitLintConfig(cache=False, clone_min_lines=3)
+        request_analysis(root, config, socket_path)
+        
+        (root / "a.py").write_text("value = 42\n" + twice)
+        os.utime(root / "a.py", ns=(0, 10**18))
+        results, _ = request_analysis(root, config, socket_path)
+        
+        assert results == analyze_code(root, config)
+
+
+def test_daemon_keeps_one_session_per_root_and_config():
+    """Test sessions are reused for the same root and config only."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        daemon = AnalysisDaemon()
+        
+        session = daemon.session_for(root, ShitLintConfig())
+        
+        assert daemon.session_for(root, ShitLintConfig()) is session
+        assert daemon.session_for(root, ShitLintConfig(brutality="brutal")) is not session
+        assert daemon.handle({"op": "ping"})["error"].startswith("protocol mismatch")
+        assert daemon.handle({"op": "ping", "version": PROTOCOL_VERSION}) == {"ok": True}
+
+
+def test_client_falls_back_without_daemon():
+    """Test a missing or dead socket means analyze locally."""
+    with tempfile.TemporaryDirectory(dir="/tmp") as tmpdir:
+        missing = Path(tmpdir) / "none.sock"
+        assert request_analysis(Path(tmpdir), ShitLintConfig(), missing) is None
+        
+        missing.write_text("")  # Stale file, nothing listening
+        assert send_request({"op": "ping"}, missing) is None
+        assert not stop(missing)
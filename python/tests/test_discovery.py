@@ -0,0 +1,196 @@
+"""Tests for file discovery."""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+import pytest
+
+from shitlint.config import ShitLintConfig
+from shitlint.discovery import walk_project, discover_files, classify, IgnoreMatcher, ProjectIndex
+
+
+def test_walk_project_classifies_in_one_pass():
+    """Test Python and doc files come out of the same walk."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "pkg").mkdir()
+        (root / "pkg" / "mod.py").write_text("x = 1\n")
+        (root / "README.md").write_text("# Readme\n")
+        (root / "notes.txt").write_text("notes\n")
+        (root / "data.json").write_text("{}\n")
+        
+        records = list(walk_project(root))
+        kinds = {r.path.name: r.kind for r in records}
+        
+        assert kinds == {"mod.py": "python", "README.md": "doc", "notes.txt": "doc"}
+        assert all(r.size == r.path.stat().st_size for r in records)
+
+
+def test_walk_project_prunes_ignored_directories():
+    """Test ignored directories are never entered."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for ignored in ["node_modules", ".venv", ".git", "generated"]:
+            (root / ignored).mkdir()
+            (root / ignored / "junk.py").write_text("x = 1\n")
+        (root / "keep.py").write_text("x = 1\n")
+        (root / ".gitignore").write_text("generated/\n")
+        
+        files = discover_files(root)
+        
+        assert [f.name for f in files] == ["keep.py"]
+
+
+def test_walk_project_respects_max_file_size():
+    """Test files over max_file_size are skipped."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "small.py").write_text("x = 1\n")
+        (root / "big.py").write_text("x = 1\n" * 100)
+        
+        config = ShitLintConfig(max_file_size=50)
+        files = discover_files(root, config, kind="python")
+        
+        assert [f.name for f in files] == ["small.py"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_walk_project_dedupes_symlinks():
+    """Test symlinked files and directories are only reported once."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "real").mkdir()
+        (root / "real" / "mod.py").write_text("x = 1\n")
+        (root / "alias.py").symlink_to(root / "real" / "mod.py")
+        (root / "linked").symlink_to(root / "real", target_is_directory=True)
+        (root / "real" / "loop").symlink_to(root, target_is_directory=True)
+        
+        files = discover_files(root, kind="python")
+        
+        assert len(files) == 1
+
+
+def test_nested_gitignore_applies_to_its_subtree():
+    """Test a subpackage .gitignore is honoured relative to its directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        pkg = root / "pkg"
+        (pkg / "generated").mkdir(parents=True)
+        (pkg / "generated" / "models.py").write_text("x = 1\n")
+        (pkg / "schema_pb2.py").write_text("x = 1\n")
+        (pkg / "keep_pb2.py").write_text("x = 1\n")
+        (pkg / "mod.py").write_text("x = 1\n")
+        (root / "generated").mkdir()
+        (root / "generated" / "top.py").write_text("x = 1\n")
+        (pkg / ".gitignore").write_text("/generated/\n*_pb2.py\n!keep_pb2.py\n")
+        
+        files = discover_files(root, kind="python")
+        names = sorted(f.relative_to(root).as_posix() for f in files)
+        
+        # Anchored pattern only applies under pkg/, negation re-includes
+        assert names == ["generated/top.py", "pkg/keep_pb2.py", "pkg/mod.py"]
+
+
+def test_ignore_matcher_compiles_each_directory_once():
+    """Test per-directory rules are cached after the first lookup."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "pkg").mkdir()
+        (root / "pkg" / ".gitignore").write_text("*.log\n")
+        
+        matcher = IgnoreMatcher(root)
+        spec = matcher.spec_for("pkg/")
+        
+        assert spec is not None
+        assert matcher.spec_for("pkg/") is spec
+        assert matcher.spec_for("") is None
+        
+        levels = matcher.enter("pkg/", matcher.root_levels())
+        assert matcher.is_ignored(levels, "pkg/debug.log")
+        assert matcher.is_ignored(levels, "pkg/node_modules", is_dir=True)
+        assert not matcher.is_ignored(levels, "pkg/mod.py")
+
+
+def test_project_index_builds_tree_in_same_walk():
+    """Test the index carries files, suffix counts and a bounded tree."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        deep = root / "a" / "b" / "c" / "d"
+        deep.mkdir(parents=True)
+        (deep / "deep.py").write_text("x = 1\n")
+        (root / "a" / "mod.py").write_text("x = 1\n")
+        (root / "README.md").write_text("# Readme\n")
+        (root / "Makefile").write_text("all:\n")
+        (root / ".hidden").write_text("secret\n")
+        (root / ".gitignore").write_text("*.log\n")
+        
+        index = ProjectIndex.build(root)
+        
+        assert sorted(p.name for p in index.python_files) == ["deep.py", "mod.py"]
+        assert [p.name for p in index.doc_files] == ["README.md"]
+        assert index.suffix_counts() == {".py": 2, ".md": 1}
+        assert index.suffix_counts("python") == {".py": 2}
+        assert index.tree["Makefile"] is None
+        assert ".gitignore" in index.tree
+        assert ".hidden" not in index.tree
+        assert index.tree["a/"]["b/"]["c/"]["d/"] == {"...": "truncated"}
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_project_index_reads_git_index():
+    """Test git work trees are discovered from ls-files with blob ids."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+        (root / "pkg" / "generated").mkdir(parents=True)
+        (root / "pkg" / "mod.py").write_text("x = 1\n")
+        (root / "pkg" / "generated" / "models.py").write_text("x = 1\n")
+        (root / "pkg" / ".gitignore").write_text("generated/\n")
+        (root / "node_modules").mkdir()
+        (root / "node_modules" / "junk.py").write_text("x = 1\n")
+        (root / "skipme").mkdir()
+        (root / "skipme" / "mod.py").write_text("x = 1\n")
+        (root / "new.py").write_text("x = 1\n")
+        (root / "vendored").mkdir()
+        subprocess.run(["git", "init", "-q"], cwd=root / "vendored", check=True)
+        (root / "vendored" / "lib.py").write_text("x = 1\n")
+        subprocess.run(["git", "add", "pkg/mod.py"], cwd=root, check=True)
+        
+        config = ShitLintConfig(ignore_patterns=["skipme/"])
+        index = ProjectIndex.build(root, config)
+        blobs = {r.path.relative_to(root).as_posix(): r.blob for r in index.files}
+        
+        assert index.backend == "git"
+        assert list(blobs) == ["new.py", "pkg/mod.py"]
+        assert blobs["new.py"] is None
+        assert len(blobs["pkg/mod.py"]) == 40
+        assert index.tree["pkg/"]["mod.py"] is None
+        assert "vendored/" not in index.tree  # Untracked nested repo, listed by git as "vendored/"
+
+
+def test_project_index_falls_back_outside_git():
+    """Test plain directories use the filesystem walker."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "mod.py").write_text("x = 1\n")
+        
+        index = ProjectIndex.build(root)
+        
+        assert index.backend == "filesystem"
+        assert [r.blob for r in index.files] == [None]
+
+        # Asking for git explicitly makes the fallback visible
+        with pytest.warns(UserWarning, match="git discovery failed"):
+            index = ProjectIndex.build(root, ShitLintConfig(discovery="git"))
+        assert index.backend == "filesystem"
+
+
+def test_classify():
+    """Test suffix classification."""
+    assert classify("mod.py") == "python"
+    assert classify("README.md") == "doc"
+    assert classify("guide.rst") == "doc"
+    assert classify("mod.pyc") is None
+    assert classify("Makefile") is None
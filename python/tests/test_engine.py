@@ -3,8 +3,10 @@
 import tempfile
 from pathlib import Path
 import ast
+import itertools
 import pytest
 from shitlint.engine import RuleEngine
+from shitlint.rules.base import Budget, BudgetExceeded
 
 
 def test_rule_engine_initialization():
@@ -122,4 +124,117 @@ def calculate_total(items):
         
         # Should detect duplicate code
         assert len(violations) > 0
-        assert violations[0].rule == "cross_file_duplicate"
\ No newline at end of file
+        assert violations[0].rule == "cross_file_duplicate"
+
+
+def test_analyze_source_walks_tree_once(monkeypatch):
+    """Test every AST rule is served by one traversal, not one walk each."""
+    code = """
+import os
+
+class DataManager:
+    def process(self, data, a, b, c, d, e):
+        for item in data:
+            if item > 42:
+                return "https://example.com/api"
+        return None
+"""
+    walks = []
+    full_walks = []
+    original = ast.iter_child_nodes
+    original_walk = ast.walk
+    monkeypatch.setattr(ast, "iter_child_nodes", lambda node: walks.append(node) or original(node))
+    monkeypatch.setattr(ast, "walk", lambda node: full_walks.append(node) or original_walk(node))
+    
+    engine = RuleEngine(brutality="brutal")
+    violations = engine.analyze_source(Path("test.py"), code)
+    monkeypatch.undo()
+    
+    assert full_walks == []
+    rules = {v.rule for v in violations}
+    assert {"magic_number", "hardcoded_string", "parameter_hell", "ceremony_class", "ceremony_parameter"} <= rules
+    assert len(walks) == len(list(ast.walk(ast.parse(code))))
+
+
+def test_text_only_rules_skip_parsing():
+    """Test disabling every AST rule means Python files are never parsed."""
+    enabled = {name: False for name in RuleEngine().rule_names}
+    enabled.update({"giant_files": True, "cross_file_duplicates": False})
+    engine = RuleEngine(brutality="brutal", config={"enabled_rules": enabled})
+    code = "x = 1\n" * 200
+    
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(ast, "parse", lambda *args, **kwargs: pytest.fail("parsed a file no rule needed"))
+        violations = engine.analyze_source(Path("big.py"), code)
+    
+    assert [v.rule for v in violations] == ["giant_file"]
+    
+    # Re-enabling one AST rule brings parsing back
+    enabled["magic_numbers"] = True
+    engine = RuleEngine(brutality="brutal", config={"enabled_rules": enabled})
+    assert any(v.rule == "magic_number" for v in engine.analyze_source(Path("m.py"), "x = 42\n"))
+
+
+def test_budget_skips_pathological_files():
+    """Test deep nesting yields a budget_exceeded outcome instead of a crash."""
+    engine = RuleEngine(brutality="brutal")
+    function = "def f(a):\n    x = a\n    y = x\n    return y\n"
+    
+    # Parses fine, but nests far past the depth budget
+    violations = engine.analyze_source(Path("deep.py"), function + "x = " + "+".join(["1"] * 2000))
+    assert [(v.rule, v.context["reason"]) for v in violations] == [("budget_exceeded", "depth")]
+    
+    # Too deep for the parser itself
+    violations = engine.analyze_source(Path("deeper.py"), "x = " + "+".join(["1"] * 20000))
+    assert [(v.rule, v.context["reason"]) for v in violations] == [("budget_exceeded", "recursion")]
+    
+    # Skipped files leave nothing behind for cross-file analysis
+    assert engine.export_file_state(Path("deep.py")) == {"functions": []}
+    
+    # 0 disables the depth limit
+    engine = RuleEngine(config={"max_ast_depth": 0})
+    assert not any(v.rule == "budget_exceeded" for v in engine.analyze_source(Path("deep.py"), "x = " + "+".join(["1"] * 300)))
+
+
+def test_budget_after_collection_drops_repeated_functions(monkeypatch):
+    """Test a file timing out after its fingerprints were collected still yields one skip outcome."""
+    function = "def {}(items):\n    total = 0\n    for item in items:\n        total += item\n    return total\n\n\n"
+    code = function.format("first") + function.format("second")
+    engine = RuleEngine(config={"file_budget_seconds": 1, "clone_min_lines": 3})
+    
+    def check_time(budget):
+        if engine.export_file_state(Path("twice.py"))["functions"]:
+            raise BudgetExceeded("time", "1s")
+    
+    monkeypatch.setattr(Budget, "check_time", check_time)
+    violations = engine.analyze_source(Path("twice.py"), code)
+    
+    assert [v.rule for v in violations] == ["budget_exceeded"]
+    assert engine.export_file_state(Path("twice.py")) == {"functions": [], "windows": []}
+
+
+def test_default_depth_budget_keeps_ordinary_files():
+    """Test long elif dispatchers and string concatenations are analyzed, not skipped."""
+    engine = RuleEngine(brutality="brutal")
+    branches = "".join(f"    elif op == {i}:\n        return handle_{i}()\n" for i in range(1, 300))
+    dispatcher = "def dispatch(op):\n    if op == 0:\n        return 0\n" + branches
+    
+    rules = {v.rule for v in engine.analyze_source(Path("dispatch.py"), dispatcher)}
+    assert "budget_exceeded" not in rules
+    assert {"complex_function", "magic_number"} <= rules
+    
+    joined = "x = " + " + ".join(f'"part{i}"' for i in range(300)) + "\n"
+    assert not any(v.rule == "budget_exceeded" for v in engine.analyze_source(Path("joined.py"), joined))
+
+
+def test_budget_time_limit(monkeypatch):
+    """Test a file that runs past its time budget is skipped."""
+    engine = RuleEngine(config={"file_budget_seconds": 0.5})
+    clock = itertools.count()
+    monkeypatch.setattr("shitlint.rules.base.time.perf_counter", lambda: next(clock))
+    
+    violations = engine.analyze_source(Path("slow.py"), "x = 42\n")
+    
+    assert [(v.rule, v.severity, v.context) for v in violations] == [
+        ("budget_exceeded", "gentle", {"reason": "time", "limit": "0.5s"})
+    ]
@@ -0,0 +1,104 @@
+"""Tests for the persistent fingerprint index."""
+
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from shitlint.cache import CACHE_DIR
+from shitlint.config import ShitLintConfig
+from shitlint.core import analyze_code
+from shitlint.fingerprint_index import INDEX_FILE, META, FingerprintIndex
+
+
+DUPLICATE = """
+def calculate_total(items):
+    total = 0
+    for item in items:
+        total += item.price * item.quantity
+    return total
+"""
+
+
+def test_rows_are_replaced_per_file():
+    """Test only changed files are rewritten and full 64-bit fingerprints survive."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for name in ("a.py", "b.py", "c.py"):
+            (root / name).write_text("")
+        big = (1 << 64) - 5
+        
+        with FingerprintIndex.open(root) as index:
+            assert index.replace_file(root / "a.py", [(big, "f", 2)])
+            assert index.replace_file(root / "b.py", [(big, "g", 7), (3, "h", 9)])
+            assert index.replace_file(root / "c.py", [(3, "k", 1)])
+        
+        with FingerprintIndex.find(root / "a.py") as index:
+            assert not index.replace_file(root / "a.py", [(big, "f", 2)])
+            assert index.replace_file(root / "b.py", [(3, "h", 9)])
+            assert index.matching_files({big, 3}, exclude=root / "c.py") == {
+                root / "a.py": [(big, "f", 2)],
+                root / "b.py": [(3, "h", 9)],
+            }
+            
+            index.retain([root / "a.py"])
+            assert list(index.matching_files({big, 3})) == [root / "a.py"]
+
+
+def test_index_from_another_ruleset_is_emptied():
+    """Test rows written under different versions are dropped instead of matched."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text("")
+        with FingerprintIndex.open(root) as index:
+            index.replace_file(root / "a.py", [(7, "f", 2)])
+        
+        connection = sqlite3.connect(root / CACHE_DIR / INDEX_FILE)
+        with connection:
+            connection.execute("UPDATE meta SET value = '0' WHERE key = 'ruleset'")
+        connection.close()
+        
+        with FingerprintIndex.open(root) as index:
+            assert index.matching_files({7}) == {}
+            assert dict(index.connection.execute("SELECT key, value FROM meta")) == META
+            assert index.replace_file(root / "a.py", [(7, "f", 2)])
+
+
+def test_find_stops_at_project_root():
+    """Test a file inside a nested project never reads an outer project's index."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        outer = Path(tmpdir)
+        inner = outer / "vendor" / "lib"
+        inner.mkdir(parents=True)
+        (inner / "a.py").write_text("")
+        FingerprintIndex.open(outer).close()
+        
+        with FingerprintIndex.find(inner / "a.py") as index:
+            assert index.root == outer.resolve()
+        
+        (inner / ".git").mkdir()
+        assert FingerprintIndex.find(inner / "a.py") is None
+
+
+def test_single_file_run_reports_indexed_duplicates():
+    """Test a one-file run finds duplicates in files only a directory run has seen."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text(DUPLICATE)
+        (root / "b.py").write_text("value = 1\n" + DUPLICATE)
+        config = ShitLintConfig(discovery="filesystem")
+        
+        assert not [r for r in analyze_code(root / "a.py", config) if r.rule == "cross_file_duplicate"]
+        
+        analyze_code(root, config)
+        assert (root / CACHE_DIR / INDEX_FILE).exists()
+        
+        results = [r for r in analyze_code(root / "a.py", config) if r.rule == "cross_file_duplicate"]
+        assert [(r.file_path, r.line_number) for r in results] == [(str(root / "a.py"), 2)]
+        assert "b.py" in results[0].message
+        
+        # An edit since the last full run makes b.py's rows untrustworthy
+        stat = (root / "b.py").stat()
+        (root / "b.py").write_text("value = 22\n" + DUPLICATE)
+        os.utime(root / "b.py", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert not [r for r in analyze_code(root / "a.py", config) if r.rule == "cross_file_duplicate"]
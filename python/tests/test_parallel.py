@@ -0,0 +1,69 @@
+"""Tests for process-pool analysis."""
+
+import tempfile
+import threading
+from pathlib import Path
+import pytest
+
+from shitlint.config import ShitLintConfig
+from shitlint.core import analyze_code
+from shitlint.engine import RuleEngine
+from shitlint import parallel
+from shitlint.parallel import resolve_jobs
+
+
+DUPLICATE = """
+def calculate_total(items):
+    total = 0
+    for item in items:
+        total += item.price * item.quantity
+    return total
+"""
+
+
+def test_parallel_matches_serial():
+    """Test --jobs output, including cross-file duplicates, matches a serial run."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for i in range(6):
+            (root / f"mod_{i}.py").write_text(f"LIMIT = {i}\nvalue = 42\n" + DUPLICATE)
+        (root / "README.md").write_text("# Readme\n\nComing soon\n")
+        
+        serial = analyze_code(root, ShitLintConfig(jobs=1, cache=False))
+        parallel = analyze_code(root, ShitLintConfig(jobs=3, cache=False))
+        
+        assert parallel == serial
+        assert sum(r.rule == "cross_file_duplicate" for r in parallel) == 6
+
+
+def test_parallel_file_with_repeated_function():
+    """Test workers forget a file holding two identical functions without crashing."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "twice.py").write_text(DUPLICATE + "\n" + DUPLICATE.replace("calculate_total", "calculate_sum"))
+        (root / "other.py").write_text("value = 42\n")
+        
+        serial = analyze_code(root, ShitLintConfig(jobs=1, cache=False))
+        assert analyze_code(root, ShitLintConfig(jobs=2, cache=False)) == serial
+
+
+def test_resolve_jobs():
+    """Test job count resolution."""
+    assert resolve_jobs(4) == 4
+    assert resolve_jobs(-2) == 1
+    assert resolve_jobs(0) >= 1
+
+
+def test_cancelled_chunk_stops_between_files(monkeypatch):
+    """Test a worker abandons its chunk once the parent has cancelled."""
+    cancel = threading.Event()
+    monkeypatch.setattr(parallel, "_worker_engine", RuleEngine())
+    monkeypatch.setattr(parallel, "_worker_cancel", cancel)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = [Path(tmpdir) / f"m{i}.py" for i in range(3)]
+        for file_path in files:
+            file_path.write_text("value = 42\n")
+        
+        assert len(parallel._analyze_chunk(files)) == 3
+        cancel.set()
+        assert parallel._analyze_chunk(files) == []
@@ -0,0 +1,119 @@
+"""Tests for error-tolerant incremental parsing."""
+
+import ast
+import tempfile
+from pathlib import Path
+import pytest
+
+from shitlint.config import ShitLintConfig
+from shitlint.engine import RuleEngine
+from shitlint.parsing import IncrementalParser, statement_starts
+from shitlint.session import AnalysisSession
+
+
+MODULE = '''import os
+
+@decorator
+def first(a):
+    """Docstring with
+a line in column 0."""
+    return a
+
+try:
+    import json
+except ImportError:
+    json = None
+else:
+    pass
+
+x = (1,
+2)
+'''
+
+BROKEN = """def ok():
+    return 1
+
+def broken(:
+    pass
+
+value = 42
+"""
+
+
+def dump(tree):
+    return ast.dump(tree, include_attributes=True)
+
+
+def test_statement_starts():
+    """Test decorators, clauses and multi-line tokens stay with their statement."""
+    assert statement_starts(MODULE) == [1, 3, 9, 16]
+    assert statement_starts("x = (\n\ndef f():\n    pass\n") == [1, 3]
+
+
+def test_parse_matches_ast_and_tolerates_errors():
+    """Test valid files parse exactly like ast and broken statements are dropped alone."""
+    parser = IncrementalParser()
+    if parser.splitter is None:
+        assert parser.backend == "tokenize"
+    
+    assert dump(parser.parse(Path("m.py"), MODULE)) == dump(ast.parse(MODULE))
+    
+    tree = parser.parse(Path("b.py"), BROKEN)
+    assert [(type(node).__name__, node.lineno) for node in tree.body] == [("FunctionDef", 1), ("Assign", 7)]
+
+
+def test_incremental_reparse_only_touches_edited_statements():
+    """Test an edit re-parses just the changed statement and renumbers the rest."""
+    functions = [f"def f{i}(x):\n    return x + {i}\n" for i in range(5)]
+    parser = IncrementalParser(retain=True)
+    parser.parse(Path("m.py"), "\n".join(functions))
+    parses = parser.parses
+    
+    functions[1] = "def f1(x):\n    y = x * 2\n    return y + 1\n"
+    edited = "\n".join(functions)
+    tree = parser.parse(Path("m.py"), edited)
+    
+    assert parser.parses == parses + 1
+    assert dump(tree) == dump(ast.parse(edited))
+    
+    parser.forget(Path("m.py"))
+    assert parser.files == {}
+
+
+def test_tree_sitter_splitter_matches_tokenizer():
+    """Test tree-sitter finds the same statements as the tokenizer, including across edits."""
+    pytest.importorskip("tree_sitter_languages")
+    parser = IncrementalParser(retain=True)
+    assert parser.backend == "tree-sitter"
+    
+    # One key, so every text after the first is an incremental re-parse
+    for text in (MODULE, MODULE + "\ny = 1\n", BROKEN, BROKEN.replace("(:", "():")):
+        assert parser.splitter.starts("m.py", text, retain=True) == statement_starts(text)
+    
+    assert dump(parser.parse(Path("m.py"), MODULE)) == dump(ast.parse(MODULE))
+    tree = parser.parse(Path("b.py"), BROKEN)
+    assert [(type(node).__name__, node.lineno) for node in tree.body] == [("FunctionDef", 1), ("Assign", 7)]
+
+
+def test_tolerant_backend_in_engine_and_session():
+    """Test the backend finds violations past a syntax error and reuses parses in a session."""
+    assert not RuleEngine(brutality="brutal").analyze_source(Path("b.py"), BROKEN)
+    
+    engine = RuleEngine(brutality="brutal", config={"parser": "tolerant"})
+    violations = engine.analyze_source(Path("b.py"), BROKEN)
+    assert ("magic_number", 7) in [(v.rule, v.line_number) for v in violations]
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        module = root / "m.py"
+        module.write_text(MODULE)
+        session = AnalysisSession(root, ShitLintConfig(cache=False, parser="tolerant"))
+        session.analyze_all()
+        parser = session.engine.parser
+        parses = parser.parses
+        
+        module.write_text(MODULE + "\ny = 1337\n")
+        results = session.update([module])
+        
+        assert parser.parses == parses + 1
+        assert any(r.rule == "magic_number" and r.line_number == 19 for r in results)
@@ -0,0 +1,46 @@
+"""Tests for the read-ahead pipeline."""
+
+import tempfile
+from pathlib import Path
+import pytest
+
+from shitlint.config import ShitLintConfig
+from shitlint.core import analyze_code
+from shitlint.prefetch import iter_prefetched
+
+
+def test_iter_prefetched_preserves_order():
+    """Test contents come back in input order with a small queue."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = []
+        for i in range(10):
+            file_path = Path(tmpdir) / f"mod_{i}.py"
+            file_path.write_text(f"value = {i}\n")
+            files.append(file_path)
+        
+        results = list(iter_prefetched(files, threads=3, depth=2))
+        
+        assert [path for path, _ in results] == files
+        assert [content for _, content in results] == [f"value = {i}\n" for i in range(10)]
+
+
+def test_iter_prefetched_skips_undecodable_files():
+    """Test non-UTF-8 files come back as None instead of raising."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "binary.py"
+        file_path.write_bytes(b"\xff\xfe\x00bad")
+        
+        assert list(iter_prefetched([file_path])) == [(file_path, None)]
+
+
+def test_prefetch_matches_inline_reads():
+    """Test analysis output does not depend on the read pipeline."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for i in range(5):
+            (root / f"mod_{i}.py").write_text(f"def process_data(data):\n    return data * {i + 40}\n")
+        
+        inline = analyze_code(root, ShitLintConfig(io_threads=0, cache=False))
+        prefetched = analyze_code(root, ShitLintConfig(io_threads=2, prefetch_depth=1, cache=False))
+        
+        assert prefetched == inline
@@ -0,0 +1,101 @@
+"""Tests for rule and file profiling."""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+import pytest
+from click.testing import CliRunner
+
+from shitlint.cli import cli
+from shitlint.config import ShitLintConfig
+from shitlint.core import analyze_code
+from shitlint.profiling import RuleProfiler
+from shitlint.rules import duplicates
+
+
+SOURCE = """
+def process(data):
+    for item in data:
+        if item > 42:
+            return item
+    return None
+"""
+
+
+def test_profiler_times_every_rule_and_file():
+    """Test each enabled rule and file gets timings without changing results."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text(SOURCE)
+        (root / "b.py").write_text(SOURCE)
+        (root / "README.md").write_text("# Readme\n")
+        config = ShitLintConfig(cache=False, io_threads=0)
+        profiler = RuleProfiler()
+        
+        results = analyze_code(root, ShitLintConfig(jobs=2), profiler=profiler)
+        
+        assert results == analyze_code(root, config)
+        assert {"magic_numbers", "naming_violations", "giant_files", "cross_file_fingerprints",
+                "cross_file_duplicates", "documentation_violations"} <= set(profiler.rules)
+        assert profiler.rules["magic_numbers"].calls > 0
+        assert profiler.rules["giant_files"].files == 3
+        assert set(profiler.files) == {str(root / name) for name in ("a.py", "b.py", "README.md")}
+        assert profiler.files[str(root / "a.py")].parse > 0
+        assert profiler.files[str(root / "README.md")].parse == 0
+        assert all(stats.read > 0 for stats in profiler.files.values())
+
+
+def test_shared_fingerprints_get_their_own_row(monkeypatch):
+    """Test hashing shared by the duplicate rules is reported apart from the rule that asked first."""
+    hash_function = duplicates.structural_fingerprint
+    monkeypatch.setattr(duplicates, "structural_fingerprint", lambda node: time.sleep(0.05) or hash_function(node))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text(SOURCE)
+        (root / "b.py").write_text(SOURCE)
+        profiler = RuleProfiler()
+        analyze_code(root, ShitLintConfig(cache=False, jobs=1), profiler=profiler)
+    
+    shared = profiler.rules["function_fingerprints"]
+    assert shared.calls == 2 and shared.seconds >= 0.1
+    assert profiler.rules["duplicate_blocks"].seconds < 0.05
+    assert profiler.rules["cross_file_fingerprints"].seconds < 0.05
+    assert sum(stats.rules for stats in profiler.files.values()) >= 0.1
+
+
+def test_profiler_ranks_and_serializes():
+    """Test rankings are slowest-first and the JSON report round-trips."""
+    profiler = RuleProfiler()
+    with profiler.time_rule("slow", Path("a.py")):
+        sum(range(100000))
+    with profiler.time_rule("fast", Path("b.py")):
+        pass
+    
+    assert [name for name, _ in profiler.slowest_rules()] == ["slow", "fast"]
+    assert [name for name, _ in profiler.slowest_files(1)] == ["a.py"]
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out = Path(tmpdir) / "profile.json"
+        profiler.dump_json(out, top=5)
+        report = json.loads(out.read_text())
+    
+    assert list(report["rules"]) == ["slow", "fast"]
+    assert report["slowest_files"][0]["file"] == "a.py"
+    assert report["totals"]["files"] == 2
+
+
+def test_cli_profile_rules_writes_json():
+    """Test --profile-json prints tables and skips the roast."""
+    runner = CliRunner()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text(SOURCE)
+        out = root / "profile.json"
+        
+        result = runner.invoke(cli, ['main', str(root), '--profile-json', str(out)])
+        
+        assert result.exit_code == 0
+        assert "Rules by total time" in result.output
+        assert "magic_numbers" in json.loads(out.read_text())["rules"]
@@ -0,0 +1,78 @@
+"""Tests for sampling mode."""
+
+import tempfile
+from collections import Counter
+from pathlib import Path
+import pytest
+
+from shitlint.config import ShitLintConfig
+from shitlint.core import analyze_code
+from shitlint.discovery import FileRecord
+from shitlint.sampling import allocate, parse_sample, sample_analysis, stratify
+
+
+def make_project(root: Path):
+    for directory, count in (("api", 12), ("core", 6), ("scripts", 2)):
+        (root / directory).mkdir()
+        for i in range(count):
+            (root / directory / f"m{i}.py").write_text(f"def handler_{i}(a, b, c, d, e):\n    return a * {i + 100}\n")
+
+
+def test_parse_sample():
+    """Test counts and percentages, capped at the population."""
+    assert parse_sample("5", 100) == 5
+    assert parse_sample("2.5%", 100) == 3
+    assert parse_sample("500", 40) == 40
+    for bad in ("0", "-3", "150%", "lots"):
+        with pytest.raises(ValueError):
+            parse_sample(bad, 100)
+
+
+def test_stratify_and_allocate():
+    """Test strata shrink to fit the sample and the sample is split proportionally."""
+    root = Path("/repo")
+    records = [FileRecord(root / d / f"{i}.py", "python", size) for d, n, size in
+               (("a", 60, 100), ("a", 20, 50_000), ("b", 15, 100), ("c", 5, 100)) for i in range(n)]
+    
+    assert len(stratify(records, root, 100)) == 4  # Directory and size bucket
+    assert set(stratify(records, root, 6)) == {("python", "a"), ("python", "b"), ("python", "c")}
+    assert set(stratify(records, root, 4)) == {("python", "a"), ("python", "*")}
+    
+    strata = stratify(records, root, 10)
+    counts = allocate(strata, 10)
+    assert sum(counts.values()) == 10
+    assert all(counts[key] >= 1 for key in strata)
+    assert counts[("python", "a", 0)] == max(counts.values())
+
+    # One file can't cover both kinds - everything becomes one stratum
+    mixed = records + [FileRecord(root / "docs" / f"{i}.md", "doc", 100) for i in range(10)]
+    assert stratify(mixed, root, 1) == {("*",): mixed}
+    assert set(stratify(mixed, root, 2)) == {("python", "*"), ("doc", "*")}
+
+
+def test_sample_projects_full_run():
+    """Test a full-size sample projects exactly the full counts, and a partial one brackets them."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        make_project(root)
+        config = ShitLintConfig(cache=False, brutality="brutal", discovery="filesystem")
+        full = Counter((r.rule, r.severity) for r in analyze_code(root, config) if r.rule != "cross_file_duplicate")
+        
+        report = sample_analysis(root, config, "100%", seed=1)
+        assert report.population == report.sampled == 20
+        assert {(e.rule, e.severity): (e.projected, e.low, e.high) for e in report.estimates} == {
+            category: (count, count, count) for category, count in full.items()
+        }
+        
+        # A one-file sample still projects over every file, docs included
+        (root / "README.md").write_text("# Readme\n\nComing soon\n")
+        report = sample_analysis(root, config, "1", seed=1)
+        assert (report.sampled, report.strata) == (1, 1)
+        for estimate in report.estimates:
+            assert estimate.projected == estimate.observed * 21
+        (root / "README.md").unlink()
+        
+        report = sample_analysis(root, config, "8", seed=1)
+        assert report.sampled == 8
+        for estimate in report.estimates:
+            assert estimate.observed <= estimate.low <= full[(estimate.rule, estimate.severity)] <= estimate.high
@@ -0,0 +1,131 @@
+"""Tests for incremental analysis sessions and watch mode."""
+
+import tempfile
+import threading
+from pathlib import Path
+import pytest
+from watchdog.events import FileModifiedEvent, FileMovedEvent, FileOpenedEvent
+
+from shitlint.config import ShitLintConfig
+from shitlint.core import analyze_code
+from shitlint.session import AnalysisSession
+from shitlint.watch import DebouncedHandler
+
+
+DUPLICATE = """
+def calculate_total(items):
+    total = 0
+    for item in items:
+        total += item.price * item.quantity
+    return total
+"""
+
+
+def test_analyze_all_matches_analyze_code():
+    """Test a session's full scan gives the same results as analyze_code."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text("value = 42\n" + DUPLICATE)
+        (root / "b.py").write_text(DUPLICATE)
+        (root / "README.md").write_text("# Readme\n\nComing soon\n")
+        config = ShitLintConfig(cache=False)
+        
+        session = AnalysisSession(root, config)
+        
+        assert session.analyze_all() == analyze_code(root, config)
+
+
+def test_update_only_reanalyzes_changed_files():
+    """Test updates touch only changed files and their duplicate groups."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text(DUPLICATE)
+        (root / "b.py").write_text("value = 42\n")
+        config = ShitLintConfig(cache=False)
+        session = AnalysisSession(root, config)
+        session.analyze_all()
+        
+        # b.py gains a copy of a.py's function
+        (root / "b.py").write_text(DUPLICATE)
+        changed = session.update([root / "b.py"])
+        
+        assert {r.file_path for r in changed if r.rule == "cross_file_duplicate"} == {str(root / "a.py"), str(root / "b.py")}
+        assert session.results() == analyze_code(root, config)
+        
+        # Deleting it clears the duplicate on both sides
+        (root / "b.py").unlink()
+        session.update([root / "b.py"])
+        
+        assert not any(r.rule == "cross_file_duplicate" for r in session.results())
+        assert session.results() == analyze_code(root, config)
+
+
+def test_update_skips_ignored_paths():
+    """Test new files under ignored directories stay out of the session."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text("x = 1\n")
+        (root / "node_modules").mkdir()
+        session = AnalysisSession(root, ShitLintConfig(cache=False))
+        session.analyze_all()
+        
+        junk = root / "node_modules" / "junk.py"
+        junk.write_text("value = 42\n")
+        
+        assert session.update([junk]) == []
+        assert junk not in session.file_results
+
+
+def test_debounced_handler_batches_events():
+    """Test a burst of events is flushed once."""
+    flushed = []
+    done = threading.Event()
+    
+    def on_flush(paths):
+        flushed.append(paths)
+        done.set()
+    
+    handler = DebouncedHandler(on_flush, delay=0.05)
+    handler.on_any_event(FileModifiedEvent("/tmp/a.py"))
+    handler.on_any_event(FileModifiedEvent("/tmp/a.py"))
+    handler.on_any_event(FileMovedEvent("/tmp/b.py", "/tmp/c.py"))
+    handler.on_any_event(FileOpenedEvent("/tmp/d.py"))
+    
+    assert done.wait(2)
+    assert flushed == [{Path("/tmp/a.py"), Path("/tmp/b.py"), Path("/tmp/c.py")}]
+
+
+def test_project_phase_reruns_on_manifest_change():
+    """Test editing a manifest re-runs project rules without touching files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "a.py").write_text("x = 1\n")
+        (root / "requirements.txt").write_text("requests\n")
+        session = AnalysisSession(root, ShitLintConfig(cache=False))
+        session.analyze_all()
+        
+        assert not any(r.rule == "deps_leftpad" for r in session.results())
+        
+        (root / "requirements.txt").write_text("requests\nsix\n")
+        update = session.update([root / "requirements.txt"])
+        
+        assert [r.rule for r in update if r.rule.startswith("deps")] == ["deps_leftpad"]
+        assert session.results() == analyze_code(root, ShitLintConfig(cache=False))
+
+
+def test_update_file_with_repeated_function():
+    """Test editing a file that holds two identical functions replaces its state cleanly."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        twice = DUPLICATE + "\n" + DUPLICATE.replace("calculate_total", "calculate_sum")
+        (root / "a.py").write_text(twice)
+        (root / "b.py").write_text("x = 1\n")
+        config = ShitLintConfig(cache=False, clone_min_lines=3)
+        session = AnalysisSession(root, config)
+        session.analyze_all()
+        
+        (root / "a.py").write_text("value = 42\n" + twice)
+        session.update([root / "a.py"])
+        
+        assert any(r.rule == "magic_number" for r in session.results())
+        assert session.results() == analyze_code(root, config)
@@ -0,0 +1,58 @@
+"""Tests for lazily built source artifacts."""
+
+import ast
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+from shitlint.source import AST, LINES, TOKENS, SourceFile, SourceIndex
+
+
+def test_artifacts_are_built_once_on_demand():
+    """Test nothing is derived until asked for, then it is reused."""
+    source = SourceFile(Path("mod.py"), "x = 1\n\ny = 2\n")
+    
+    assert not source.built(LINES) and not source.built(AST)
+    
+    with patch("shitlint.source.ast.parse", wraps=ast.parse) as parse:
+        tree = source.tree
+        assert source.tree is tree
+    
+    parse.assert_called_once()
+    assert source.built(AST) and not source.built(TOKENS)
+    assert source.lines == ["x = 1", "", "y = 2", ""]
+
+
+def test_non_python_and_broken_sources():
+    """Test docs and syntax errors have no tree or tokens instead of raising."""
+    doc = SourceFile(Path("README.md"), "# Readme\n")
+    broken = SourceFile(Path("bad.py"), "def broken(:\n    '''unterminated\n")
+    
+    assert doc.tree is None and doc.tokens == [] and doc.parents == {}
+    assert broken.tree is None
+    assert broken.tokens  # Tokens up to the error
+
+
+def test_parents_do_not_mutate_nodes():
+    """Test the parent map is keyed by id and leaves the AST untouched."""
+    source = SourceFile(Path("mod.py"), "x = 42\n")
+    constant = source.tree.body[0].value
+    
+    assert isinstance(source.parents[id(constant)], ast.Assign)
+    assert not hasattr(constant, "parent")
+
+
+def test_source_index_counts_spans():
+    """Test line offsets and non-blank counts match splitting the text."""
+    text = "def f():\n\n    x = 1\n   \n    return x\n\ny = 2\n"
+    index = SourceFile(Path("mod.py"), text).index
+    lines = text.split('\n')
+    
+    assert index.line_count == 7
+    assert [index.line(n) for n in range(1, 8)] == lines[:7]
+    assert [text[index.offset(n):].split('\n')[0] for n in range(1, 8)] == lines[:7]
+    for first in range(1, 8):
+        for last in range(first, 10):
+            assert index.nonblank_lines(first, last) == len([l for l in lines[first - 1:last] if l.strip()])
+    assert index.nonblank_lines() == 4
+    assert SourceIndex("").line_count == 1 and SourceIndex("no newline").line(1) == "no newline"